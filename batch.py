@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : batch.py
+# @Time    : 2026-10-16 23:10:12
+# @Author  : Kelvin.Ye
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
+from fnmatch import fnmatchcase
+
+from cache import cached_xmind_to_excel
+from schema import TagSchema
+from transformer import get_xmind_sheet_names
+from transformer import rows_to_excel
+from transformer import xmind_to_rows
+
+
+def find_xmind_files(source: str) -> list:
+    """查找 xmind 文件
+
+    Args:
+        source (str): xmind 文件、目录或通配符，e.g.: cases/、cases/**/*.xmind
+
+    Returns:
+        list: xmind 文件路径（已排序）
+    """
+    if os.path.isdir(source):
+        return sorted(glob.glob(os.path.join(source, '*.xmind')))
+    return sorted(path for path in glob.glob(source, recursive=True) if os.path.isfile(path))
+
+
+def select_sheet_names(sheet_names: list, selectors: list = None) -> list:
+    """按 sheet 页名称或通配符筛选 sheet 页
+
+    Args:
+        sheet_names (list): xmind 文件里所有 sheet 页的名称
+        selectors (list, optional): sheet 页名称或通配符，为空时选择所有 sheet 页
+
+    Returns:
+        list: 命中的 sheet 页名称，保持 xmind 文件里的顺序
+    """
+    if not selectors:
+        return list(sheet_names)
+    return [name for name in sheet_names if any(fnmatchcase(name, selector) for selector in selectors)]
+
+
+def future_result(future) -> tuple:
+    """获取子进程任务的结果
+
+    Returns:
+        tuple: (结果, 错误)，错误为子进程异常退出等无法在任务中捕获的异常，e.g.: BrokenProcessPool
+    """
+    try:
+        return future.result(), None
+    except Exception as e:
+        return None, f'{type(e).__name__}: {e}'
+
+
+def iter_pool_results(func, jobs: list, workers: int = None):
+    """使用进程池并行执行任务，任务需要自行捕获异常并记录在结果中
+
+    Args:
+        func: 任务函数，需要可以序列化（模块级函数）
+        jobs (list): 每个任务的参数
+        workers (int, optional): 进程数. Defaults to CPU 核数
+
+    Yields:
+        tuple: (任务序号, 结果, 错误)，按完成的顺序产出，参考 future_result
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(func, *job): index for index, job in enumerate(jobs)}
+        for future in as_completed(futures):
+            yield (futures[future], *future_result(future))
+
+
+def convert_sheet(
+    xmind_file_path: str,
+    xmind_sheet_name: str,
+    classify: bool,
+    backend: str,
+    spec: str,
+    use_cache: bool = False,
+    analysis_mode: str = 'formula',
+    schema: TagSchema = None
+) -> dict:
+    """在子进程中转换一个 sheet 页，异常记录在结果中，不向上抛出"""
+    started = time.perf_counter()
+    result = {'sheet': xmind_sheet_name, 'cases': 0, 'output': None, 'error': None}
+    try:
+        # 不同文件可能存在同名 sheet 页，输出文件名带上 xmind 文件名
+        xmind_name = os.path.splitext(os.path.basename(xmind_file_path))[0]
+        output_name = f'[testcase]{xmind_name}-{xmind_sheet_name}.xlsx'
+        if use_cache:
+            rows, _, result['output'] = cached_xmind_to_excel(
+                xmind_file_path,
+                xmind_sheet_name,
+                classify,
+                backend,
+                spec,
+                output_name,
+                analysis_mode=analysis_mode,
+                schema=schema
+            )
+            result['cases'] = len(rows)
+        else:
+            rows, classified_data = xmind_to_rows(xmind_file_path, xmind_sheet_name, classify, schema)
+            result['cases'] = len(rows)
+            result['output'] = rows_to_excel(rows, classified_data, output_name, backend, spec, analysis_mode, schema)
+    except Exception as e:
+        result['error'] = f'{type(e).__name__}: {e}'
+    result['seconds'] = time.perf_counter() - started
+    return result
+
+
+def batch_xmind_to_excel(
+    source: str,
+    sheet_selectors: list = None,
+    classify: bool = False,
+    backend: str = 'openpyxl',
+    spec: str = None,
+    workers: int = None,
+    use_cache: bool = False,
+    analysis_mode: str = 'formula',
+    schema: TagSchema = None
+) -> list:
+    """批量 XMind 转 Excel，使用进程池并行转换，结果输出至 output 目录
+
+    单个文件或 sheet 页转换失败时不影响其他文件，错误记录在汇总结果中
+
+    Args:
+        source (str): xmind 文件、目录或通配符
+        sheet_selectors (list, optional): sheet 页名称或通配符，为空时转换所有 sheet 页
+        classify (bool, optional): 是否分类用例
+        backend (str, optional): 写入器，openpyxl（无需 Excel/WPS）或 xlwings
+        spec (str, optional): MacOS下 excelApp 的名称，仅 xlwings 有效
+        workers (int, optional): 进程数. Defaults to CPU 核数
+        use_cache (bool, optional): 是否使用转换缓存，sheet 页内容没有变化时直接复制上次的 Excel
+        analysis_mode (str, optional): 数据统计的计算方式，参考 ANALYSIS_MODES
+        schema (TagSchema, optional): 标签定义，参考 load_schema. Defaults to DEFAULT_SCHEMA
+
+    Returns:
+        list: 每个文件的汇总，e.g.: [{'file': ..., 'cases': 10, 'seconds': 1.2, 'outputs': [...], 'errors': [...]}]
+    """
+    summaries = {}
+    jobs = []
+    for xmind_file_path in find_xmind_files(source):
+        summary = {'file': xmind_file_path, 'cases': 0, 'seconds': 0.0, 'outputs': [], 'errors': []}
+        summaries[xmind_file_path] = summary
+        try:
+            sheet_names = select_sheet_names(get_xmind_sheet_names(xmind_file_path), sheet_selectors)
+        except Exception as e:
+            summary['errors'].append(f'{type(e).__name__}: {e}')
+            continue
+        if not sheet_names:
+            summary['errors'].append(f'sheet页:[ {", ".join(sheet_selectors or [])} ] 不存在')
+        jobs.extend((xmind_file_path, sheet_name) for sheet_name in sheet_names)
+
+    options = (classify, backend, spec, use_cache, analysis_mode, schema)
+    for index, result, error in iter_pool_results(convert_sheet, [(*job, *options) for job in jobs], workers):
+        summary = summaries[jobs[index][0]]
+        if error:
+            summary['errors'].append(error)
+            continue
+        summary['cases'] += result['cases']
+        summary['seconds'] += result['seconds']
+        if result['output']:
+            summary['outputs'].append(result['output'])
+        if result['error']:
+            summary['errors'].append(f'sheet页:[ {result["sheet"]} ] {result["error"]}')
+
+    for summary in summaries.values():
+        summary['outputs'].sort()
+        status = '失败' if summary['errors'] else '成功'
+        print(f'[{status}] {summary["file"]} 用例数: {summary["cases"]} 耗时: {summary["seconds"]:.2f}s')
+        for error in summary['errors']:
+            print(f'    {error}')
+    return list(summaries.values())
+
+
+if __name__ == '__main__':
+    xmind_dir_path = r'xxx'
+    batch_xmind_to_excel(xmind_dir_path)
@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : benchmark.py
+# @Time    : 2026-10-16 23:24:48
+# @Author  : Kelvin.Ye
+import argparse
+import json
+import os
+import platform
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+from generator import generate_xmind
+from instrument import Instrumentation
+from instrument import stage
+from transformer import TEMPLATE_FILE_PATH
+from transformer import ConversionSession
+from transformer import get_writer
+from transformer import xmind_to_rows
+
+
+# 性能测试结果目录，相对于当前工作目录
+BENCHMARK_PATH = 'benchmark'
+
+# 默认的用例规模
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+
+def run_pipeline(
+    xmind_file_path: str, sheet_name: str, work_path: str, classify: bool, backend: str, trace_memory: bool
+) -> tuple:
+    """执行一次完整的转换，返回用例数和顶层阶段的记录（子阶段如每个模块的写入合并在父阶段中）"""
+    with Instrumentation(trace_memory=trace_memory, quiet=True) as instrumentation:
+        rows, classified_data = xmind_to_rows(xmind_file_path, sheet_name, classify)
+        output_file_path = os.path.join(work_path, f'{backend}-{len(rows)}.xlsx')
+        with stage('template_copy'):
+            shutil.copyfile(TEMPLATE_FILE_PATH, output_file_path)
+        with ConversionSession(output_file_path, get_writer(backend)) as session:
+            session.run(rows, classified_data)
+    stages = {}
+    for record in instrumentation.stages:
+        if record['parent'] is None:
+            stages[record['name']] = {key: record[key] for key in ('seconds', 'peak_mb') if key in record}
+    return len(rows), stages
+
+
+def benchmark(
+    sizes: list = None,
+    modules: int = 4,
+    depth: int = 2,
+    fanout: int = 5,
+    duplicate_exp_ratio: float = 0.1,
+    classify: bool = True,
+    backend: str = 'openpyxl',
+    trace_memory: bool = True
+) -> dict:
+    """生成不同规模的 xmind 文件，统计转换各阶段的耗时和内存峰值
+
+    统计内存时会额外执行一次转换，耗时取不统计内存的那一次，避免 tracemalloc 的开销影响耗时
+
+    Args:
+        sizes (list, optional): 用例规模. Defaults to [1000, 10000, 100000]
+        modules (int, optional): 模块数
+        depth (int, optional): 目录层级数
+        fanout (int, optional): 每个目录下的子目录或功能点数、每个功能点下的用例数
+        duplicate_exp_ratio (float, optional): 有多个 exp 的用例比例
+        classify (bool, optional): 是否分类用例
+        backend (str, optional): 写入器，默认 openpyxl，可在无 Excel/WPS 的 Linux 下运行
+        trace_memory (bool, optional): 是否统计内存峰值
+
+    Returns:
+        dict: 性能测试报告
+    """
+    options = {
+        'modules': modules,
+        'depth': depth,
+        'fanout': fanout,
+        'duplicate_exp_ratio': duplicate_exp_ratio,
+        'classify': classify,
+        'backend': backend
+    }
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'options': options,
+        'results': []
+    }
+    with tempfile.TemporaryDirectory() as work_path:
+        for size in sizes or DEFAULT_SIZES:
+            xmind_file_path = os.path.join(work_path, f'benchmark-{size}.xmind')
+            started = time.perf_counter()
+            sheet_name = generate_xmind(xmind_file_path, size, modules, depth, fanout, duplicate_exp_ratio)[0]
+            result = {
+                'cases': size,
+                'xmind_bytes': os.path.getsize(xmind_file_path),
+                'generate_seconds': round(time.perf_counter() - started, 4)
+            }
+            result['rows'], stages = run_pipeline(xmind_file_path, sheet_name, work_path, classify, backend, False)
+            if trace_memory:
+                _, memory_stages = run_pipeline(xmind_file_path, sheet_name, work_path, classify, backend, True)
+                # parse 和 flatten 在同一次遍历中完成，内存峰值只记录在 flatten
+                for name, record in memory_stages.items():
+                    if 'peak_mb' in record:
+                        stages[name]['peak_mb'] = record['peak_mb']
+            result['stages'] = stages
+            result['total_seconds'] = round(sum(record['seconds'] for record in stages.values()), 4)
+            report['results'].append(result)
+            print_result(result)
+    return report
+
+
+def print_result(result: dict, baseline: dict = None):
+    print(f'用例数: {result["cases"]} 总耗时: {result["total_seconds"]:.2f}s')
+    baseline_stages = baseline['stages'] if baseline else {}
+    for name, record in result['stages'].items():
+        line = f'    {name:<16}{record["seconds"]:>10.3f}s'
+        if 'peak_mb' in record:
+            line += f'{record["peak_mb"]:>10.1f}MB'
+        base_record = baseline_stages.get(name)
+        if base_record and base_record['seconds']:
+            line += f'{record["seconds"] / base_record["seconds"]:>10.2f}x'
+        print(line)
+
+
+def save_report(report: dict, benchmark_path: str = None) -> str:
+    benchmark_path = benchmark_path or BENCHMARK_PATH
+    os.makedirs(benchmark_path, exist_ok=True)
+    file_path = os.path.join(benchmark_path, datetime.now().strftime(r'%Y-%m-%d_%H.%M.%S') + '.json')
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return file_path
+
+
+def latest_report_path(benchmark_path: str = None) -> str:
+    benchmark_path = benchmark_path or BENCHMARK_PATH
+    if not os.path.isdir(benchmark_path):
+        return None
+    names = sorted(name for name in os.listdir(benchmark_path) if name.endswith('.json'))
+    return os.path.join(benchmark_path, names[-1]) if names else None
+
+
+def compare_reports(baseline: dict, report: dict):
+    """按用例规模对比两次性能测试，输出每个阶段相对基准的耗时倍数"""
+    if baseline['options'] != report['options']:
+        print(f'警告: 基准的选项不同 {baseline["options"]}')
+    baseline_results = {result['cases']: result for result in baseline['results']}
+    for result in report['results']:
+        baseline_result = baseline_results.get(result['cases'])
+        if baseline_result:
+            print_result(result, baseline_result)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='XMind 转 Excel 性能测试')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='用例规模')
+    parser.add_argument('--modules', type=int, default=4, help='模块数')
+    parser.add_argument('--depth', type=int, default=2, help='目录层级数')
+    parser.add_argument('--fanout', type=int, default=5, help='每个目录下的子目录或功能点数、每个功能点下的用例数')
+    parser.add_argument('--duplicate-exp-ratio', type=float, default=0.1, help='有多个 exp 的用例比例')
+    parser.add_argument('--no-classify', action='store_true', help='不分类用例')
+    parser.add_argument('--backend', default='openpyxl', help='写入器')
+    parser.add_argument('--no-memory', action='store_true', help='不统计内存峰值')
+    parser.add_argument('--baseline', help='对比的基准报告. Defaults to 上一次的报告')
+    args = parser.parse_args()
+
+    baseline_path = args.baseline or latest_report_path()
+    report = benchmark(
+        args.sizes,
+        args.modules,
+        args.depth,
+        args.fanout,
+        args.duplicate_exp_ratio,
+        not args.no_classify,
+        args.backend,
+        not args.no_memory
+    )
+    print(f'报告路径: {save_report(report)}')
+    if baseline_path:
+        print(f'对比基准: {baseline_path}')
+        with open(baseline_path, encoding='utf-8') as f:
+            compare_reports(json.load(f), report)
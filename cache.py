@@ -0,0 +1,290 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : cache.py
+# @Time    : 2026-10-16 23:12:40
+# @Author  : Kelvin.Ye
+import hashlib
+import os
+import pickle
+import shutil
+
+from schema import DEFAULT_SCHEMA
+from schema import TagSchema
+from transformer import TEMPLATE_FILE_PATH
+from transformer import TOPIC_END
+from transformer import events_to_rows
+from transformer import get_output_file_path
+from transformer import iter_xmind_sheet
+from transformer import rows_to_excel
+
+
+# 缓存目录，相对于当前工作目录
+CACHE_PATH = '.cache'
+
+# 缓存默认最大容量（字节）
+DEFAULT_MAX_SIZE = 512 * 1024 * 1024
+
+# 缓存格式版本，用例数据或 Excel 格式变化时需要修改，使旧缓存失效
+CACHE_VERSION = 4
+
+# 缓存目录中的文件：用例数据、Excel、xmind 文件到缓存项的索引
+CACHE_FILE_EXTS = ('.pickle', '.xlsx', '.key')
+
+
+def file_digest(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def sheet_digest(xmind_file_path: str, xmind_sheet_name: str) -> str:
+    """计算 xmind sheet 页内容的哈希值，只与该 sheet 页的主题树有关，修改其他 sheet 页不影响
+
+    Args:
+        xmind_file_path (str): xmind 文件路径
+        xmind_sheet_name (str): xmind sheet 名称
+
+    Returns:
+        str: sha256
+    """
+    return events_digest(iter_xmind_sheet(xmind_file_path, xmind_sheet_name))
+
+
+def events_digest(events) -> str:
+    """计算主题事件的哈希值，参考 sheet_digest"""
+    return DigestEvents(iter(events)).hexdigest()
+
+
+class DigestEvents:
+    """遍历主题事件的同时计算哈希值，主题事件只需要解析一次，不需要保存
+
+    Usage:
+        events = DigestEvents(iter_xmind_sheet(xmind_file_path, xmind_sheet_name))
+        rows, classified_data = events_to_rows(events)
+        digest = events.hexdigest()
+    """
+
+    def __init__(self, events):
+        self.events = events
+        self.digest = hashlib.sha256()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        event, title = next(self.events)
+        if event == TOPIC_END:
+            self.digest.update(b'\x01')
+        else:
+            self.digest.update(b'\x00' + (title or '').encode('utf-8') + b'\x00')
+        return event, title
+
+    def hexdigest(self) -> str:
+        """所有主题事件的哈希值，未遍历的事件在此时遍历"""
+        for _ in self:
+            pass
+        return self.digest.hexdigest()
+
+
+class ConversionCache:
+    """转换结果的磁盘缓存，key 为 xmind sheet 页内容、模板文件和转换选项的哈希值
+
+    每个缓存项包含用例数据（rows、classified_data）和生成的 Excel，命中时只需复制 Excel，
+    缓存总大小超过上限时按最近使用时间淘汰。
+    另外按 xmind 文件内容的哈希值记录对应的缓存项（.key），xmind 文件没有变化时不需要解析即可命中
+
+    Args:
+        cache_path (str, optional): 缓存目录. Defaults to 项目目录下的 .cache
+        max_size (int, optional): 缓存最大容量（字节）. Defaults to 512MB
+    """
+
+    def __init__(self, cache_path: str = None, max_size: int = DEFAULT_MAX_SIZE):
+        self.cache_path = cache_path or CACHE_PATH
+        self.max_size = max_size
+        os.makedirs(self.cache_path, exist_ok=True)
+
+    def make_key(self, content_digest: str, **options) -> str:
+        """缓存 key
+
+        Args:
+            content_digest (str): sheet 页内容的哈希值（参考 sheet_digest）或 xmind 文件的哈希值
+            options: 模板文件的哈希值和转换选项，xmind 文件的哈希值还需要包括 sheet 页名称
+        """
+        digest = hashlib.sha256()
+        digest.update(f'v{CACHE_VERSION}'.encode('utf-8'))
+        digest.update(content_digest.encode('utf-8'))
+        for name in sorted(options):
+            digest.update(f'{name}={options[name]!r};'.encode('utf-8'))
+        return digest.hexdigest()
+
+    def entry_paths(self, key: str) -> tuple:
+        """缓存项的文件路径：(用例数据, Excel)"""
+        return os.path.join(self.cache_path, f'{key}.pickle'), os.path.join(self.cache_path, f'{key}.xlsx')
+
+    def link(self, file_key: str, key: str):
+        """记录 xmind 文件对应的缓存项"""
+        link_path = os.path.join(self.cache_path, f'{file_key}.key')
+        with open(link_path + '.tmp', 'w', encoding='utf-8') as f:
+            f.write(key)
+        os.replace(link_path + '.tmp', link_path)
+
+    def resolve(self, file_key: str) -> str:
+        """xmind 文件对应的缓存项，没有记录时返回 None"""
+        link_path = os.path.join(self.cache_path, f'{file_key}.key')
+        try:
+            with open(link_path, encoding='utf-8') as f:
+                key = f.read()
+            os.utime(link_path)
+        except FileNotFoundError:
+            return None
+        return key
+
+    def get(self, key: str):
+        """获取缓存项
+
+        Returns:
+            tuple: (rows, classified_data, Excel路径)，未命中时返回 None
+        """
+        data_path, workbook_path = self.entry_paths(key)
+        if not os.path.isfile(data_path) or not os.path.isfile(workbook_path):
+            return None
+        try:
+            with open(data_path, 'rb') as f:
+                rows, classified_data = pickle.load(f)
+        except Exception:
+            # 缓存文件损坏时当作未命中
+            return None
+        # 更新访问时间，用于淘汰最久未使用的缓存项
+        try:
+            os.utime(data_path)
+            os.utime(workbook_path)
+        except FileNotFoundError:
+            # 其他进程淘汰了该缓存项
+            return None
+        return rows, classified_data, workbook_path
+
+    def put(self, key: str, rows: list, classified_data: dict, workbook_path: str):
+        data_path, cached_workbook_path = self.entry_paths(key)
+        # 先写临时文件再替换，避免并发转换时读到不完整的缓存
+        with open(data_path + '.tmp', 'wb') as f:
+            pickle.dump((rows, classified_data), f, protocol=pickle.HIGHEST_PROTOCOL)
+        shutil.copyfile(workbook_path, cached_workbook_path + '.tmp')
+        os.replace(cached_workbook_path + '.tmp', cached_workbook_path)
+        os.replace(data_path + '.tmp', data_path)
+        self.evict()
+
+    def evict(self):
+        """缓存总大小超过上限时，按最近使用时间从旧到新删除缓存项
+
+        批量转换时多个进程可能同时淘汰，文件已被其他进程删除时跳过
+        """
+        entries = {}
+        for name in os.listdir(self.cache_path):
+            key, ext = os.path.splitext(name)
+            if ext not in CACHE_FILE_EXTS:
+                continue
+            path = os.path.join(self.cache_path, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            size, used, paths = entries.get(key, (0, 0, []))
+            entries[key] = (size + stat.st_size, max(used, stat.st_mtime), paths + [path])
+        total_size = sum(size for size, _, _ in entries.values())
+        for size, _, paths in sorted(entries.values(), key=lambda entry: entry[1]):
+            if total_size <= self.max_size:
+                break
+            for path in paths:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            total_size -= size
+
+    def clear(self):
+        shutil.rmtree(self.cache_path, ignore_errors=True)
+        os.makedirs(self.cache_path, exist_ok=True)
+
+
+def cached_xmind_to_excel(
+    xmind_file_path: str,
+    xmind_sheet_name: str,
+    classify: bool = False,
+    backend: str = 'openpyxl',
+    spec: str = None,
+    output_name: str = None,
+    use_cache: bool = True,
+    cache: ConversionCache = None,
+    analysis_mode: str = 'formula',
+    schema: TagSchema = None
+) -> tuple:
+    """带缓存的 XMind 转 Excel，xmind sheet 页、模板和选项都没有变化时直接复制缓存的 Excel
+
+    Args:
+        xmind_file_path (str): xmind文件路径
+        xmind_sheet_name (str): xmind文件sheet页名称
+        classify (bool, optional): 是否分类用例
+        backend (str, optional): 写入器，openpyxl（无需 Excel/WPS）或 xlwings
+        spec (str, optional): MacOS下 excelApp 的名称，仅 xlwings 有效
+        output_name (str, optional): 输出文件名称（需要文件后缀）. Defaults to [testcase]{sheet页名称}.xlsx
+        use_cache (bool, optional): 是否使用缓存，为 False 时重新转换并刷新缓存
+        cache (ConversionCache, optional): 缓存实例. Defaults to 默认目录的缓存
+        analysis_mode (str, optional): 数据统计的计算方式，参考 ANALYSIS_MODES
+        schema (TagSchema, optional): 标签定义. Defaults to DEFAULT_SCHEMA
+
+    Returns:
+        tuple: (rows, classified_data, Excel路径)
+    """
+    cache = cache or ConversionCache()
+    schema = schema or DEFAULT_SCHEMA
+    output_name = output_name or f'[testcase]{xmind_sheet_name}.xlsx'
+    options = {
+        'template': file_digest(TEMPLATE_FILE_PATH),
+        'classify': classify,
+        'backend': backend,
+        'analysis_mode': analysis_mode,
+        'schema': schema.digest()
+    }
+    # xmind 文件没有变化时不需要解析
+    file_key = cache.make_key(file_digest(xmind_file_path), sheet=xmind_sheet_name, **options)
+    if use_cache:
+        cached = copy_cached_workbook(cache, cache.resolve(file_key), output_name)
+        if cached:
+            return cached
+
+    # xmind 文件有变化时只解析一次，解析的同时计算 sheet 页内容的哈希值，只有其他 sheet 页变化时仍能命中
+    events = DigestEvents(iter_xmind_sheet(xmind_file_path, xmind_sheet_name))
+    rows, classified_data = events_to_rows(events, classify, schema)
+    key = cache.make_key(events.hexdigest(), **options)
+    if use_cache:
+        cached = copy_cached_workbook(cache, key, output_name)
+        if cached:
+            cache.link(file_key, key)
+            return cached
+
+    output_file_path = rows_to_excel(rows, classified_data, output_name, backend, spec, analysis_mode, schema)
+    cache.put(key, rows, classified_data, output_file_path)
+    cache.link(file_key, key)
+    return rows, classified_data, output_file_path
+
+
+def copy_cached_workbook(cache: ConversionCache, key: str, output_name: str) -> tuple:
+    """复制缓存的 Excel 至 output 目录
+
+    Returns:
+        tuple: (rows, classified_data, Excel路径)，未命中或缓存项已被其他进程淘汰时返回 None
+    """
+    cached = cache.get(key) if key else None
+    if cached is None:
+        return None
+    rows, classified_data, cached_workbook_path = cached
+    output_file_path = get_output_file_path(os.path.splitext(output_name)[0] + '.xlsx')
+    try:
+        shutil.copyfile(cached_workbook_path, output_file_path)
+    except FileNotFoundError:
+        return None
+    print(f'命中缓存，总计 {len(rows)} 条用例')
+    print(f'Excel路径: {output_file_path}')
+    return rows, classified_data, output_file_path
@@ -0,0 +1,301 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : cli.py
+# @Time    : 2026-10-16 23:55:36
+# @Author  : Kelvin.Ye
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from instrument import Instrumentation
+from instrument import current
+from schema import load_schema
+
+
+# 输出格式：xlsx 通过写入器生成 Excel，其他格式不经过 Excel 模板，参考 exporter.EXPORTERS
+FORMAT_EXTENSIONS = {
+    'xlsx': '.xlsx',
+    'csv': '.csv',
+    'jsonl': '.jsonl',
+    'tapd': '.csv'
+}
+
+# 标准输入输出
+STDIO = '-'
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='xmind2excel',
+        description='XMind 测试用例转换为 Excel、CSV、JSON Lines 或 TAPD 导入格式'
+    )
+    parser.add_argument('inputs', nargs='+', metavar='INPUT', help='xmind 文件、目录、通配符，- 表示从标准输入读取')
+    parser.add_argument(
+        '-s', '--sheet', action='append', dest='sheets', metavar='SHEET', help='sheet 页名称或通配符，可重复，默认所有 sheet 页'
+    )
+    parser.add_argument('-c', '--classify', action='store_true', help='按 module 分类用例')
+    parser.add_argument(
+        '-o', '--output', metavar='PATH', help='输出文件路径，多个 sheet 页时为目录，- 表示输出至标准输出. 默认 output 目录'
+    )
+    parser.add_argument('-f', '--format', choices=list(FORMAT_EXTENSIONS), default='xlsx', help='输出格式. 默认 xlsx')
+    parser.add_argument('-b', '--backend', choices=['openpyxl', 'xlwings'], default='openpyxl', help='Excel 写入器')
+    parser.add_argument('--spec', help='MacOS下 excelApp 的名称，仅 xlwings 有效. e.g.: wpsoffice')
+    parser.add_argument(
+        '--analysis-mode', choices=['formula', 'range', 'static'], default='formula', help='数据统计的计算方式'
+    )
+    parser.add_argument('--schema', metavar='PATH', help='标签定义的 JSON 文件，与默认的标签定义合并，参考 schema.load_schema')
+    parser.add_argument('--split', action='store_true', help='按 module 拆分为多个文件，仅 csv、jsonl、tapd 有效')
+    parser.add_argument('--force', action='store_true', help='拆分时覆盖 output 目录下已存在的文件')
+    parser.add_argument('--check', action='store_true', help='只校验 xmind 用例格式，不输出文件')
+    parser.add_argument('-j', '--workers', type=int, default=1, help='并行转换的进程数，0 为 CPU 核数. 默认 1')
+    parser.add_argument('-q', '--quiet', action='store_true', help='只输出错误')
+    parser.add_argument('--progress', type=float, default=2.0, metavar='SECONDS', help='进度输出间隔. 默认 2 秒')
+    parser.add_argument('--report', metavar='PATH', help='各阶段耗时的 JSON 报告路径')
+    return parser
+
+
+def find_inputs(inputs: list, stdin_file_path: str) -> list:
+    """查找输入的 xmind 文件，- 替换为保存标准输入的临时文件"""
+    from batch import find_xmind_files
+
+    xmind_file_paths = []
+    for source in inputs:
+        if source == STDIO:
+            xmind_file_paths.append(stdin_file_path)
+            continue
+        found = find_xmind_files(source)
+        if not found:
+            raise Exception(f'{source} 不存在 xmind 文件')
+        xmind_file_paths.extend(found)
+    return xmind_file_paths
+
+
+def plan_jobs(xmind_file_paths: list, sheet_selectors: list, fmt: str, output: str) -> list:
+    """确定每个 sheet 页的转换任务
+
+    Returns:
+        list: [(xmind文件路径, sheet页名称, 输出路径)]，输出路径为 None 时输出至 output 目录
+    """
+    from batch import select_sheet_names
+    from transformer import get_xmind_sheet_names
+
+    pairs = []
+    for xmind_file_path in xmind_file_paths:
+        sheet_names = select_sheet_names(get_xmind_sheet_names(xmind_file_path), sheet_selectors)
+        if not sheet_names:
+            raise Exception(f'{xmind_file_path} sheet页:[ {", ".join(sheet_selectors or [])} ] 不存在')
+        pairs.extend((xmind_file_path, sheet_name) for sheet_name in sheet_names)
+
+    if output is None or output == STDIO:
+        if output == STDIO and len(pairs) > 1 and fmt != 'jsonl':
+            raise Exception('输出至标准输出时只能转换一个 sheet 页（jsonl 除外）')
+        return [(xmind_file_path, sheet_name, output) for xmind_file_path, sheet_name in pairs]
+    # 一个 sheet 页时输出至指定文件，多个 sheet 页时输出至指定目录
+    is_dir = os.path.isdir(output) or output.endswith(('/', os.sep))
+    if len(pairs) == 1 and not is_dir:
+        return [(pairs[0][0], pairs[0][1], output)]
+    if not is_dir and os.path.splitext(output)[1]:
+        raise Exception(f'转换 {len(pairs)} 个 sheet 页时输出路径需为目录，e.g.: {os.path.dirname(output) or "."}/')
+    os.makedirs(output, exist_ok=True)
+    jobs = []
+    for xmind_file_path, sheet_name in pairs:
+        xmind_name = os.path.splitext(os.path.basename(xmind_file_path))[0]
+        file_name = f'{xmind_name}-{sheet_name}{FORMAT_EXTENSIONS[fmt]}'
+        jobs.append((xmind_file_path, sheet_name, os.path.join(output, file_name)))
+    return jobs
+
+
+def open_stdout():
+    """标准输出的二进制流，输出数据时其他信息重定向至标准错误"""
+    return sys.__stdout__.buffer
+
+
+def stage_rows(instrumentation: Instrumentation, name: str) -> int:
+    """最近一次名称为 name 的阶段记录的行数"""
+    for record in reversed(instrumentation.stages):
+        if record['name'] == name:
+            return record.get('rows', 0)
+    return 0
+
+
+def convert(xmind_file_path: str, xmind_sheet_name: str, target: str, options: dict) -> int:
+    """转换一个 sheet 页
+
+    Args:
+        xmind_file_path (str): xmind文件路径
+        xmind_sheet_name (str): xmind文件sheet页名称
+        target (str): 输出路径，None 时输出至 output 目录，- 时输出至标准输出
+        options (dict): 命令行参数
+
+    Returns:
+        int: 用例数
+    """
+    from transformer import get_output_file_path
+    from transformer import xmind_to_rows
+
+    fmt = options['format']
+    if options['check']:
+        rows, _ = xmind_to_rows(xmind_file_path, xmind_sheet_name, options['classify'], options['schema'])
+        return len(rows)
+
+    if fmt != 'xlsx':
+        from exporter import export_rows
+        from exporter import export_xmind
+        from exporter import iter_xmind_rows
+        if target == STDIO:
+            stream = io.TextIOWrapper(open_stdout(), encoding='utf-8', newline='', write_through=True)
+            try:
+                rows = iter_xmind_rows(xmind_file_path, xmind_sheet_name, options['schema'])
+                return export_rows(rows, fmt, stream, options['schema'])
+            finally:
+                stream.detach()
+        # 指定了输出路径时覆盖，output 目录下已存在的文件只有 --force 时覆盖
+        overwrite = target is not None or options['force']
+        if target is None:
+            xmind_name = os.path.splitext(os.path.basename(xmind_file_path))[0]
+            target = get_output_file_path(f'[testcase]{xmind_name}-{xmind_sheet_name}{FORMAT_EXTENSIONS[fmt]}')
+        export_xmind(xmind_file_path, xmind_sheet_name, fmt, options['split'], target, options['schema'], overwrite)
+        return stage_rows(current(), f'export:{fmt}')
+
+    from transformer import get_writer
+    from transformer import rows_to_excel
+    from transformer import write_excel
+    rows, classified_data = xmind_to_rows(xmind_file_path, xmind_sheet_name, options['classify'], options['schema'])
+    if target is None:
+        xmind_name = os.path.splitext(os.path.basename(xmind_file_path))[0]
+        output_name = f'[testcase]{xmind_name}-{xmind_sheet_name}.xlsx'
+        rows_to_excel(
+            rows,
+            classified_data,
+            output_name,
+            options['backend'],
+            options['spec'],
+            options['analysis_mode'],
+            options['schema']
+        )
+        return len(rows)
+    # 先写入临时文件，成功后再移动或输出，失败时不会留下不完整的文件
+    with tempfile.TemporaryDirectory() as work_path:
+        temp_file_path = os.path.join(work_path, 'output.xlsx')
+        writer = get_writer(options['backend'], options['spec'], options['schema'])
+        write_excel(rows, classified_data, temp_file_path, writer, options['analysis_mode'])
+        if target == STDIO:
+            with open(temp_file_path, 'rb') as f:
+                shutil.copyfileobj(f, open_stdout())
+            open_stdout().flush()
+        else:
+            shutil.move(temp_file_path, target)
+            print(f'输出路径: {target}')
+    return len(rows)
+
+
+def run_job(xmind_file_path: str, xmind_sheet_name: str, target: str, options: dict) -> dict:
+    """执行一个转换任务，可在子进程中执行，异常记录在结果中，不向上抛出"""
+    result = {'file': xmind_file_path, 'sheet': xmind_sheet_name, 'cases': 0, 'error': None, 'stages': []}
+    # 输出至标准输出时，其他信息输出至标准错误，避免混入数据
+    if options['quiet']:
+        log = open(os.devnull, 'w', encoding='utf-8')
+    else:
+        log = sys.stderr if options['output'] == STDIO else sys.stdout
+    started = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(log):
+            with Instrumentation(progress_interval=options['progress'], quiet=options['quiet']) as instrumentation:
+                result['cases'] = convert(xmind_file_path, xmind_sheet_name, target, options)
+    except Exception as e:
+        result['error'] = f'{type(e).__name__}: {e}'
+    finally:
+        if options['quiet']:
+            log.close()
+    result['seconds'] = time.perf_counter() - started
+    result['stages'] = instrumentation.stages
+    return result
+
+
+def run_jobs(jobs: list, options: dict) -> list:
+    """执行转换任务，多个任务且进程数不为 1 时使用进程池并行执行，结果保持任务顺序"""
+    if len(jobs) > 1 and options['workers'] != 1:
+        from batch import iter_pool_results
+
+        results = [None] * len(jobs)
+        pool_jobs = [(*job, options) for job in jobs]
+        for index, result, error in iter_pool_results(run_job, pool_jobs, options['workers'] or None):
+            if error:
+                xmind_file_path, sheet_name, _ = jobs[index]
+                result = {
+                    'file': xmind_file_path, 'sheet': sheet_name, 'cases': 0, 'error': error, 'seconds': 0.0, 'stages': []
+                }
+            results[index] = result
+        return results
+    return [run_job(*job, options) for job in jobs]
+
+
+def save_report(results: list, file_path: str, started: float):
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'total_seconds': round(time.perf_counter() - started, 4),
+        'jobs': [
+            {key: result[key] for key in ('file', 'sheet', 'cases', 'error', 'stages')} for result in results
+        ]
+    }
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def main(argv: list = None) -> int:
+    """命令行入口
+
+    Returns:
+        int: 退出码，全部成功时为 0，存在失败时为 1，参数错误时为 2
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    options = vars(args)
+    if args.split and args.format == 'xlsx':
+        parser.error('--split 仅支持 csv、jsonl、tapd 格式')
+    if args.split and args.output == STDIO:
+        parser.error('--split 不支持输出至标准输出')
+    if args.inputs.count(STDIO) > 1:
+        parser.error('标准输入只能读取一次')
+    # 输出至标准输出时，汇总信息输出至标准错误
+    log = sys.stderr if args.output == STDIO else sys.stdout
+
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory() as work_path:
+        stdin_file_path = os.path.join(work_path, 'stdin.xmind')
+        if STDIO in args.inputs:
+            with open(stdin_file_path, 'wb') as f:
+                shutil.copyfileobj(sys.stdin.buffer, f)
+        try:
+            options['schema'] = load_schema(args.schema) if args.schema else None
+            xmind_file_paths = find_inputs(args.inputs, stdin_file_path)
+            jobs = plan_jobs(xmind_file_paths, args.sheets, args.format, args.output)
+        except Exception as e:
+            print(f'[失败] {type(e).__name__}: {e}', file=sys.stderr)
+            return 1
+        results = run_jobs(jobs, options)
+
+    for result in results:
+        status = '失败' if result['error'] else '成功'
+        if result['error'] or not args.quiet:
+            print(
+                f'[{status}] {result["file"]} sheet页:[ {result["sheet"]} ] '
+                f'用例数: {result["cases"]} 耗时: {result["seconds"]:.2f}s',
+                file=sys.stderr if result['error'] else log
+            )
+        if result['error']:
+            print(f'    {result["error"]}', file=sys.stderr)
+    if args.report:
+        save_report(results, args.report, started)
+    return 1 if any(result['error'] for result in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
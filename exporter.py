@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : exporter.py
+# @Time    : 2026-10-16 23:42:17
+# @Author  : Kelvin.Ye
+import csv
+import json
+import os
+import re
+
+from instrument import progress
+from instrument import stage
+from schema import DEFAULT_SCHEMA
+from schema import DEFAULT_TESTCASE_TYPE
+from schema import TagSchema
+from transformer import Testcase
+from transformer import create_metadata
+from transformer import get_output_file_path
+from transformer import iter_rows
+from transformer import iter_xmind_sheet
+from transformer import read_root_name
+
+
+class CsvExporter:
+    """CSV，列与标签定义中写入 Excel 的列一致，参考 TagSchema.columns"""
+
+    extension = '.csv'
+    # Excel 打开 CSV 时需要 BOM 才能识别为 UTF-8
+    encoding = 'utf-8-sig'
+
+    def __init__(self, file, schema: TagSchema = None):
+        self.schema = schema or DEFAULT_SCHEMA
+        self.writer = csv.writer(file)
+        columns = self.schema.columns()
+        self.getters = [self.schema.getter(name) for _, name in columns]
+        self.writer.writerow([header for header, _ in columns])
+
+    def write(self, module: str, row: Testcase):
+        self.writer.writerow([getter(row) for getter in self.getters])
+
+
+class TapdExporter(CsvExporter):
+    """TAPD 测试用例导入格式，功能点作为用例目录的最后一级，用例类型、优先级和负责人对应 TAPD 的同名字段"""
+
+    header = ['用例目录', '用例名称', '需求ID', '前置条件', '用例步骤', '预期结果', '用例类型', '用例状态', '用例等级', '创建人']
+
+    def __init__(self, file, schema: TagSchema = None):
+        self.schema = schema or DEFAULT_SCHEMA
+        self.writer = csv.writer(file)
+        self.writer.writerow(self.header)
+        self.get_type = self.schema.getter('type', DEFAULT_TESTCASE_TYPE)
+        self.get_priority = self.schema.getter('priority')
+        self.get_owner = self.schema.getter('owner')
+
+    def write(self, module: str, row: Testcase):
+        directory = row.path + '-' + row.func if row.func else row.path
+        self.writer.writerow([
+            directory,
+            row.title,
+            '',
+            row.pre,
+            row.step,
+            row.exp,
+            self.get_type(row) or DEFAULT_TESTCASE_TYPE,
+            '正常',
+            self.get_priority(row) or '中',
+            self.get_owner(row) or ''
+        ])
+
+
+class JsonlExporter:
+    """JSON Lines，每行一条用例，字段与用例数据一致，另外包含 module 和基础标签之外的标签"""
+
+    extension = '.jsonl'
+    encoding = 'utf-8'
+
+    def __init__(self, file, schema: TagSchema = None):
+        self.schema = schema or DEFAULT_SCHEMA
+        self.file = file
+
+    def write(self, module: str, row: Testcase):
+        data = {'module': module, **row.to_dict(), **self.schema.extra_dict(row)}
+        self.file.write(json.dumps(data, ensure_ascii=False) + '\n')
+
+
+# 导出格式，key 为 export_xmind 的 fmt 参数
+EXPORTERS = {
+    'csv': CsvExporter,
+    'jsonl': JsonlExporter,
+    'tapd': TapdExporter
+}
+
+
+def get_exporter_class(fmt: str):
+    exporter_class = EXPORTERS.get(fmt)
+    if exporter_class is None:
+        raise Exception(f'导出格式:[ {fmt} ] 不存在')
+    return exporter_class
+
+
+def iter_xmind_rows(xmind_file_path: str, xmind_sheet_name: str, schema: TagSchema = None):
+    """流式解析 XMind，逐个返回用例，参考 iter_rows
+
+    Yields:
+        tuple: (module, row)
+    """
+    events = iter_xmind_sheet(xmind_file_path, xmind_sheet_name)
+    root_name = read_root_name(events)
+    yield from iter_rows(events, create_metadata(root_name, schema), schema)
+
+
+def export_rows(rows, fmt: str, file, schema: TagSchema = None) -> int:
+    """用例写入已打开的文件，e.g.: sys.stdout
+
+    Args:
+        rows: (module, row) 的迭代器，参考 iter_xmind_rows
+        fmt (str): 导出格式，参考 EXPORTERS
+        file: 文本文件对象，CSV 需要以 newline='' 打开
+        schema (TagSchema, optional): 标签定义，需要与解析用例时一致. Defaults to DEFAULT_SCHEMA
+
+    Returns:
+        int: 用例数
+    """
+    exporter = get_exporter_class(fmt)(file, schema)
+    count = 0
+    for module, row in rows:
+        exporter.write(module, row)
+        count += 1
+    return count
+
+
+def safe_file_name(name: str) -> str:
+    """替换文件名称中不允许的字符"""
+    return re.sub(r'[\\/:*?"<>|\r\n]', '_', name)
+
+
+def export_xmind(
+    xmind_file_path: str,
+    xmind_sheet_name: str,
+    fmt: str = 'csv',
+    split: bool = False,
+    output_file_path: str = None,
+    schema: TagSchema = None,
+    overwrite: bool = None
+) -> list:
+    """XMind 直接导出为 CSV、JSON Lines 或 TAPD 导入格式，不经过 Excel 模板，结果输出至 output 目录
+
+    边解析边写入，只缓存根主题当前子主题下的用例；主题格式错误时不会留下不完整的文件
+
+    Args:
+        xmind_file_path (str): xmind文件路径
+        xmind_sheet_name (str): xmind文件sheet页名称
+        fmt (str, optional): 导出格式，csv、jsonl 或 tapd
+        split (bool, optional): 是否按 module 拆分为多个文件，与分类用例时的 sheet 页一致
+        output_file_path (str, optional): 导出文件路径，拆分时为文件名前缀，e.g.: out.csv → out-模块A.csv.
+            Defaults to output 目录下的 [testcase]{sheet页名称}.{格式后缀}
+        schema (TagSchema, optional): 标签定义. Defaults to DEFAULT_SCHEMA
+        overwrite (bool, optional): 拆分时是否覆盖已存在的文件. Defaults to 指定了导出路径时覆盖
+
+    Returns:
+        list: 导出的文件路径
+    """
+    exporter_class = get_exporter_class(fmt)
+    base_file_path = output_file_path or get_output_file_path(
+        f'[testcase]{safe_file_name(xmind_sheet_name)}{exporter_class.extension}'
+    )
+    base_name, extension = os.path.splitext(base_file_path)
+    if overwrite is None:
+        overwrite = output_file_path is not None
+    # key 为 module（不拆分时为 None），value 为 (文件路径, 文件对象, 导出器)
+    outputs = {}
+
+    def get_exporter(module):
+        key = module if split else None
+        output = outputs.get(key)
+        if output is None:
+            file_path = base_file_path
+            if split:
+                file_path = f'{base_name}-{safe_file_name(module) or "未分类"}{extension}'
+                if not overwrite and os.path.exists(file_path):
+                    raise Exception(f'{file_path} 文件已存在')
+            # 先写临时文件，全部成功后再改名
+            file = open(file_path + '.tmp', 'w', encoding=exporter_class.encoding, newline='')
+            output = (file_path, file, exporter_class(file, schema))
+            outputs[key] = output
+        return output[2]
+
+    count = 0
+    succeeded = False
+    try:
+        with stage(f'export:{fmt}') as record:
+            for module, row in iter_xmind_rows(xmind_file_path, xmind_sheet_name, schema):
+                get_exporter(module).write(module, row)
+                count += 1
+                if count % 1000 == 0:
+                    progress(f'export:[{xmind_sheet_name}]', count)
+            record['rows'] = count
+        succeeded = True
+    finally:
+        for file_path, file, _ in outputs.values():
+            file.close()
+            if succeeded:
+                os.replace(file_path + '.tmp', file_path)
+            else:
+                os.remove(file_path + '.tmp')
+
+    file_paths = [file_path for file_path, _, _ in outputs.values()]
+    print(f'XMind 导出完成，总计 {count} 条用例')
+    for file_path in file_paths:
+        print(f'导出路径: {file_path}')
+    return file_paths
+
+
+if __name__ == '__main__':
+    xmind_file_path = r'xxx'
+    xmind_sheet_name = 'xxx'
+    export_xmind(xmind_file_path, xmind_sheet_name, 'csv')
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : generator.py
+# @Time    : 2026-10-16 23:20:31
+# @Author  : Kelvin.Ye
+import json
+import random
+import zipfile
+
+
+# 模块名称中的终端，决定模块 sheet 页保留的实际结果列
+MODULE_TERMINALS = ['', 'APP', 'H5', 'APP-H5']
+
+
+class TopicFactory:
+    """生成 XMind Zen 格式的主题，主题 id 递增"""
+
+    def __init__(self):
+        self.count = 0
+
+    def topic(self, title: str, children: list = None) -> dict:
+        self.count += 1
+        topic = {'id': f'topic-{self.count}', 'title': title}
+        if children:
+            topic['children'] = {'attached': children}
+        return topic
+
+
+def case_positions(index: int, depth: int, fanout: int) -> tuple:
+    """计算模块内第 index 条用例所在的目录、功能点和用例位置
+
+    每个功能点下 fanout 条用例，每个目录下 fanout 个功能点或子目录，最上层目录的数量不限
+
+    Returns:
+        tuple: (目录序号列表, 功能点序号, 用例序号)
+    """
+    title_index = index % fanout
+    index //= fanout
+    func_index = index % fanout
+    index //= fanout
+    path_indexes = []
+    for _ in range(depth - 1):
+        path_indexes.append(index % fanout)
+        index //= fanout
+    path_indexes.append(index)
+    return list(reversed(path_indexes)), func_index, title_index
+
+
+def generate_case(factory: TopicFactory, rng: random.Random, number: int, duplicate_exp_ratio: float) -> dict:
+    """生成一条用例的主题：title → [pre → step →] exp，按比例生成多个 exp（合并为一条用例的多个预期结果）"""
+    exp_count = rng.randint(2, 3) if rng.random() < duplicate_exp_ratio else 1
+    exps = [factory.topic(f'exp: 用例{number}的预期结果{i + 1}') for i in range(exp_count)]
+    if rng.random() < 0.3:
+        step = factory.topic(f'step: 用例{number}的测试步骤', exps)
+        children = [factory.topic(f'pre: 用例{number}的前置条件', [step])]
+    else:
+        children = exps
+    return factory.topic(f'title: 用例{number}', children)
+
+
+def generate_sheet_topics(
+    cases: int,
+    modules: int = 4,
+    depth: int = 2,
+    fanout: int = 5,
+    duplicate_exp_ratio: float = 0.1,
+    seed: int = 0
+) -> list:
+    """生成一个 xmind sheet 页根主题下的模块主题
+
+    Args:
+        cases (int): 用例数
+        modules (int, optional): 模块数，用例按顺序轮流分配到各个模块
+        depth (int, optional): 目录（path）层级数
+        fanout (int, optional): 每个目录下的子目录或功能点数、每个功能点下的用例数
+        duplicate_exp_ratio (float, optional): 有多个 exp 的用例比例
+        seed (int, optional): 随机数种子，相同参数和种子生成的内容相同
+
+    Returns:
+        list: 模块主题
+    """
+    if cases < 1 or modules < 1 or depth < 1 or fanout < 1:
+        raise Exception('用例数、模块数、目录层级数和扇出数必须大于 0')
+    rng = random.Random(seed)
+    factory = TopicFactory()
+    # 主题树的中间节点，key 为主题标题，保持插入顺序
+    trees = []
+    for module_index in range(min(modules, cases)):
+        terminal = MODULE_TERMINALS[module_index % len(MODULE_TERMINALS)]
+        trees.append((f'module: {terminal}模块{module_index + 1}', {}))
+
+    for number in range(cases):
+        _, node = trees[number % len(trees)]
+        path_indexes, func_index, _ = case_positions(number // len(trees), depth, fanout)
+        for level, path_index in enumerate(path_indexes):
+            node = node.setdefault(f'path: 目录{level + 1}-{path_index + 1}', {})
+        node.setdefault(f'func: 功能点{func_index + 1}', []).append(
+            generate_case(factory, rng, number + 1, duplicate_exp_ratio)
+        )
+
+    def build(title, node):
+        if isinstance(node, list):
+            return factory.topic(title, node)
+        return factory.topic(title, [build(child_title, child) for child_title, child in node.items()])
+
+    return [build(title, node) for title, node in trees]
+
+
+def generate_xmind(
+    file_path: str,
+    cases: int = 1000,
+    modules: int = 4,
+    depth: int = 2,
+    fanout: int = 5,
+    duplicate_exp_ratio: float = 0.1,
+    sheets: int = 1,
+    seed: int = 0
+) -> list:
+    """生成 XMind Zen 格式的测试用例文件，用于性能测试
+
+    Args:
+        file_path (str): xmind 文件路径
+        cases (int, optional): 每个 sheet 页的用例数
+        modules (int, optional): 每个 sheet 页的模块数
+        depth (int, optional): 目录（path）层级数
+        fanout (int, optional): 每个目录下的子目录或功能点数、每个功能点下的用例数
+        duplicate_exp_ratio (float, optional): 有多个 exp 的用例比例
+        sheets (int, optional): sheet 页数，名称为 sheet1、sheet2...
+        seed (int, optional): 随机数种子
+
+    Returns:
+        list: sheet 页名称
+    """
+    content = []
+    for sheet_index in range(sheets):
+        sheet_name = f'sheet{sheet_index + 1}'
+        topics = generate_sheet_topics(cases, modules, depth, fanout, duplicate_exp_ratio, seed + sheet_index)
+        content.append({
+            'id': f'sheet-{sheet_index + 1}',
+            'class': 'sheet',
+            'title': sheet_name,
+            'rootTopic': {
+                'id': f'root-{sheet_index + 1}',
+                'class': 'topic',
+                'title': f'版本号{sheet_index + 1}',
+                'children': {'attached': topics}
+            }
+        })
+
+    with zipfile.ZipFile(file_path, 'w', zipfile.ZIP_DEFLATED) as xmind:
+        xmind.writestr('content.json', json.dumps(content, ensure_ascii=False))
+        xmind.writestr('metadata.json', '{}')
+        xmind.writestr('manifest.json', json.dumps({'file-entries': {'content.json': {}, 'metadata.json': {}}}))
+    return [sheet['title'] for sheet in content]
+
+
+if __name__ == '__main__':
+    xmind_file_path = r'xxx'
+    generate_xmind(xmind_file_path, cases=10000)
@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : incremental.py
+# @Time    : 2026-10-16 23:16:05
+# @Author  : Kelvin.Ye
+from schema import MODULE_SHEET_FIELDS
+from schema import TagSchema
+from transformer import ANALYSIS_SHEET_NAME
+from transformer import TEMPLATE_SHEET_NAME
+from transformer import TESTCASE_SHEET_NAME
+from transformer import ConversionSession
+from transformer import get_writer
+from transformer import testcase_to_values
+from transformer import xmind_to_rows
+
+
+# 用例的唯一标识：目录、功能点、用例名称
+KEY_FIELDS = ('path', 'func', 'title')
+
+
+def get_key_columns(sheet_name: str, fields: list) -> tuple:
+    """用例的唯一标识所在的列（从 0 开始），模块 sheet 页的用例目录为 module_path"""
+    columns = []
+    for field in KEY_FIELDS:
+        for name in (field, MODULE_SHEET_FIELDS.get(field)):
+            if name in fields:
+                columns.append(fields.index(name))
+                break
+        else:
+            raise Exception(f'sheet页:[ {sheet_name} ] 缺少字段:[ {field} ] 对应的列')
+    return tuple(columns)
+
+
+def testcase_key(values: list, key_columns: tuple) -> tuple:
+    return tuple(normalize_value(values[column]) for column in key_columns)
+
+
+def normalize_value(value) -> str:
+    return '' if value is None else str(value)
+
+
+def group_consecutive(rownums: list) -> list:
+    """连续的行号合并为 (起始行号, 行数)，从后往前排列"""
+    groups = []
+    for rownum in sorted(rownums, reverse=True):
+        if groups and groups[-1][0] == rownum + 1:
+            groups[-1] = (rownum, groups[-1][1] + 1)
+        else:
+            groups.append((rownum, 1))
+    return groups
+
+
+def update_sheet(writer, sheet_name: str, rows: list, module: bool = False) -> dict:
+    """按 (目录, 功能点, 用例名称) 对比 sheet 页已有的用例，只删除、修改和插入有变化的行
+
+    写入的列由写入器的标签定义按表头确定，已有用例的行保持不动，执行结果等没有对应标签的列不受影响
+
+    Args:
+        writer: 已打开工作簿的写入器
+        sheet_name (str): sheet 页名称
+        rows (list): 最新的测试用例数据
+        module (bool, optional): 是否为模块 sheet 页，参考 TagSchema.sheet_fields
+
+    Returns:
+        dict: 新增、删除、修改和未变化的用例数
+    """
+    summary = {'added': 0, 'removed': 0, 'updated': 0, 'unchanged': 0}
+    fields = writer.sheet_fields(sheet_name, module)
+    key_columns = get_key_columns(sheet_name, fields)
+    # 只对比有对应字段的列
+    compared_columns = [column for column, field in enumerate(fields) if field is not None]
+    new_values = testcase_to_values(rows, fields, writer.schema)
+    new_keys = {testcase_key(values, key_columns) for values in new_values}
+
+    # 删除已不存在或重复的用例，空行保留
+    existing = writer.read_values(sheet_name, max_column=len(fields))
+    seen = set()
+    removed_rownums = []
+    for index, values in enumerate(existing):
+        key = testcase_key(values, key_columns)
+        if key == ('', '', ''):
+            continue
+        if key not in new_keys or key in seen:
+            removed_rownums.append(index + 2)
+        seen.add(key)
+    for rownum, amount in group_consecutive(removed_rownums):
+        writer.delete_rows(sheet_name, rownum, amount)
+        del existing[rownum - 2:rownum - 2 + amount]
+    summary['removed'] = len(removed_rownums)
+
+    # 修改有变化的单元格，新增的用例插入到前一条已有用例的后面
+    positions = {testcase_key(values, key_columns): index for index, values in enumerate(existing)}
+    inserts = []
+    last_position = -1
+    for values, row in zip(new_values, rows):
+        position = positions.get(testcase_key(values, key_columns))
+        if position is None:
+            if inserts and inserts[-1][0] == last_position + 1:
+                inserts[-1][1].append(row)
+            else:
+                inserts.append((last_position + 1, [row]))
+            continue
+        last_position = position
+        changed = False
+        for column in compared_columns:
+            value = values[column]
+            if normalize_value(existing[position][column]) != normalize_value(value):
+                writer.write_cell(sheet_name, position + 2, column + 1, value)
+                changed = True
+        summary['updated' if changed else 'unchanged'] += 1
+    # 从后往前插入，前面的行号不受影响
+    for position, inserted_rows in reversed(inserts):
+        writer.insert_testcase(sheet_name, position + 2, inserted_rows, fields)
+        summary['added'] += len(inserted_rows)
+    return summary
+
+
+def update_excel_by_xmind(
+    excel_file_path: str,
+    xmind_file_path: str,
+    xmind_sheet_name: str,
+    backend: str = 'openpyxl',
+    spec: str = None,
+    analysis_mode: str = 'formula',
+    schema: TagSchema = None
+) -> dict:
+    """增量更新已有的 Excel，只修改有变化的用例和模块 sheet 页，保留已填写的执行结果
+
+    Excel 中存在模板页时视为未分类的 Excel，只更新测试用例 sheet 页；
+    否则同时更新模块 sheet 页，模块有增减时重写数据统计，range 和 static 方式的数据统计在用例数变化时也需要重写
+
+    Args:
+        excel_file_path (str): 已有的 Excel 路径，由 xmind_to_excel 生成
+        xmind_file_path (str): xmind文件路径
+        xmind_sheet_name (str): xmind文件sheet页名称
+        backend (str, optional): 写入器，openpyxl（无需 Excel/WPS）或 xlwings
+        spec (str, optional): MacOS下 excelApp 的名称，仅 xlwings 有效
+        analysis_mode (str, optional): 数据统计的计算方式，需要和生成 Excel 时一致，参考 ANALYSIS_MODES
+        schema (TagSchema, optional): 标签定义，需要和生成 Excel 时一致. Defaults to DEFAULT_SCHEMA
+
+    Returns:
+        dict: 每个 sheet 页的变化，e.g.: {'测试用例': {'added': 1, ...}, '模块A': {...}}
+    """
+    rows, classified_data = xmind_to_rows(xmind_file_path, xmind_sheet_name, classify=True, schema=schema)
+    result = {}
+    with ConversionSession(excel_file_path, get_writer(backend, spec, schema)) as session:
+        writer = session.writer
+        sheet_names = writer.sheet_names()
+        result[TESTCASE_SHEET_NAME] = update_sheet(writer, TESTCASE_SHEET_NAME, rows)
+
+        if TEMPLATE_SHEET_NAME not in sheet_names:
+            fixed_sheet_names = (TESTCASE_SHEET_NAME, ANALYSIS_SHEET_NAME)
+            existing_modules = [name for name in sheet_names if name not in fixed_sheet_names]
+            # 删除已不存在的模块
+            for module in existing_modules:
+                if module not in classified_data:
+                    writer.remove_sheet(module)
+                    result[module] = 'removed'
+            # 更新已有的模块，新增的模块从模板页生成
+            for module, module_rows in classified_data.items():
+                if module in existing_modules:
+                    result[module] = update_sheet(writer, module, module_rows, module=True)
+                else:
+                    writer.add_module_sheet(module, module_rows)
+                    result[module] = 'added'
+            # formula 方式的统计公式只与模块名称有关，模块没有变化时不需要重写；
+            # 其他方式引用了用例所在的行范围，用例数变化时也需要重写
+            analysis_values = writer.read_values(ANALYSIS_SHEET_NAME, min_row=3, max_column=1)
+            analysis_modules = [values[0] for values in analysis_values][:-1]
+            rows_changed = any(
+                not isinstance(changes, dict) or changes['added'] or changes['removed']
+                for sheet_name, changes in result.items() if sheet_name != TESTCASE_SHEET_NAME
+            )
+            if analysis_modules != list(classified_data) or (analysis_mode != 'formula' and rows_changed):
+                if analysis_values:
+                    writer.delete_rows(ANALYSIS_SHEET_NAME, 3, len(analysis_values))
+                writer.analysis_testcase(classified_data, analysis_mode)
+                result[ANALYSIS_SHEET_NAME] = 'rewritten'
+
+    for sheet_name, changes in result.items():
+        print(f'sheet:[{sheet_name}] {changes}')
+    return result
+
+
+if __name__ == '__main__':
+    excel_file_path = r'xxx'
+    xmind_file_path = r'xxx'
+    xmind_sheet_name = 'xxx'
+    update_excel_by_xmind(excel_file_path, xmind_file_path, xmind_sheet_name)
@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : instrument.py
+# @Time    : 2026-10-16 23:31:02
+# @Author  : Kelvin.Ye
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+
+
+# 当前生效的统计实例，未启用时为 None
+_current = ContextVar('instrumentation', default=None)
+
+
+class ProgressReporter:
+    """节流的进度输出，同一个任务每隔 interval 秒最多输出一次
+
+    Args:
+        interval (float, optional): 输出间隔（秒）
+        quiet (bool, optional): 是否不输出
+    """
+
+    def __init__(self, interval: float = 2.0, quiet: bool = False):
+        self.interval = interval
+        self.quiet = quiet
+        # 正在执行的任务，value 为 [上次输出的时间, 是否已输出过]
+        self.tasks = {}
+
+    def report(self, label: str, done: int, total: int = None):
+        """输出进度，total 为 None 时只输出已完成的数量"""
+        if self.quiet:
+            return
+        now = time.monotonic()
+        task = self.tasks.get(label)
+        if total is not None and done >= total:
+            # 输出过进度的任务才输出完成，耗时很短的任务不输出
+            if task is not None and self.tasks.pop(label)[1]:
+                print(f'{label} 进度: {done}/{total} (100%)')
+            return
+        if task is None:
+            self.tasks[label] = [now, False]
+        elif now - task[0] >= self.interval:
+            self.tasks[label] = [now, True]
+            print(f'{label} 进度: {done}/{total} ({done / total:.0%})' if total else f'{label} 进度: {done}')
+
+
+# 未启用统计时使用的进度输出
+_default_reporter = ProgressReporter()
+
+
+class TimedIterator:
+    """包装迭代器，统计从迭代器获取元素的累计耗时"""
+
+    def __init__(self, iterable):
+        self.iterator = iter(iterable)
+        self.seconds = 0.0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            return next(self.iterator)
+        finally:
+            self.seconds += time.perf_counter() - started
+
+
+class Instrumentation:
+    """记录转换过程中每个阶段的耗时、行数和内存峰值，生成 JSON 报告
+
+    在 with 语句中生效，期间执行的转换都会记录到该实例；每个阶段结束时可同时写入一行 JSON 日志
+
+    Args:
+        trace_memory (bool, optional): 是否通过 tracemalloc 统计内存峰值，开启后耗时会增加
+        log_file (str, optional): 结构化日志文件路径，每个阶段结束时追加一行 JSON
+        progress_interval (float, optional): 进度输出间隔（秒）
+        quiet (bool, optional): 是否不输出进度
+
+    Usage:
+        with Instrumentation(trace_memory=True) as instrumentation:
+            xmind_to_excel(xmind_file_path, xmind_sheet_name, classify=True)
+        instrumentation.save('report.json')
+    """
+
+    def __init__(
+        self,
+        trace_memory: bool = False,
+        log_file: str = None,
+        progress_interval: float = 2.0,
+        quiet: bool = False
+    ):
+        self.trace_memory = trace_memory
+        self.log_file = log_file
+        self.progress_reporter = ProgressReporter(progress_interval, quiet)
+        self.stages = []
+        self.created = None
+        self.started = None
+        self.seconds = None
+        # 正在执行的阶段，用于记录父阶段和合并子阶段的内存峰值
+        self.stack = []
+        self.token = None
+        self.started_tracing = False
+
+    def __enter__(self):
+        self.created = datetime.now().isoformat(timespec='seconds')
+        self.started = time.perf_counter()
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+        self.token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _current.reset(self.token)
+        self.seconds = time.perf_counter() - self.started
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+
+    @contextmanager
+    def stage(self, name: str, rows: int = None):
+        """记录一个阶段，阶段内可以嵌套子阶段
+
+        yield 的记录可以在阶段内补充字段，e.g.: record['rows'] = len(rows)；
+        设置 record['exclude_seconds'] 时从耗时中扣除，用于扣除已单独记录的子过程
+        """
+        record = {'name': name, 'parent': self.stack[-1]['record']['name'] if self.stack else None}
+        if rows is not None:
+            record['rows'] = rows
+        frame = {'record': record, 'child_peak': 0}
+        if self.trace_memory:
+            # 重置前的峰值属于父阶段
+            if self.stack:
+                self.stack[-1]['child_peak'] = max(self.stack[-1]['child_peak'], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        self.stack.append(frame)
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            seconds = time.perf_counter() - started - record.pop('exclude_seconds', 0)
+            self.stack.pop()
+            record['seconds'] = round(seconds, 4)
+            if self.trace_memory:
+                peak = max(frame['child_peak'], tracemalloc.get_traced_memory()[1])
+                record['peak_mb'] = round(peak / 1024 / 1024, 2)
+                if self.stack:
+                    self.stack[-1]['child_peak'] = max(self.stack[-1]['child_peak'], peak)
+            self.add(record)
+
+    def record(self, name: str, seconds: float, **fields):
+        """直接记录一个阶段，用于无法用 with 包裹的过程，e.g.: 迭代器的累计耗时"""
+        record = {'name': name, 'parent': self.stack[-1]['record']['name'] if self.stack else None}
+        record.update(fields)
+        record['seconds'] = round(seconds, 4)
+        self.add(record)
+
+    def add(self, record: dict):
+        self.stages.append(record)
+        if self.log_file:
+            with open(self.log_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def progress(self, label: str, done: int, total: int = None):
+        self.progress_reporter.report(label, done, total)
+
+    def report(self) -> dict:
+        seconds = self.seconds if self.seconds is not None else time.perf_counter() - self.started
+        return {
+            'created': self.created,
+            'total_seconds': round(seconds, 4),
+            'trace_memory': self.trace_memory,
+            'stages': self.stages
+        }
+
+    def save(self, file_path: str) -> str:
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+        return file_path
+
+
+def current() -> Instrumentation:
+    return _current.get()
+
+
+@contextmanager
+def stage(name: str, rows: int = None):
+    """在当前生效的统计实例中记录一个阶段，未启用统计时不记录"""
+    instrumentation = _current.get()
+    if instrumentation is None:
+        yield {}
+        return
+    with instrumentation.stage(name, rows) as record:
+        yield record
+
+
+def record_stage(name: str, seconds: float, **fields):
+    instrumentation = _current.get()
+    if instrumentation is not None:
+        instrumentation.record(name, seconds, **fields)
+
+
+def progress(label: str, done: int, total: int = None):
+    """输出节流的进度，未启用统计时使用默认的进度输出"""
+    instrumentation = _current.get()
+    if instrumentation is None:
+        _default_reporter.report(label, done, total)
+    else:
+        instrumentation.progress(label, done, total)
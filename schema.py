@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : schema.py
+# @Time    : 2026-10-17 02:12:36
+# @Author  : Kelvin.Ye
+import hashlib
+import json
+import re
+from operator import attrgetter
+from operator import itemgetter
+
+
+# 基础标签，遍历和合并用例依赖这些标签，不能删除，只能修改别名、拼接符和写入的列
+CORE_TAGS = ('module', 'path', 'func', 'title', 'pre', 'step', 'exp')
+
+# 默认的用例类型
+DEFAULT_TESTCASE_TYPE = '功能测试'
+
+# 标签定义，按写入的列的顺序排列
+#   name: 标签名称
+#   aliases: 别名，e.g.: 别名为 '预期' 时 '预期: 预期结果' 与 'exp: 预期结果' 相同，默认没有别名，参考 schema.example.json
+#   separator: topic 路径上有多个该标签时的拼接符，为 None 时取最后一个（离末端最近的）
+#   column: 写入的列，按表头名称匹配，为 None 时不写入 Excel
+#   default: topic 路径上没有该标签时的值，只对基础标签之外的标签有效
+DEFAULT_TAGS = [
+    {'name': 'type', 'separator': None, 'column': '用例类型', 'default': DEFAULT_TESTCASE_TYPE},
+    {'name': 'module', 'separator': '-', 'column': None},
+    {'name': 'path', 'separator': '-', 'column': '用例目录'},
+    {'name': 'func', 'separator': '-', 'column': '功能点'},
+    {'name': 'title', 'separator': '-', 'column': '用例名称'},
+    {'name': 'pre', 'separator': '-', 'column': '前置条件'},
+    {'name': 'step', 'separator': '-', 'column': '用例步骤'},
+    {'name': 'exp', 'separator': '-', 'column': '预期结果'},
+    {'name': 'priority', 'separator': None, 'column': '优先级'},
+    {'name': 'owner', 'separator': None, 'column': None}
+]
+
+# 标签定义中省略的属性
+TAG_DEFAULTS = {'aliases': [], 'separator': None, 'column': None, 'default': None}
+
+# 模块 sheet 页中与测试用例 sheet 页不同的字段：用例目录不包括根主题和模块，只有第一个预期结果
+MODULE_SHEET_FIELDS = {'path': 'module_path', 'exp': 'first_exp'}
+
+# 冒号前的标签和冒号后的内容，支持中文冒号，e.g.: 'exp: 预期结果'、'exp：预期结果'
+TAG_PATTERN = re.compile(r'([^:：]*)[:：](.*)', re.S)
+
+
+class TagSchema:
+    """标签定义，创建时编译为一个正则和一个标签索引
+
+    解析主题时只匹配一次正则并查找一次字典，耗时与标签和别名的数量无关。
+    基础标签之外的标签（e.g.: 用例类型、优先级）按定义的顺序保存在 Testcase.extra 中
+
+    Args:
+        tags (list): 标签定义，参考 DEFAULT_TAGS
+
+    Raises:
+        Exception: 缺少基础标签、标签名称或别名重复、使用了保留名称
+
+    Usage:
+        schema = TagSchema(DEFAULT_TAGS + [{'name': 'story', 'aliases': ['需求'], 'column': '需求'}])
+    """
+
+    def __init__(self, tags: list):
+        self.tags = [dict(TAG_DEFAULTS, **tag) for tag in tags]
+        self.names = [tag['name'] for tag in self.tags]
+        for name in CORE_TAGS:
+            if name not in self.names:
+                raise Exception(f'标签:[ {name} ] 不存在')
+        # 用例原始数据中 root 记录根主题
+        if 'root' in self.names:
+            raise Exception('标签:[ root ] 为保留名称')
+        # key 为标签名称或别名，value 为标签名称
+        self.labels = {}
+        for tag in self.tags:
+            for label in [tag['name'], *tag['aliases']]:
+                if label in self.labels:
+                    raise Exception(f'标签:[ {label} ] 重复')
+                self.labels[label] = tag['name']
+        self.separators = {tag['name']: tag['separator'] for tag in self.tags}
+        self.extra_tags = [tag for tag in self.tags if tag['name'] not in CORE_TAGS]
+        self.extra_index = {tag['name']: index for index, tag in enumerate(self.extra_tags)}
+        self.extra_defaults = tuple(tag['default'] for tag in self.extra_tags)
+        # 一次读取所有基础标签之外的标签在 topic 路径上的内容
+        extra_names = list(self.extra_index)
+        if len(extra_names) > 1:
+            self.extra_getter = itemgetter(*extra_names)
+        else:
+            self.extra_getter = lambda metadata: tuple(metadata[name] for name in extra_names)
+        # 以基础标签名称开头但缺少冒号的主题视为格式错误，其他标签和别名容易与普通主题冲突（e.g.: 'typeC 接口'），不做校验
+        self.prefix_pattern = re.compile('|'.join(CORE_TAGS))
+
+    def __eq__(self, other):
+        if not isinstance(other, TagSchema):
+            return NotImplemented
+        return self.tags == other.tags
+
+    __hash__ = None
+
+    def __reduce__(self):
+        # 传递给子进程时只序列化标签定义，在子进程中重新编译
+        return TagSchema, (self.tags,)
+
+    def parse_topic(self, title: str) -> tuple:
+        """解析主题
+
+        Returns:
+            tuple: (标签名称, 内容)，不是标签时为 (None, '')，内容中的中文冒号替换为英文冒号并移除首尾空格
+        """
+        match = TAG_PATTERN.match(title)
+        if not match:
+            return None, ''
+        tag = self.labels.get(match.group(1).strip())
+        if tag is None:
+            return None, ''
+        return tag, match.group(2).replace('：', ':').strip()
+
+    def is_malformed(self, title: str) -> bool:
+        """以基础标签名称开头但缺少冒号，只校验不是标签的主题"""
+        return ':' not in title and '：' not in title and self.prefix_pattern.match(title) is not None
+
+    def create_metadata(self, root_name: str) -> dict:
+        """创建用例原始数据，记录遍历时 topic 路径上各个标签的内容"""
+        metadata = {name: [] for name in self.names}
+        metadata['root'] = root_name
+        return metadata
+
+    def columns(self) -> list:
+        """写入的列：[(表头, 标签名称)]"""
+        return [(tag['column'], tag['name']) for tag in self.tags if tag['column']]
+
+    def sheet_fields(self, headers: list, module: bool = False) -> list:
+        """按表头确定每一列写入的字段，参考 testcase_to_values
+
+        Args:
+            headers (list): 第一行的表头，从 A 列开始
+            module (bool, optional): 是否为模块 sheet 页，参考 MODULE_SHEET_FIELDS
+
+        Returns:
+            list: 从 A 列开始每一列的字段，没有对应标签的列（e.g.: 执行结果）为 None，不包括末尾的 None
+        """
+        columns = {header: name for header, name in self.columns()}
+        fields = [columns.get(header.strip()) if isinstance(header, str) else None for header in headers]
+        while fields and fields[-1] is None:
+            fields.pop()
+        if module:
+            fields = [MODULE_SHEET_FIELDS.get(field, field) for field in fields]
+        return fields
+
+    def getter(self, field: str, default=None):
+        """读取用例字段的函数，基础标签之外的标签从 Testcase.extra 中读取，标签不存在时返回 default"""
+        if field is None:
+            return lambda row: None
+        index = self.extra_index.get(field)
+        if index is not None:
+            return lambda row: row.extra[index]
+        if field in CORE_TAGS or field in MODULE_SHEET_FIELDS.values():
+            return attrgetter(field)
+        return lambda row: default
+
+    def extra_dict(self, row) -> dict:
+        """基础标签之外的标签，key 为标签名称"""
+        return dict(zip(self.extra_index, row.extra))
+
+    def digest(self) -> str:
+        """标签定义的哈希值，用于缓存"""
+        return hashlib.sha256(json.dumps(self.tags, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+DEFAULT_SCHEMA = TagSchema(DEFAULT_TAGS)
+
+
+def load_schema(file_path: str) -> TagSchema:
+    """从 JSON 文件加载标签定义，与默认的标签定义合并
+
+    同名的标签覆盖文件中指定的属性，其他标签追加在最后，e.g.:
+        {"tags": [{"name": "exp", "aliases": ["期望"]}, {"name": "story", "aliases": ["需求"], "column": "需求"}]}
+
+    Args:
+        file_path (str): JSON 文件路径
+
+    Raises:
+        Exception: 文件不存在或标签定义不正确
+
+    Returns:
+        TagSchema: 标签定义
+    """
+    try:
+        with open(file_path, encoding='utf-8') as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        raise Exception(f'标签定义文件:[ {file_path} ] 不存在')
+    tags = {tag['name']: dict(tag) for tag in DEFAULT_TAGS}
+    for tag in config.get('tags', []):
+        if 'name' not in tag:
+            raise Exception(f'标签定义:[ {tag} ] 缺少 name')
+        tags[tag['name']] = dict(tags.get(tag['name'], {}), **tag)
+    return TagSchema(list(tags.values()))
@@ -0,0 +1,368 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : server.py
+# @Time    : 2026-10-17 00:21:53
+# @Author  : Kelvin.Ye
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from email.parser import BytesParser
+from email.policy import HTTP
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from urllib.parse import parse_qs
+from urllib.parse import quote
+from urllib.parse import urlsplit
+
+from exporter import export_xmind
+from instrument import Instrumentation
+from transformer import ANALYSIS_MODES
+from transformer import get_writer
+from transformer import get_xmind_sheet_names
+from transformer import write_excel
+from transformer import xmind_to_rows
+
+
+# 转换结果的格式和 Content-Type
+CONTENT_TYPES = {
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+    'tapd': 'text/csv; charset=utf-8'
+}
+
+# 文件扩展名，tapd 为 csv
+FORMAT_EXTENSIONS = {'xlsx': '.xlsx', 'csv': '.csv', 'jsonl': '.jsonl', 'tapd': '.csv'}
+
+# 上传文件默认大小上限（字节）
+DEFAULT_MAX_UPLOAD_SIZE = 50 * 1024 * 1024
+
+# 返回结果文件时每次写入的字节数
+CHUNK_SIZE = 64 * 1024
+
+
+def convert_file(xmind_file_path: str, xmind_sheet_name: str, output_file_path: str, options: dict) -> dict:
+    """在工作进程中转换上传的 xmind 文件，未指定 sheet 页时转换第一个 sheet 页
+
+    Returns:
+        dict: {'sheet': sheet页名称, 'cases': 用例数}
+    """
+    # 转换过程的输出不写入服务日志
+    with contextlib.redirect_stdout(io.StringIO()):
+        if not xmind_sheet_name:
+            sheet_names = get_xmind_sheet_names(xmind_file_path)
+            if not sheet_names:
+                raise Exception('xmind 文件没有 sheet 页')
+            xmind_sheet_name = sheet_names[0]
+        if options['format'] != 'xlsx':
+            with Instrumentation(quiet=True) as instrumentation:
+                export_xmind(xmind_file_path, xmind_sheet_name, options['format'], False, output_file_path)
+            return {'sheet': xmind_sheet_name, 'cases': instrumentation.stages[-1].get('rows', 0)}
+        rows, classified_data = xmind_to_rows(xmind_file_path, xmind_sheet_name, options['classify'])
+        write_excel(rows, classified_data, output_file_path, get_writer('openpyxl'), options['analysis_mode'])
+    return {'sheet': xmind_sheet_name, 'cases': len(rows)}
+
+
+def percentile(values: list, percent: float) -> float:
+    """最近秩法计算百分位数，values 需已排序"""
+    if not values:
+        return None
+    index = max(int(len(values) * percent / 100 + 0.5) - 1, 0)
+    return values[min(index, len(values) - 1)]
+
+
+class ServiceMetrics:
+    """请求计数和最近若干次转换的耗时（从接受请求到结果文件生成），线程安全
+
+    Args:
+        window (int, optional): 计算耗时百分位数的最近转换次数
+    """
+
+    def __init__(self, window: int = 1000):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.counters = {'accepted': 0, 'completed': 0, 'failed': 0, 'rejected': 0}
+        self.in_flight = 0
+        self.latencies = deque(maxlen=window)
+
+    def reject(self):
+        with self.lock:
+            self.counters['rejected'] += 1
+
+    def begin(self):
+        with self.lock:
+            self.counters['accepted'] += 1
+            self.in_flight += 1
+
+    def end(self, succeeded: bool, seconds: float):
+        with self.lock:
+            self.in_flight -= 1
+            self.counters['completed' if succeeded else 'failed'] += 1
+            if succeeded:
+                self.latencies.append(seconds)
+
+    def snapshot(self, workers: int, queue_size: int) -> dict:
+        with self.lock:
+            latencies = sorted(self.latencies)
+            in_flight = self.in_flight
+            counters = dict(self.counters)
+
+        def rounded(value):
+            return None if value is None else round(value, 4)
+
+        return {
+            'uptime_seconds': round(time.time() - self.started, 1),
+            'workers': workers,
+            'queue_size': queue_size,
+            'in_flight': in_flight,
+            # 超出工作进程数的请求在进程池中排队
+            'queue_depth': max(in_flight - workers, 0),
+            **counters,
+            'latency_seconds': {
+                'count': len(latencies),
+                'p50': rounded(percentile(latencies, 50)),
+                'p90': rounded(percentile(latencies, 90)),
+                'p99': rounded(percentile(latencies, 99)),
+                'max': rounded(latencies[-1] if latencies else None)
+            }
+        }
+
+
+class ConversionService:
+    """XMind 转换服务，在进程池中转换，同时处理的请求数达到 workers + queue_size 时直接拒绝新请求
+
+    Args:
+        workers (int, optional): 工作进程数
+        queue_size (int, optional): 等待转换的请求数上限
+        max_upload_size (int, optional): 上传文件大小上限（字节）
+    """
+
+    def __init__(self, workers: int = 2, queue_size: int = 8, max_upload_size: int = DEFAULT_MAX_UPLOAD_SIZE):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.max_upload_size = max_upload_size
+        self.slots = threading.BoundedSemaphore(workers + queue_size)
+        self.metrics = ServiceMetrics()
+        # HTTP 服务是多线程的，使用 spawn 启动工作进程，避免 fork 时复制其他线程持有的锁
+        self.executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        self.work_path = tempfile.mkdtemp(prefix='xmind-to-excel-')
+
+    def try_acquire(self) -> bool:
+        """获取处理名额，队列已满时返回 False"""
+        if self.slots.acquire(blocking=False):
+            self.metrics.begin()
+            return True
+        self.metrics.reject()
+        return False
+
+    def release(self, succeeded: bool, seconds: float):
+        self.metrics.end(succeeded, seconds)
+        self.slots.release()
+
+    def convert(self, xmind_content: bytes, xmind_sheet_name: str, options: dict) -> tuple:
+        """转换 xmind 文件，需要先通过 try_acquire 获取名额
+
+        Returns:
+            tuple: (结果文件路径, 转换结果)，结果文件所在的目录由调用方读取后删除
+        """
+        request_path = tempfile.mkdtemp(dir=self.work_path)
+        try:
+            xmind_file_path = os.path.join(request_path, 'upload.xmind')
+            with open(xmind_file_path, 'wb') as f:
+                f.write(xmind_content)
+            output_file_path = os.path.join(request_path, 'output' + FORMAT_EXTENSIONS[options['format']])
+            future = self.executor.submit(convert_file, xmind_file_path, xmind_sheet_name, output_file_path, options)
+            return output_file_path, future.result()
+        except BaseException:
+            shutil.rmtree(request_path, ignore_errors=True)
+            raise
+
+    def metrics_snapshot(self) -> dict:
+        return self.metrics.snapshot(self.workers, self.queue_size)
+
+    def close(self):
+        self.executor.shutdown()
+        shutil.rmtree(self.work_path, ignore_errors=True)
+
+
+def parse_multipart(content_type: str, body: bytes) -> dict:
+    """解析 multipart/form-data
+
+    Returns:
+        dict: key 为字段名称，value 为 (文件名称, 内容)，非文件字段的文件名称为 None
+    """
+    header = b'Content-Type: ' + content_type.encode('latin-1') + b'\r\n\r\n'
+    message = BytesParser(policy=HTTP).parsebytes(header + body)
+    if not message.is_multipart():
+        raise Exception('multipart/form-data 格式错误')
+    fields = {}
+    for part in message.iter_parts():
+        name = part.get_param('name', header='content-disposition')
+        if name:
+            fields[name] = (part.get_filename(), part.get_payload(decode=True) or b'')
+    return fields
+
+
+class ConversionRequestHandler(BaseHTTPRequestHandler):
+    """POST /convert 上传 xmind 文件并返回转换结果，GET /metrics 返回服务指标
+
+    上传方式：multipart/form-data 的 file 字段，或直接以请求体上传（application/octet-stream）；
+    参数 sheet、classify、analysis_mode、format 可以是查询参数或表单字段
+    """
+
+    server_version = 'xmind-to-excel'
+
+    @property
+    def service(self) -> ConversionService:
+        return self.server.service
+
+    def send_json(self, status: HTTPStatus, data: dict, headers: dict = None):
+        content = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(content)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def send_file(self, file_path: str, file_name: str, content_type: str):
+        """分块返回结果文件，不一次性读入内存"""
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(os.path.getsize(file_path)))
+        self.send_header('Content-Disposition', f"attachment; filename*=UTF-8''{quote(file_name)}")
+        self.end_headers()
+        with open(file_path, 'rb') as f:
+            shutil.copyfileobj(f, self.wfile, CHUNK_SIZE)
+
+    def read_upload(self, query: str, length: int) -> tuple:
+        """读取上传的 xmind 文件和转换参数
+
+        Returns:
+            tuple: (xmind 内容, 文件名称, sheet页名称, 转换选项)
+        """
+        params = {name: values[-1] for name, values in parse_qs(query).items()}
+        content = self.rfile.read(length)
+        file_name = 'upload.xmind'
+        content_type = self.headers.get('Content-Type', '')
+        if content_type.startswith('multipart/form-data'):
+            fields = parse_multipart(content_type, content)
+            if 'file' not in fields:
+                raise Exception('缺少 file 字段')
+            upload_name, content = fields.pop('file')
+            file_name = upload_name or file_name
+            for name, (_, value) in fields.items():
+                params.setdefault(name, value.decode('utf-8'))
+        options = {
+            'classify': params.get('classify', '').lower() in ('1', 'true', 'yes'),
+            'analysis_mode': params.get('analysis_mode', 'formula'),
+            'format': params.get('format', 'xlsx')
+        }
+        if options['format'] not in CONTENT_TYPES:
+            raise Exception(f'输出格式:[ {options["format"]} ] 不存在')
+        if options['analysis_mode'] not in ANALYSIS_MODES:
+            raise Exception(f'数据统计方式:[ {options["analysis_mode"]} ] 不存在')
+        return content, os.path.basename(file_name), params.get('sheet'), options
+
+    def do_GET(self):
+        if urlsplit(self.path).path == '/metrics':
+            self.send_json(HTTPStatus.OK, self.service.metrics_snapshot())
+            return
+        self.send_json(HTTPStatus.NOT_FOUND, {'error': f'{self.path} 不存在'})
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path != '/convert':
+            self.send_json(HTTPStatus.NOT_FOUND, {'error': f'{self.path} 不存在'})
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        if length <= 0:
+            self.send_json(HTTPStatus.LENGTH_REQUIRED, {'error': '缺少上传文件'})
+            return
+        if length > self.service.max_upload_size:
+            self.close_connection = True
+            self.send_json(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {'error': f'上传文件超过 {self.service.max_upload_size} 字节'})
+            return
+        # 队列已满时不读取上传内容，直接拒绝，客户端按 Retry-After 稍后重试
+        if not self.service.try_acquire():
+            self.close_connection = True
+            self.send_json(HTTPStatus.SERVICE_UNAVAILABLE, {'error': '转换队列已满'}, {'Retry-After': '1'})
+            return
+
+        started = time.perf_counter()
+        succeeded = False
+        try:
+            try:
+                content, file_name, sheet_name, options = self.read_upload(url.query, length)
+            except Exception as e:
+                self.send_json(HTTPStatus.BAD_REQUEST, {'error': str(e)})
+                return
+            try:
+                output_file_path, result = self.service.convert(content, sheet_name, options)
+            except Exception as e:
+                self.send_json(HTTPStatus.UNPROCESSABLE_ENTITY, {'error': f'{type(e).__name__}: {e}'})
+                return
+            succeeded = True
+        finally:
+            # 转换完成即释放名额，返回结果的耗时取决于客户端，不占用转换队列
+            self.service.release(succeeded, time.perf_counter() - started)
+
+        try:
+            fmt = options['format']
+            xmind_name = os.path.splitext(file_name)[0]
+            self.send_file(output_file_path, f'{xmind_name}-{result["sheet"]}{FORMAT_EXTENSIONS[fmt]}', CONTENT_TYPES[fmt])
+        finally:
+            shutil.rmtree(os.path.dirname(output_file_path), ignore_errors=True)
+
+
+def serve(
+    host: str = '127.0.0.1',
+    port: int = 8000,
+    workers: int = 2,
+    queue_size: int = 8,
+    max_upload_size: int = DEFAULT_MAX_UPLOAD_SIZE
+):
+    """启动本地 HTTP 转换服务，直到 Ctrl+C
+
+    Args:
+        host (str, optional): 监听地址
+        port (int, optional): 监听端口
+        workers (int, optional): 工作进程数
+        queue_size (int, optional): 等待转换的请求数上限，超过时返回 503
+        max_upload_size (int, optional): 上传文件大小上限（字节），超过时返回 413
+    """
+    service = ConversionService(workers, queue_size, max_upload_size)
+    server = ThreadingHTTPServer((host, port), ConversionRequestHandler)
+    server.service = service
+    print(f'服务启动: http://{host}:{server.server_port}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    print('服务停止')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='XMind 转 Excel 本地 HTTP 服务')
+    parser.add_argument('--host', default='127.0.0.1', help='监听地址')
+    parser.add_argument('--port', type=int, default=8000, help='监听端口')
+    parser.add_argument('-j', '--workers', type=int, default=2, help='工作进程数')
+    parser.add_argument('--queue-size', type=int, default=8, help='等待转换的请求数上限')
+    parser.add_argument('--max-upload-mb', type=int, default=50, help='上传文件大小上限（MB）')
+    args = parser.parse_args()
+
+    serve(args.host, args.port, args.workers, args.queue_size, args.max_upload_mb * 1024 * 1024)
@@ -0,0 +1,32 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : test_batch.py
+# @Time    : 2026-10-17 10:30:00
+# @Author  : Kelvin.Ye
+import contextlib
+import io
+import os
+import zipfile
+
+from batch import batch_xmind_to_excel
+from generator import generate_xmind
+
+
+def test_batch_reports_errors_per_file(tmp_path, monkeypatch):
+    """单个文件转换失败时不影响其他文件，未指定 sheet 页且文件没有 sheet 页时记录错误"""
+    monkeypatch.chdir(tmp_path)
+    source = tmp_path / 'cases'
+    source.mkdir()
+    generate_xmind(str(source / 'a.xmind'), cases=20, sheets=2)
+    with zipfile.ZipFile(source / 'empty.xmind', 'w') as xmind:
+        xmind.writestr('content.json', '[]')
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        summaries = batch_xmind_to_excel(str(source), workers=1)
+
+    summaries = {os.path.basename(summary['file']): summary for summary in summaries}
+    assert summaries['a.xmind']['cases'] == 40
+    assert summaries['a.xmind']['errors'] == []
+    assert [os.path.dirname(path) for path in summaries['a.xmind']['outputs']] == [str(tmp_path / 'output')] * 2
+    assert summaries['empty.xmind']['outputs'] == []
+    assert summaries['empty.xmind']['errors'] == ['sheet页:[  ] 不存在']
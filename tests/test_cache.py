@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : test_cache.py
+# @Time    : 2026-10-17 11:00:00
+# @Author  : Kelvin.Ye
+import contextlib
+import io
+import json
+import os
+import zipfile
+
+import pytest
+
+import cache
+from cache import ConversionCache
+from cache import cached_xmind_to_excel
+from cache import sheet_digest
+from generator import generate_xmind
+
+
+@pytest.fixture
+def xmind_file_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    file_path = str(tmp_path / 'cases.xmind')
+    generate_xmind(file_path, cases=50, modules=2, sheets=2)
+    return file_path
+
+
+@pytest.fixture
+def parses(monkeypatch):
+    """记录解析 xmind sheet 页的次数"""
+    calls = []
+    iter_xmind_sheet = cache.iter_xmind_sheet
+
+    def counted(*args):
+        calls.append(args)
+        return iter_xmind_sheet(*args)
+
+    monkeypatch.setattr(cache, 'iter_xmind_sheet', counted)
+    return calls
+
+
+def convert(xmind_file_path: str, conversion_cache: ConversionCache, output_name: str) -> tuple:
+    with contextlib.redirect_stdout(io.StringIO()):
+        return cached_xmind_to_excel(
+            xmind_file_path, 'sheet1', classify=True, output_name=output_name, cache=conversion_cache
+        )
+
+
+def rename_root_topic(xmind_file_path: str, sheet_index: int, title: str):
+    with zipfile.ZipFile(xmind_file_path) as xmind:
+        sheets = json.loads(xmind.read('content.json'))
+    sheets[sheet_index]['rootTopic']['title'] = title
+    with zipfile.ZipFile(xmind_file_path, 'w') as xmind:
+        xmind.writestr('content.json', json.dumps(sheets, ensure_ascii=False))
+
+
+def test_unchanged_file_hits_without_parsing(xmind_file_path, parses, monkeypatch):
+    conversion_cache = ConversionCache('.cache')
+    rows, _, first_path = convert(xmind_file_path, conversion_cache, 'first.xlsx')
+    # 未命中时只解析一次，哈希值与单独计算的一致
+    assert len(parses) == 1
+    assert len(rows) == 50
+    assert conversion_cache.get(conversion_cache.make_key(
+        sheet_digest(xmind_file_path, 'sheet1'),
+        template=cache.file_digest(cache.TEMPLATE_FILE_PATH),
+        classify=True,
+        backend='openpyxl',
+        analysis_mode='formula',
+        schema=cache.DEFAULT_SCHEMA.digest()
+    )) is not None
+
+    parses.clear()
+    monkeypatch.setattr(cache, 'rows_to_excel', None)
+    cached_rows, _, second_path = convert(xmind_file_path, conversion_cache, 'second.xlsx')
+    assert parses == []
+    assert [row.title for row in cached_rows] == [row.title for row in rows]
+    with open(first_path, 'rb') as first, open(second_path, 'rb') as second:
+        assert first.read() == second.read()
+
+
+def test_other_sheet_changed_reuses_workbook(xmind_file_path, parses, monkeypatch):
+    """只有其他 sheet 页变化时解析一次并命中缓存，不重新生成 Excel"""
+    conversion_cache = ConversionCache('.cache')
+    convert(xmind_file_path, conversion_cache, 'first.xlsx')
+    rename_root_topic(xmind_file_path, 1, '修改的根主题')
+
+    parses.clear()
+    with monkeypatch.context() as patch:
+        patch.setattr(cache, 'rows_to_excel', None)
+        rows, _, _ = convert(xmind_file_path, conversion_cache, 'second.xlsx')
+    assert len(parses) == 1
+    assert len(rows) == 50
+
+    # 修改转换的 sheet 页后未命中
+    rename_root_topic(xmind_file_path, 0, '修改的根主题')
+    rows, _, _ = convert(xmind_file_path, conversion_cache, 'third.xlsx')
+    assert rows[0].path.startswith('修改的根主题')
+
+
+def test_evict_skips_entries_removed_by_other_processes(xmind_file_path, monkeypatch):
+    conversion_cache = ConversionCache('.cache')
+    convert(xmind_file_path, conversion_cache, 'first.xlsx')
+    listdir = os.listdir
+    conversion_cache.max_size = 0
+    with monkeypatch.context() as patch:
+        # 列出目录后文件被其他进程删除
+        patch.setattr(os, 'listdir', lambda path: listdir(path) + ['removed.pickle', 'removed.xlsx'])
+        conversion_cache.evict()
+    assert os.listdir('.cache') == []
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : test_cli.py
+# @Time    : 2026-10-17 12:30:00
+# @Author  : Kelvin.Ye
+import os
+import subprocess
+import sys
+
+import cli
+from generator import generate_xmind
+
+
+def test_help_does_not_import_writers():
+    """-h 时不导入转换模块和 Excel 写入器"""
+    code = (
+        'import sys, cli\n'
+        'try:\n'
+        '    cli.main(["-h"])\n'
+        'except SystemExit:\n'
+        '    pass\n'
+        'print(",".join(m for m in ("transformer", "batch", "openpyxl", "xlwings") if m in sys.modules))\n'
+    )
+    cwd = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, '-c', code], cwd=cwd, capture_output=True, text=True, check=True)
+    assert result.stdout.splitlines()[-1] == ''
+
+
+def test_split_does_not_overwrite_output_dir(tmp_path, monkeypatch, capsys):
+    """未指定 -o 时拆分的文件不覆盖 output 目录下已存在的文件，--force 时覆盖"""
+    monkeypatch.chdir(tmp_path)
+    xmind_file_path = str(tmp_path / 'cases.xmind')
+    generate_xmind(xmind_file_path, cases=20, modules=2)
+    argv = [xmind_file_path, '-f', 'csv', '--split', '-q']
+
+    assert cli.main(argv) == 0
+    file_names = sorted(os.listdir('output'))
+    assert len(file_names) == 2
+    for file_name in file_names:
+        with open(os.path.join('output', file_name), 'w', encoding='utf-8') as f:
+            f.write('edited')
+
+    assert cli.main(argv) == 1
+    assert '文件已存在' in capsys.readouterr().err
+    assert sorted(os.listdir('output')) == file_names
+    for file_name in file_names:
+        with open(os.path.join('output', file_name), encoding='utf-8') as f:
+            assert f.read() == 'edited'
+
+    assert cli.main(argv + ['--force']) == 0
+    assert sorted(os.listdir('output')) == file_names
+    for file_name in file_names:
+        with open(os.path.join('output', file_name), encoding='utf-8-sig') as f:
+            assert f.readline().startswith('用例类型')
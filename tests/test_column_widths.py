@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : test_column_widths.py
+# @Time    : 2026-10-17 13:30:00
+# @Author  : Kelvin.Ye
+import contextlib
+import io
+
+from openpyxl import load_workbook
+
+from generator import generate_xmind
+from transformer import ANALYSIS_SHEET_NAME
+from transformer import TEMPLATE_FILE_PATH
+from transformer import TEMPLATE_SHEET_NAME
+from transformer import TESTCASE_SHEET_NAME
+from transformer import xmind_to_excel
+
+
+def column_widths(sheet) -> dict:
+    """每一列的宽度，合并的列维度（e.g.: E:F）按列展开"""
+    widths = {}
+    for dim in sheet.column_dimensions.values():
+        for column in range(dim.min, min(dim.max, 7) + 1):
+            widths[column] = dim.width
+    return widths
+
+
+def test_column_widths_only_widen(tmp_path, monkeypatch):
+    """估算的列宽只加宽列，模板中更宽的列（e.g.: 用例目录、用例名称）保留原有宽度"""
+    monkeypatch.chdir(tmp_path)
+    xmind_file_path = str(tmp_path / 'cases.xmind')
+    generate_xmind(xmind_file_path, cases=30, modules=3)
+    with contextlib.redirect_stdout(io.StringIO()):
+        excel_file_path = xmind_to_excel(xmind_file_path, 'sheet1', classify=True, output_name='cases.xlsx')
+
+    template = load_workbook(TEMPLATE_FILE_PATH)
+    wb = load_workbook(excel_file_path)
+    widened = False
+    for sheet in wb.worksheets:
+        if sheet.title == ANALYSIS_SHEET_NAME:
+            continue
+        # A~G 列在所有列布局中位置相同，之后的列随删除的执行结果列变化
+        template_sheet = template[TESTCASE_SHEET_NAME if sheet.title == TESTCASE_SHEET_NAME else TEMPLATE_SHEET_NAME]
+        template_widths = column_widths(template_sheet)
+        widths = column_widths(sheet)
+        for column in range(1, 8):
+            assert widths[column] >= template_widths[column], (sheet.title, column)
+            widened = widened or widths[column] > template_widths[column]
+        # 用例目录、用例名称、预期结果
+        assert [widths[column] for column in (2, 4, 7)] == [template_widths[column] for column in (2, 4, 7)]
+    assert widened
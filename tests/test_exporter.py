@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : test_exporter.py
+# @Time    : 2026-10-17 12:00:00
+# @Author  : Kelvin.Ye
+import contextlib
+import csv
+import io
+import json
+import os
+import zipfile
+
+import pytest
+
+import cli
+from exporter import export_xmind
+from generator import generate_xmind
+from schema import DEFAULT_SCHEMA
+from transformer import xmind_to_rows
+
+
+# 测试用例 sheet 页的 A~G 列和标签定义中的优先级列
+CSV_HEADER = ['用例类型', '用例目录', '功能点', '用例名称', '前置条件', '用例步骤', '预期结果', '优先级']
+
+
+def edit_root_topic(xmind_file_path: str, edit):
+    with zipfile.ZipFile(xmind_file_path) as xmind:
+        sheets = json.loads(xmind.read('content.json'))
+    edit(sheets[0]['rootTopic'])
+    with zipfile.ZipFile(xmind_file_path, 'w') as xmind:
+        xmind.writestr('content.json', json.dumps(sheets, ensure_ascii=False))
+
+
+def first_func(root: dict) -> dict:
+    """第一个模块下第一个功能点"""
+    topic = root
+    while not topic['title'].startswith('func:'):
+        topic = topic['children']['attached'][0]
+    return topic
+
+
+@pytest.fixture
+def xmind_file_path(tmp_path, monkeypatch):
+    """生成 xmind，第一个功能点下的用例设置优先级"""
+    monkeypatch.chdir(tmp_path)
+    file_path = str(tmp_path / 'cases.xmind')
+    generate_xmind(file_path, cases=40, modules=3, seed=5)
+
+    def edit(root):
+        func = first_func(root)
+        func['children'] = {'attached': [{'id': 'p', 'title': 'priority: 高', 'children': func['children']}]}
+
+    edit_root_topic(file_path, edit)
+    return file_path
+
+
+def expected_rows(xmind_file_path: str) -> list:
+    rows, _ = xmind_to_rows(xmind_file_path, 'sheet1')
+    assert any(DEFAULT_SCHEMA.getter('priority')(row) == '高' for row in rows)
+    return rows
+
+
+def export(xmind_file_path: str, fmt: str) -> str:
+    with contextlib.redirect_stdout(io.StringIO()):
+        file_paths = export_xmind(xmind_file_path, 'sheet1', fmt)
+    assert len(file_paths) == 1
+    return file_paths[0]
+
+
+def read_csv(file_path: str) -> list:
+    with open(file_path, encoding='utf-8-sig', newline='') as f:
+        return list(csv.reader(f))
+
+
+def test_csv_rows_match_xmind_to_rows(xmind_file_path):
+    get_type = DEFAULT_SCHEMA.getter('type')
+    get_priority = DEFAULT_SCHEMA.getter('priority')
+    expected = [
+        [get_type(row), row.path, row.func, row.title, row.pre, row.step, row.exp, get_priority(row) or '']
+        for row in expected_rows(xmind_file_path)
+    ]
+
+    lines = read_csv(export(xmind_file_path, 'csv'))
+
+    assert lines[0] == CSV_HEADER
+    assert lines[1:] == expected
+
+
+def test_jsonl_rows_match_xmind_to_rows(xmind_file_path):
+    expected = [
+        {'module': row.module, **row.to_dict(), **DEFAULT_SCHEMA.extra_dict(row)}
+        for row in expected_rows(xmind_file_path)
+    ]
+
+    with open(export(xmind_file_path, 'jsonl'), encoding='utf-8') as f:
+        lines = [json.loads(line) for line in f]
+
+    assert lines == expected
+    assert {line['priority'] for line in lines} == {'高', None}
+
+
+def test_tapd_rows_match_xmind_to_rows(xmind_file_path):
+    """功能点作为用例目录的最后一级，没有优先级时用例等级为中"""
+    get_priority = DEFAULT_SCHEMA.getter('priority')
+    expected = [
+        [f'{row.path}-{row.func}', row.title, '', row.pre, row.step, row.exp, '功能测试', '正常', get_priority(row) or '中', '']
+        for row in expected_rows(xmind_file_path)
+    ]
+
+    lines = read_csv(export(xmind_file_path, 'tapd'))
+
+    assert lines[0] == ['用例目录', '用例名称', '需求ID', '前置条件', '用例步骤', '预期结果', '用例类型', '用例状态', '用例等级', '创建人']
+    assert lines[1:] == expected
+
+
+def test_stdout_format_error(xmind_file_path, monkeypatch, capsys):
+    """输出至标准输出时格式错误在写入用例后才抛出，已输出的行保持完整，退出码为 1；输出至文件时不留下文件"""
+    expected = read_csv(export(xmind_file_path, 'csv'))
+
+    def edit(root):
+        # 最后一个模块中增加格式错误的主题，前面模块的用例已经输出
+        root['children']['attached'][-1]['children']['attached'].append({'id': 'e', 'title': 'exp 缺少冒号'})
+
+    edit_root_topic(xmind_file_path, edit)
+    stdout = io.BytesIO()
+    monkeypatch.setattr(cli, 'open_stdout', lambda: stdout)
+
+    assert cli.main([xmind_file_path, '-f', 'csv', '-o', '-']) == 1
+
+    assert 'topic:[ exp 缺少冒号 ] 格式不正确' in capsys.readouterr().err
+    output = stdout.getvalue().decode('utf-8')
+    assert output.endswith('\r\n')
+    lines = list(csv.reader(io.StringIO(output, newline='')))
+    assert lines[0] == CSV_HEADER
+    assert lines == expected[:len(lines)]
+    assert len(lines) > 1
+
+    output_file_path = os.path.join('output', 'error.csv')
+    assert cli.main([xmind_file_path, '-f', 'csv', '-q', '-o', output_file_path]) == 1
+    assert not os.path.exists(output_file_path)
+    assert not os.path.exists(output_file_path + '.tmp')
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : test_flatten.py
+# @Time    : 2026-10-17 09:30:00
+# @Author  : Kelvin.Ye
+import json
+import sys
+import zipfile
+from xml.sax.saxutils import escape
+
+import pytest
+
+import transformer
+from transformer import TOPIC_END
+from transformer import TOPIC_START
+
+
+def write_zen_xmind(file_path, root: tuple):
+    """写入 XMind Zen 文件，主题为 (标题, [子主题])，逐层拼接 json 文本，不受 json.dumps 的递归深度限制"""
+    parts = []
+    stack = [root]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            parts.append(item)
+            continue
+        title, children = item
+        parts.append('{"title": %s' % json.dumps(title, ensure_ascii=False))
+        if not children:
+            parts.append('}')
+            continue
+        parts.append(', "children": {"attached": [')
+        stack.append(']}}')
+        for index, child in reversed(list(enumerate(children))):
+            stack.append(child)
+            if index:
+                stack.append(', ')
+    content = '[{"id": "s", "title": "sheet1", "rootTopic": %s}]' % ''.join(parts)
+    with zipfile.ZipFile(file_path, 'w') as xmind:
+        xmind.writestr('content.json', content)
+
+
+def write_legacy_xmind(file_path, root: tuple):
+    """写入 XMind 8 文件，主题为 (标题, [子主题])"""
+    parts = []
+    stack = [root]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            parts.append(item)
+            continue
+        title, children = item
+        parts.append(f'<topic><title>{escape(title)}</title>')
+        stack.append('</topic>')
+        if children:
+            parts.append('<children><topics type="attached">')
+            stack.append('</topics></children>')
+            stack.extend(reversed(children))
+    content = (
+        '<xmap-content xmlns="urn:xmind:xmap:xmlns:content:2.0" xmlns:xlink="http://www.w3.org/1999/xlink">'
+        f'<sheet id="s">{"".join(parts)}<title>sheet1</title></sheet></xmap-content>'
+    )
+    with zipfile.ZipFile(file_path, 'w') as xmind:
+        xmind.writestr('content.xml', content)
+
+
+def chain(titles: list, leaf: tuple) -> tuple:
+    """逐层嵌套的主题，最内层为 leaf"""
+    topic = leaf
+    for title in reversed(titles):
+        topic = (title, [topic])
+    return topic
+
+
+def case(title: str, *exps: str) -> tuple:
+    return (f'title: {title}', [(f'exp: {exp}', []) for exp in exps])
+
+
+@pytest.mark.parametrize('write_xmind', [write_zen_xmind, write_legacy_xmind])
+def test_deep_map(tmp_path, write_xmind):
+    """主题层级超过递归深度限制时仍能解析，用例目录包含每一层的 path"""
+    depth = sys.getrecursionlimit() * 3
+    directories = [f'path: {index}' for index in range(depth)]
+    root = ('根', [chain(['module: 深层'] + directories, case('最深', '成功'))])
+    file_path = str(tmp_path / 'deep.xmind')
+    write_xmind(file_path, root)
+
+    rows, classified_data = transformer.xmind_to_rows(file_path, 'sheet1', classify=True)
+
+    assert len(rows) == 1
+    row = rows[0]
+    assert row.title == '最深'
+    assert row.exp == '成功'
+    assert row.path == '-'.join(['根', '深层'] + [str(index) for index in range(depth)])
+    assert list(classified_data) == ['深层']
+    # 事件成对出现，根主题在内共 depth + 4 层
+    events = list(transformer.iter_xmind_sheet(file_path, 'sheet1'))
+    assert events.count((TOPIC_END, None)) == depth + 4
+    assert sum(1 for event, _ in events if event == TOPIC_START) == depth + 4
+
+
+def test_merge_expected_results(tmp_path):
+    """(path, func, title) 相同的末端合并为一条用例，预期结果按顺序换行拼接，没有 title 的末端不是用例"""
+    root = ('根', [
+        ('module: 登录', [
+            ('func: 密码登录', [case('正确密码', '进入首页'), case('正确密码', '记住账号')]),
+            ('没有标题的分支', []),
+        ]),
+        ('module: 注册', [case('手机号注册', '注册成功')])
+    ])
+    file_path = str(tmp_path / 'merge.xmind')
+    write_zen_xmind(file_path, root)
+
+    rows, classified_data = transformer.xmind_to_rows(file_path, 'sheet1', classify=True)
+
+    assert [(row.module, row.func, row.title, row.exp) for row in rows] == [
+        ('登录', '密码登录', '正确密码', '进入首页\n记住账号'),
+        ('注册', '', '手机号注册', '注册成功')
+    ]
+    assert {module: len(module_rows) for module, module_rows in classified_data.items()} == {'登录': 1, '注册': 1}
+
+
+def test_format_errors(tmp_path):
+    """以基础标签开头但缺少冒号的主题视为格式错误，遍历完成后一次性列出所有错误，不返回用例"""
+    root = ('根', [
+        ('module: 登录', [case('正确密码', '进入首页'), ('exp 缺少冒号', []), ('title缺少冒号', [])]),
+        ('typeC 接口', [case('普通主题不校验', '成功')])
+    ])
+    file_path = str(tmp_path / 'error.xmind')
+    write_zen_xmind(file_path, root)
+
+    with pytest.raises(Exception) as excinfo:
+        transformer.xmind_to_rows(file_path, 'sheet1')
+    assert str(excinfo.value).splitlines() == ['topic:[ exp 缺少冒号 ] 格式不正确', 'topic:[ title缺少冒号 ] 格式不正确']
+
+    # 流式导出遇到格式错误时同样抛出异常
+    events = transformer.iter_xmind_sheet(file_path, 'sheet1')
+    metadata = transformer.create_metadata(transformer.read_root_name(events))
+    with pytest.raises(Exception, match='exp 缺少冒号'):
+        list(transformer.iter_rows(events, metadata))
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : test_incremental.py
+# @Time    : 2026-10-17 11:30:00
+# @Author  : Kelvin.Ye
+import contextlib
+import io
+import json
+import zipfile
+
+import pytest
+from openpyxl import load_workbook
+
+from generator import generate_xmind
+from incremental import update_excel_by_xmind
+from transformer import ANALYSIS_SHEET_NAME
+from transformer import TESTCASE_SHEET_NAME
+from transformer import xmind_to_excel
+
+
+# 测试人员填写的列，模块 sheet 页按终端保留执行结果列，e.g.: 执行结果(IOS)
+RESULT_HEADER = '执行结果'
+
+
+def is_result_header(header) -> bool:
+    return isinstance(header, str) and header.startswith(RESULT_HEADER)
+
+
+@pytest.fixture
+def converted(tmp_path, monkeypatch):
+    """生成 xmind 并转换为分类的 Excel，所有用例都填写了执行结果"""
+    monkeypatch.chdir(tmp_path)
+    xmind_file_path = str(tmp_path / 'cases.xmind')
+    generate_xmind(xmind_file_path, cases=30, modules=3, seed=9)
+    with contextlib.redirect_stdout(io.StringIO()):
+        excel_file_path = xmind_to_excel(xmind_file_path, 'sheet1', classify=True, output_name='cases.xlsx')
+    wb = load_workbook(excel_file_path)
+    for sheet in wb.worksheets:
+        if sheet.title == ANALYSIS_SHEET_NAME:
+            continue
+        headers = [cell.value for cell in sheet[1]]
+        title_column = headers.index('用例名称') + 1
+        result_columns = [column for column, header in enumerate(headers, 1) if is_result_header(header)]
+        assert result_columns
+        for rownum in range(2, sheet.max_row + 1):
+            title = sheet.cell(rownum, title_column).value
+            for column in result_columns if title else []:
+                sheet.cell(rownum, column, f'通过-{title}')
+    wb.save(excel_file_path)
+    return xmind_file_path, excel_file_path
+
+
+def edit_xmind(xmind_file_path: str, edit):
+    """修改 xmind 文件的根主题"""
+    with zipfile.ZipFile(xmind_file_path) as xmind:
+        sheets = json.loads(xmind.read('content.json'))
+    edit(sheets[0]['rootTopic'])
+    with zipfile.ZipFile(xmind_file_path, 'w') as xmind:
+        xmind.writestr('content.json', json.dumps(sheets, ensure_ascii=False))
+
+
+def iter_topics(topic: dict, parent: dict = None):
+    """遍历主题，产出 (主题, 父主题)"""
+    yield topic, parent
+    for child in (topic.get('children') or {}).get('attached') or []:
+        yield from iter_topics(child, topic)
+
+
+def find_topic(root: dict, title: str) -> tuple:
+    return next((topic, parent) for topic, parent in iter_topics(root) if topic['title'] == title)
+
+
+def read_sheets(excel_file_path: str) -> dict:
+    """读取测试用例和模块 sheet 页的用例，每行为 {表头: 值}，忽略空行"""
+    wb = load_workbook(excel_file_path)
+    sheets = {}
+    for sheet in wb.worksheets:
+        if sheet.title == ANALYSIS_SHEET_NAME:
+            continue
+        headers = [cell.value for cell in sheet[1]]
+        rows = [dict(zip(headers, values)) for values in sheet.iter_rows(min_row=2, values_only=True)]
+        sheets[sheet.title] = [row for row in rows if row.get('用例名称')]
+    return sheets
+
+
+def without_results(sheets: dict) -> dict:
+    return {
+        name: [{header: value for header, value in row.items() if not is_result_header(header)} for row in rows]
+        for name, rows in sheets.items()
+    }
+
+
+def update(excel_file_path: str, xmind_file_path: str) -> dict:
+    with contextlib.redirect_stdout(io.StringIO()):
+        return update_excel_by_xmind(excel_file_path, xmind_file_path, 'sheet1')
+
+
+def convert_fresh(xmind_file_path: str) -> dict:
+    with contextlib.redirect_stdout(io.StringIO()):
+        return read_sheets(xmind_to_excel(xmind_file_path, 'sheet1', classify=True, output_name='fresh.xlsx'))
+
+
+def test_unchanged_xmind(converted):
+    xmind_file_path, excel_file_path = converted
+    before = read_sheets(excel_file_path)
+
+    result = update(excel_file_path, xmind_file_path)
+
+    assert result[TESTCASE_SHEET_NAME] == {'added': 0, 'removed': 0, 'updated': 0, 'unchanged': 30}
+    assert ANALYSIS_SHEET_NAME not in result
+    assert read_sheets(excel_file_path) == before
+
+
+def test_added_removed_and_modified_cases(converted):
+    """只修改有变化的用例，结果与重新转换一致，已有用例的执行结果保留，新增用例的执行结果为空"""
+    xmind_file_path, excel_file_path = converted
+
+    def edit(root):
+        # 修改用例3的预期结果，删除用例5，在用例1后面新增一条用例
+        exp, _ = find_topic(root, 'exp: 用例3的预期结果1')
+        exp['title'] = 'exp: 修改的预期结果'
+        removed, parent = find_topic(root, 'title: 用例5')
+        parent['children']['attached'].remove(removed)
+        first, parent = find_topic(root, 'title: 用例1')
+        siblings = parent['children']['attached']
+        added = {'id': 'added', 'title': 'title: 新增用例', 'children': {'attached': [{'id': 'e', 'title': 'exp: 新增'}]}}
+        siblings.insert(siblings.index(first) + 1, added)
+
+    edit_xmind(xmind_file_path, edit)
+    result = update(excel_file_path, xmind_file_path)
+
+    assert result[TESTCASE_SHEET_NAME] == {'added': 1, 'removed': 1, 'updated': 1, 'unchanged': 28}
+    updated = read_sheets(excel_file_path)
+    assert without_results(updated) == without_results(convert_fresh(xmind_file_path))
+    for rows in updated.values():
+        for row in rows:
+            expected = None if row['用例名称'] == '新增用例' else f'通过-{row["用例名称"]}'
+            assert {value for header, value in row.items() if is_result_header(header)} == {expected}
+    titles = [row['用例名称'] for row in updated[TESTCASE_SHEET_NAME]]
+    assert '用例5' not in titles
+    assert titles.index('新增用例') == titles.index('用例1') + 1
+
+
+def test_removed_module(converted):
+    """模块有增减时删除或生成模块 sheet 页，并重写数据统计"""
+    xmind_file_path, excel_file_path = converted
+    module_titles = []
+
+    def edit(root):
+        modules = root['children']['attached']
+        module_titles.append(modules[-1]['title'])
+        modules.pop()
+
+    edit_xmind(xmind_file_path, edit)
+    result = update(excel_file_path, xmind_file_path)
+
+    removed_module = module_titles[0].split(':', 1)[1].strip()
+    assert result[removed_module] == 'removed'
+    assert result[ANALYSIS_SHEET_NAME] == 'rewritten'
+    assert result[TESTCASE_SHEET_NAME]['removed'] == 10
+    updated = read_sheets(excel_file_path)
+    assert removed_module not in updated
+    assert without_results(updated) == without_results(convert_fresh(xmind_file_path))
+    analysis = load_workbook(excel_file_path)[ANALYSIS_SHEET_NAME]
+    assert removed_module not in [row[0] for row in analysis.iter_rows(min_row=3, values_only=True)]
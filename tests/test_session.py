@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : test_session.py
+# @Time    : 2026-10-17 10:00:00
+# @Author  : Kelvin.Ye
+import pytest
+
+from transformer import ConversionSession
+
+
+class RecordingWriter:
+    """记录调用顺序的写入器，fail 指定的步骤抛出异常"""
+
+    def __init__(self, fail: str = None):
+        self.fail = fail
+        self.calls = []
+
+    def call(self, name: str):
+        self.calls.append(name)
+        if name == self.fail:
+            raise RuntimeError(name)
+
+    def open(self, file_path: str):
+        self.call('open')
+
+    def write_testcase(self, sheet_name: str, rows: list):
+        self.call('write')
+
+    def save(self):
+        self.call('save')
+
+    def close(self):
+        self.calls.append('close')
+
+
+@pytest.mark.parametrize('fail, calls', [
+    (None, ['open', 'write', 'save', 'close']),
+    ('open', ['open', 'close']),
+    ('write', ['open', 'write', 'close']),
+    ('save', ['open', 'write', 'save', 'close'])
+])
+def test_session_always_closes_writer(fail, calls):
+    """任意阶段失败时都会关闭写入器（释放 excelApp），只有全部成功时才保存"""
+    writer = RecordingWriter(fail)
+    if fail:
+        with pytest.raises(RuntimeError, match=fail):
+            with ConversionSession('testcase.xlsx', writer) as session:
+                session.run([])
+    else:
+        with ConversionSession('testcase.xlsx', writer) as session:
+            session.run([])
+    assert writer.calls == calls
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : test_watch.py
+# @Time    : 2026-10-17 13:00:00
+# @Author  : Kelvin.Ye
+import json
+import os
+import zipfile
+
+from cache import sheet_digest
+from generator import generate_xmind
+from watch import convert_changed_sheets
+
+
+def rename_root_topic(xmind_file_path: str, sheet_index: int, title: str):
+    with zipfile.ZipFile(xmind_file_path) as xmind:
+        sheets = json.loads(xmind.read('content.json'))
+    sheets[sheet_index]['rootTopic']['title'] = title
+    with zipfile.ZipFile(xmind_file_path, 'w') as xmind:
+        xmind.writestr('content.json', json.dumps(sheets, ensure_ascii=False))
+
+
+def test_convert_changed_sheets(tmp_path):
+    """只转换内容有变化的 sheet 页，哈希值与 sheet_digest 一致"""
+    xmind_file_path = str(tmp_path / 'cases.xmind')
+    generate_xmind(xmind_file_path, cases=20, modules=2, sheets=3)
+    output_path = tmp_path / 'watch'
+    output_path.mkdir()
+    options = {
+        'sheet_selectors': ['sheet1', 'sheet2'],
+        'classify': False,
+        'backend': 'openpyxl',
+        'spec': None,
+        'analysis_mode': 'formula',
+        'schema': None,
+        'output_path': str(output_path)
+    }
+
+    # 启动时只计算哈希值
+    baseline = convert_changed_sheets(xmind_file_path, {}, dict(options, convert=False))
+    assert baseline['error'] is None
+    assert baseline['digests'] == {name: sheet_digest(xmind_file_path, name) for name in ('sheet1', 'sheet2')}
+    assert baseline['sheets'] == []
+    assert os.listdir(output_path) == []
+
+    # 内容没有变化时不写入
+    unchanged = convert_changed_sheets(xmind_file_path, baseline['digests'], dict(options, convert=True))
+    assert unchanged['digests'] == baseline['digests']
+    assert unchanged['sheets'] == []
+    assert os.listdir(output_path) == []
+
+    rename_root_topic(xmind_file_path, 1, '修改的根主题')
+    changed = convert_changed_sheets(xmind_file_path, baseline['digests'], dict(options, convert=True))
+    assert changed['error'] is None
+    assert [(sheet['sheet'], sheet['cases'], sheet['error']) for sheet in changed['sheets']] == [('sheet2', 20, None)]
+    assert changed['digests'] == {name: sheet_digest(xmind_file_path, name) for name in ('sheet1', 'sheet2')}
+    assert changed['digests']['sheet2'] != baseline['digests']['sheet2']
+    assert os.listdir(output_path) == ['[testcase]cases-sheet2.xlsx']
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : test_zen_reader.py
+# @Time    : 2026-10-17 09:00:00
+# @Author  : Kelvin.Ye
+import io
+import json
+import random
+import zipfile
+
+import pytest
+
+import transformer
+from transformer import TOPIC_END
+from transformer import TOPIC_START
+from transformer import ZenContentReader
+from transformer import iter_zen_topic
+
+
+# 每次读取的字节数，7 字节时几乎所有的值都跨越缓冲区
+CHUNK_SIZES = (7, 64, 1000, 65536)
+
+ATTACHMENT_HREF = 'xap:attachments/a.png'
+
+
+def random_topic(rng: random.Random, depth: int) -> dict:
+    """随机生成主题，属性顺序随机，包括 XMind 不读取的属性和 detached 子主题"""
+    items = [
+        ('id', str(rng.random())),
+        ('title', rng.choice(['module: 甲', 'exp: 成功"\\n', 'x' * rng.randint(0, 300), '标题', None])),
+        ('position', {'x': rng.randint(-999, 999), 'y': 1.5e3}),
+        ('markers', [{'markerId': 'priority-1'}, None, True])
+    ]
+    if rng.random() < 0.2:
+        items.append(('href', rng.choice([ATTACHMENT_HREF, 'http://example.com'])))
+    if depth and rng.random() < 0.8:
+        children = {'attached': [random_topic(rng, depth - 1) for _ in range(rng.randint(0, 4))]}
+        if rng.random() < 0.2:
+            children = {'detached': [random_topic(rng, 0)], **children}
+        items.append(('children', children))
+    if rng.random() < 0.1:
+        items = [item for item in items if item[0] != 'title']
+    if rng.random() < 0.3:
+        rng.shuffle(items)
+    return dict(items)
+
+
+def random_content(rng: random.Random) -> list:
+    sheets = []
+    for index in range(rng.randint(1, 3)):
+        items = [('id', 's'), ('title', f'sheet{index}'), ('theme', {'a': [1, 2, {'b': None}]})]
+        if rng.random() < 0.9:
+            items.append(('rootTopic', random_topic(rng, rng.randint(0, 6))))
+        if rng.random() < 0.3:
+            rng.shuffle(items)
+        sheets.append(dict(items))
+    return sheets
+
+
+def has_attachment_after_children(topic: dict) -> bool:
+    """主题树中是否存在附件 href 在 children 之后的主题"""
+    keys = list(topic)
+    if topic.get('href') == ATTACHMENT_HREF and 'children' in keys and keys.index('href') > keys.index('children'):
+        return True
+    children = topic.get('children') or {}
+    return any(has_attachment_after_children(child) for child in children.get('attached') or [])
+
+
+def read_sheets(data: bytes, chunk_size: int) -> list:
+    return [(title, list(events)) for title, events in ZenContentReader(io.BytesIO(data), chunk_size).iter_sheets()]
+
+
+def write_xmind(file_path, content_name: str, content: str):
+    with zipfile.ZipFile(file_path, 'w') as xmind:
+        xmind.writestr(content_name, content)
+
+
+@pytest.mark.parametrize('seed', range(60))
+def test_streaming_matches_decoded_content(seed):
+    """流式读取的主题事件与整体解码 content.json 后遍历的结果相同
+
+    附件 href 在 children 之后且 children 不完整地位于缓冲区内时，只允许抛出 ValueError，不允许丢失 [Attachment] 前缀
+    """
+    rng = random.Random(seed)
+    sheets = random_content(rng)
+    text = json.dumps(sheets, ensure_ascii=rng.random() < 0.5, indent=rng.choice([None, 1]))
+    data = (b'\xef\xbb\xbf' if rng.random() < 0.2 else b'') + text.encode('utf-8')
+    expected = [
+        (sheet.get('title'), list(iter_zen_topic(sheet['rootTopic'])) if 'rootTopic' in sheet else [])
+        for sheet in sheets
+    ]
+    reordered = any(has_attachment_after_children(sheet['rootTopic']) for sheet in sheets if 'rootTopic' in sheet)
+    for chunk_size in CHUNK_SIZES:
+        try:
+            assert read_sheets(data, chunk_size) == expected, chunk_size
+        except ValueError as e:
+            assert reordered and 'href' in str(e), chunk_size
+
+
+def test_attachment_after_children():
+    """附件 href 在 children 之后：children 完整位于缓冲区内时仍添加前缀，否则抛出 ValueError"""
+    topic = {'title': 'root', 'children': {'attached': [{'title': 'x' * 200}]}, 'href': ATTACHMENT_HREF}
+    data = json.dumps([{'title': 's', 'rootTopic': topic}]).encode('utf-8')
+    expected = [(TOPIC_START, '[Attachment]root'), (TOPIC_START, 'x' * 200), (TOPIC_END, None), (TOPIC_END, None)]
+    assert read_sheets(data, 65536) == [('s', expected)]
+    with pytest.raises(ValueError, match='href'):
+        read_sheets(data, 16)
+
+
+@pytest.mark.parametrize('content', [
+    b'[{"title": "a", "rootTopic": {"title": "r", "children": {"attached": [{"title": "x"}',
+    b'[{"title": "a", "rootTopic": {"title" "r"}}]',
+    b'{}'
+])
+def test_malformed_content(content):
+    with pytest.raises(ValueError):
+        for _, events in ZenContentReader(io.BytesIO(content), 8).iter_sheets():
+            list(events)
+
+
+def test_sheet_without_root_topic(tmp_path):
+    """XMind Zen 和 XMind 8 的 sheet 页没有根主题时都没有主题事件，转换时报告同样的错误"""
+    zen_file_path = tmp_path / 'zen.xmind'
+    write_xmind(zen_file_path, 'content.json', json.dumps([{'title': 's'}, {'title': 't', 'rootTopic': None}]))
+    legacy_file_path = tmp_path / 'legacy.xmind'
+    write_xmind(legacy_file_path, 'content.xml', (
+        '<xmap-content xmlns="urn:xmind:xmap:xmlns:content:2.0" xmlns:xlink="http://www.w3.org/1999/xlink">'
+        '<sheet id="1"><title>s</title></sheet><sheet id="2"><title>t</title></sheet></xmap-content>'
+    ))
+    for file_path in (zen_file_path, legacy_file_path):
+        assert transformer.get_xmind_sheet_names(str(file_path)) == ['s', 't']
+        assert [(name, list(events)) for name, events in transformer.iter_xmind_sheets(str(file_path))] == [
+            ('s', []), ('t', [])
+        ]
+        with pytest.raises(Exception, match='没有根主题'):
+            transformer.xmind_to_rows(str(file_path), 't')
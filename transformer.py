@@ -3,14 +3,26 @@
 # @File    : transformer.py
 # @Time    : 2021-11-08 14:06:05
 # @Author  : Kelvin.Ye
+import codecs
+import json
 import os
 import platform
+import re
 import shutil
+import site
 import sys
+import zipfile
+from copy import copy
 from datetime import datetime
+from operator import add
+from xml.etree import ElementTree
 
-import xlwings as xw
-from xmindparser import xmind_to_dict
+from instrument import TimedIterator
+from instrument import progress
+from instrument import record_stage
+from instrument import stage
+from schema import DEFAULT_SCHEMA
+from schema import TagSchema
 
 
 # 添加项目路径到 system-path
@@ -19,6 +31,65 @@ sys.path.append(os.path.dirname(sys.path[0]))
 # 项目路径
 PROJECT_PATH = os.path.abspath(os.path.dirname(__file__))
 
+# 输出目录，相对于当前工作目录
+OUTPUT_PATH = 'output'
+
+# 测试用例模板文件名称
+TEMPLATE_FILE_NAME = 'testcase.template.xlsx'
+
+
+def find_template_file() -> str:
+    """查找测试用例模板文件，优先使用项目路径下的模板，pip 安装时模板位于 <prefix>/share/xmind-to-excel"""
+    for path in (PROJECT_PATH, sys.prefix, site.USER_BASE or ''):
+        if path != PROJECT_PATH:
+            path = os.path.join(path, 'share', 'xmind-to-excel')
+        file_path = os.path.join(path, TEMPLATE_FILE_NAME)
+        if os.path.isfile(file_path):
+            return file_path
+    return os.path.join(PROJECT_PATH, TEMPLATE_FILE_NAME)
+
+
+# 测试用例模板文件路径
+TEMPLATE_FILE_PATH = find_template_file()
+
+# 测试用例 sheet 页名称
+TESTCASE_SHEET_NAME = '测试用例'
+
+# 模板 sheet 页名称
+TEMPLATE_SHEET_NAME = '模板'
+
+# 数据统计 sheet 页名称
+ANALYSIS_SHEET_NAME = '数据统计'
+
+# 工作进程内缓存的模板文件内容，进程存活期间只读取一次
+_template_content = None
+
+
+def get_output_file_path(file_name: str) -> str:
+    """获取当前工作目录的 output 目录下的文件路径，文件名称前面加上当前时间
+
+    Args:
+        file_name (str): 文件名称（需要文件后缀）
+
+    Raises:
+        Exception: 目标文件已存在
+
+    Returns:
+        str: 文件路径
+    """
+    # 判断 output 目录是否存在，不存在则新建
+    output_path = os.path.abspath(OUTPUT_PATH)
+    # 并行转换时可能同时创建目录
+    os.makedirs(output_path, exist_ok=True)
+
+    file_name = datetime.now().strftime(r'[%Y-%m-%d_%H.%M.%S]') + file_name
+    target_file_path = os.path.join(output_path, file_name)
+
+    # 判断目标文件是否存在
+    if os.path.exists(target_file_path):
+        raise Exception(f'{target_file_path} 文件已存在')
+    return target_file_path
+
 
 def copy_file_to_output(source: str, target_name: str = None) -> str:
     """复制文件至 output 目录
@@ -39,29 +110,554 @@ def copy_file_to_output(source: str, target_name: str = None) -> str:
     if not os.path.isfile(source):
         raise Exception(f'{source} 非文件')
 
-    # 判断 output 目录是否存在，不存在则新建
-    output_path = os.path.join(PROJECT_PATH, 'output')
-    if not os.path.exists(output_path):
-        os.mkdir(output_path)
-
     # 存在 target_name 时修改复制后的文件名为 target_name
     file_name = target_name
     if not file_name:
         file_name = os.path.split(source)[1]
     name, ext = os.path.splitext(file_name)
-    name = datetime.now().strftime(r'[%Y-%m-%d_%H.%M.%S]') + name
-    file_name = name + '.xlsx'
-    target_file_path = os.path.join(output_path, file_name)
-
-    # 判断目标文件是否存在
-    if os.path.exists(target_file_path):
-        raise Exception(f'{target_file_path} 文件已存在')
+    target_file_path = get_output_file_path(name + '.xlsx')
 
     # 复制文件
     shutil.copyfile(source, target_file_path)
     return target_file_path
 
 
+# XMind Zen 的内容文件
+XMIND_ZEN_CONTENT = 'content.json'
+# XMind 8 及以前版本的内容文件
+XMIND_LEGACY_CONTENT = 'content.xml'
+
+# 主题事件：开始遍历主题（携带主题标题）和结束遍历主题
+TOPIC_START = 'start'
+TOPIC_END = 'end'
+
+XLINK_HREF = '{http://www.w3.org/1999/xlink}href'
+
+
+def get_xmind_sheet_names(file_path: str) -> list:
+    """获取 xmind 文件里所有 sheet 页的名称
+
+    Args:
+        file_path (str): xmind 文件路径
+
+    Returns:
+        list: sheet 页名称
+    """
+    with zipfile.ZipFile(file_path) as xmind:
+        if XMIND_ZEN_CONTENT in xmind.namelist():
+            with xmind.open(XMIND_ZEN_CONTENT) as content:
+                return [title for title, _ in ZenContentReader(content).iter_sheets()]
+        with xmind.open(XMIND_LEGACY_CONTENT) as content:
+            return iter_legacy_sheet_names(content)
+
+
+def iter_xmind_sheets(file_path: str, sheet_names: list = None):
+    """流式读取 xmind 文件里的多个 sheet 页，整个 xmind 文件只读取和解析一次
+
+    Args:
+        file_path (str): xmind 文件路径
+        sheet_names (list, optional): 需要读取的 sheet 页名称，为空时读取所有 sheet 页
+
+    Yields:
+        tuple: (sheet 页名称, 主题事件)，主题事件参考 iter_xmind_sheet，需要按顺序遍历
+    """
+    with zipfile.ZipFile(file_path) as xmind:
+        if XMIND_ZEN_CONTENT in xmind.namelist():
+            with xmind.open(XMIND_ZEN_CONTENT) as content:
+                for title, events in ZenContentReader(content).iter_sheets():
+                    if sheet_names is None or title in sheet_names:
+                        yield title, events
+            return
+
+        # XMind 8 的 sheet 标题在根主题之后，需要先定位 sheet 页的序号
+        with xmind.open(XMIND_LEGACY_CONTENT) as content:
+            names = iter_legacy_sheet_names(content)
+        indexes = [index for index, name in enumerate(names) if sheet_names is None or name in sheet_names]
+        if not indexes:
+            return
+        with xmind.open(XMIND_LEGACY_CONTENT) as content:
+            for index, events in enumerate(iter_legacy_sheets(content)):
+                if index in indexes:
+                    yield names[index], events
+                # 当前 sheet 页的事件读取完才能继续读取下一个 sheet 页
+                for _ in events:
+                    pass
+                if index >= indexes[-1]:
+                    return
+
+
+def iter_xmind_sheet(file_path: str, sheet_name: str):
+    """流式读取 xmind 文件里指定 sheet 页的主题树
+
+    只解析指定的 sheet 页，不读取图片等附件。依次产出 (TOPIC_START, 标题) 和 (TOPIC_END, None) 事件，
+    第一个事件为根主题，事件按深度优先顺序成对出现
+
+    Args:
+        file_path (str): xmind 文件路径
+        sheet_name (str): xmind sheet 名称
+
+    Raises:
+        Exception: sheet 页不存在
+
+    Yields:
+        tuple: (事件, 主题标题)
+    """
+    for _, events in iter_xmind_sheets(file_path, [sheet_name]):
+        yield from events
+        return
+    raise Exception(f'sheet页:[ {sheet_name} ] 不存在')
+
+
+JSON_WHITESPACE = re.compile(r'[ \t\n\r]*')
+JSON_NUMBER = re.compile(r'-?(?:0|[1-9]\d*)(\.\d+)?([eE][-+]?\d+)?')
+JSON_CONSTANTS = {'true': True, 'false': False, 'null': None}
+JSON_DECODER = json.JSONDecoder()
+
+
+def decode_json_iteratively(content: str, index: int) -> tuple:
+    """使用显式栈解码一个 json 值，不受递归深度限制
+
+    Args:
+        content (str): json 文本
+        index (int): 开始解码的位置
+
+    Raises:
+        ValueError: json 格式不正确
+
+    Returns:
+        tuple: (解码后的值, 结束位置)
+    """
+    scanstring = json.decoder.scanstring
+    # 未闭合的容器和对象当前的 key
+    containers = []
+    keys = []
+
+    def read_key(index):
+        if content[index] != '"':
+            raise ValueError(f'json 格式不正确，位置: {index}')
+        key, index = scanstring(content, index + 1)
+        index = JSON_WHITESPACE.match(content, index).end()
+        if content[index] != ':':
+            raise ValueError(f'json 格式不正确，位置: {index}')
+        return key, JSON_WHITESPACE.match(content, index + 1).end()
+
+    index = JSON_WHITESPACE.match(content, index).end()
+    while True:
+        # 读取一个值，遇到非空容器时入栈并继续读取容器的第一个值
+        char = content[index]
+        if char in '{[':
+            value = {} if char == '{' else []
+            index = JSON_WHITESPACE.match(content, index + 1).end()
+            if content[index] != ('}' if char == '{' else ']'):
+                containers.append(value)
+                key = None
+                if char == '{':
+                    key, index = read_key(index)
+                keys.append(key)
+                continue
+            index += 1
+        elif char == '"':
+            value, index = scanstring(content, index + 1)
+        else:
+            match = JSON_NUMBER.match(content, index)
+            if match:
+                number = match.group()
+                value = float(number) if match.group(1) or match.group(2) else int(number)
+                index = match.end()
+            else:
+                for literal, constant in JSON_CONSTANTS.items():
+                    if content.startswith(literal, index):
+                        value = constant
+                        index += len(literal)
+                        break
+                else:
+                    raise ValueError(f'json 格式不正确，位置: {index}')
+
+        # 值读取完成，添加到容器中，容器闭合时继续向上添加
+        while True:
+            if not containers:
+                return value, index
+            container = containers[-1]
+            if isinstance(container, dict):
+                container[keys[-1]] = value
+            else:
+                container.append(value)
+            index = JSON_WHITESPACE.match(content, index).end()
+            char = content[index]
+            if char == ',':
+                index = JSON_WHITESPACE.match(content, index + 1).end()
+                if isinstance(container, dict):
+                    keys[-1], index = read_key(index)
+                break
+            if char != ('}' if isinstance(container, dict) else ']'):
+                raise ValueError(f'json 格式不正确，位置: {index}')
+            index += 1
+            value = containers.pop()
+            keys.pop()
+
+
+def zen_topic_title(topic: dict) -> str:
+    title = topic.get('title', '')
+    link = topic.get('href')
+    if link and link.startswith('xap:attachments'):
+        title = f'[Attachment]{title}'
+    return title
+
+
+def zen_topic_children(topic: dict) -> list:
+    children = topic.get('children')
+    if children:
+        return children.get('attached') or []
+    return []
+
+
+def iter_zen_topic(root: dict):
+    """迭代遍历 XMind Zen 的主题树"""
+    yield TOPIC_START, zen_topic_title(root)
+    stack = [iter(zen_topic_children(root))]
+    while stack:
+        topic = next(stack[-1], None)
+        if topic is None:
+            stack.pop()
+            yield TOPIC_END, None
+            continue
+        yield TOPIC_START, zen_topic_title(topic)
+        stack.append(iter(zen_topic_children(topic)))
+
+
+# content.json 每次读取的字节数，缓冲区最多保留约两倍的内容
+ZEN_CHUNK_SIZE = 64 * 1024
+
+# 读取 content.json 时未闭合的容器：主题对象、主题的 children 对象、children 的 attached 数组
+ZEN_TOPIC = 'topic'
+ZEN_CHILDREN = 'children'
+ZEN_ATTACHED = 'attached'
+
+
+class ZenContentReader:
+    """流式读取 XMind Zen 的 content.json，不一次性读取和解码整个文件
+
+    只按结构读取 sheet 页的 title、rootTopic 和主题的 title、href、children.attached，其他属性解码后丢弃。
+    完整位于缓冲区内的主题直接用 json 解码后遍历，跨越缓冲区的主题逐个属性读取，
+    内存占用只与缓冲区大小和主题层级有关，与文件大小无关。
+
+    XMind 写入的 title、href 在 children 之前，children 出现在 title 之前时解码整个 children 后再遍历；
+    children 出现在 href 之前时，完整位于缓冲区内的 children 解码后再遍历，否则无法确定主题的 [Attachment] 前缀，
+    读取到附件的 href 时抛出 ValueError。sheet 页没有 rootTopic 时不产出主题事件，与 XMind 8 一致
+
+    Args:
+        content: content.json 的二进制文件对象
+        chunk_size (int, optional): 每次读取的字节数
+
+    Usage:
+        with xmind.open(XMIND_ZEN_CONTENT) as content:
+            for title, events in ZenContentReader(content).iter_sheets():
+                ...
+    """
+
+    def __init__(self, content, chunk_size: int = ZEN_CHUNK_SIZE):
+        self.content = content
+        self.chunk_size = chunk_size
+        self.decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        self.text = ''
+        self.pos = 0
+        # text[0] 在整个文件中的位置
+        self.offset = 0
+        self.eof = False
+        # 整体解码主题失败后，读取到该位置之前不再尝试整体解码
+        self.decode_from = 0
+
+    def fill(self, size: int = None):
+        """丢弃已读取的内容并读取下一块"""
+        data = self.content.read(size or self.chunk_size)
+        self.offset += self.pos
+        self.text = self.text[self.pos:] + self.decoder.decode(data, final=not data)
+        self.pos = 0
+        self.eof = not data
+
+    def error(self) -> ValueError:
+        return ValueError(f'json 格式不正确，位置: {self.offset + self.pos}')
+
+    def peek(self) -> str:
+        """跳过空白字符，返回下一个字符"""
+        while True:
+            self.pos = JSON_WHITESPACE.match(self.text, self.pos).end()
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if self.eof:
+                raise self.error()
+            self.fill()
+
+    def begin(self, opening: str) -> bool:
+        """读取容器的开始字符，返回容器是否非空"""
+        if self.peek() != opening:
+            raise self.error()
+        self.pos += 1
+        if self.peek() == ('}' if opening == '{' else ']'):
+            self.pos += 1
+            return False
+        return True
+
+    def next_item(self, closing: str) -> bool:
+        """读取一个元素之后的逗号或容器的结束字符，返回容器是否还有元素"""
+        char = self.peek()
+        self.pos += 1
+        if char == ',':
+            return True
+        if char != closing:
+            self.pos -= 1
+            raise self.error()
+        return False
+
+    def read_key(self) -> str:
+        if self.peek() != '"':
+            raise self.error()
+        key = self.read_value()
+        if self.peek() != ':':
+            raise self.error()
+        self.pos += 1
+        return key
+
+    def read_value(self):
+        """解码一个 json 值，值跨越缓冲区时成倍读取后重新解码"""
+        self.peek()
+        while True:
+            try:
+                try:
+                    value, end = JSON_DECODER.raw_decode(self.text, self.pos)
+                except RecursionError:
+                    value, end = decode_json_iteratively(self.text, self.pos)
+            except (ValueError, IndexError):
+                if self.eof:
+                    raise
+                self.fill(max(self.chunk_size, len(self.text) - self.pos))
+                continue
+            # 缓冲区末尾的数字可能不完整
+            if end == len(self.text) and not self.eof:
+                self.fill()
+                continue
+            self.pos = end
+            return value
+
+    def decode_buffered(self) -> tuple:
+        """整体解码当前位置的主题或 children
+
+        Returns:
+            tuple: (是否解码成功, 值)，值不完整地位于缓冲区内时解码失败，需要逐个属性读取
+        """
+        if self.offset + self.pos < self.decode_from:
+            return False, None
+        self.peek()
+        if len(self.text) - self.pos < self.chunk_size and not self.eof:
+            self.fill()
+        try:
+            value, self.pos = JSON_DECODER.raw_decode(self.text, self.pos)
+        except (ValueError, RecursionError):
+            # 失败时最多浪费一次缓冲区大小的解码，逐个属性读取半个缓冲区后再尝试
+            self.decode_from = self.offset + self.pos + self.chunk_size // 2
+            return False, None
+        return True, value
+
+    def iter_topic(self):
+        """从当前位置读取一个主题，依次产出主题事件，参考 iter_zen_topic"""
+        # 未闭合的容器：[类型, 已读取的主题属性, 是否已产出开始事件]
+        frames = []
+        state = ZEN_TOPIC
+        while True:
+            if state == ZEN_TOPIC:
+                # 当前位置是一个主题
+                decoded, topic = self.decode_buffered()
+                if decoded:
+                    yield from iter_zen_topic(topic)
+                    state = 'next'
+                else:
+                    frames.append([ZEN_TOPIC, {}, False])
+                    state = 'key' if self.begin('{') else 'close'
+            elif state == 'key':
+                # 当前位置是对象的一个属性
+                kind, topic, started = frames[-1]
+                key = self.read_key()
+                state = 'next'
+                if kind == ZEN_CHILDREN:
+                    if key == 'attached':
+                        frames.append([ZEN_ATTACHED, None, False])
+                        state = ZEN_TOPIC if self.begin('[') else 'close'
+                    else:
+                        self.read_value()
+                elif key == 'children' and 'title' in topic and not started:
+                    # children 之后可能还有 href，完整位于缓冲区内时先解码，主题闭合时再遍历
+                    decoded, children = self.decode_buffered()
+                    if decoded:
+                        topic[key] = children
+                    else:
+                        frames[-1][2] = True
+                        yield TOPIC_START, zen_topic_title(topic)
+                        frames.append([ZEN_CHILDREN, None, False])
+                        state = 'key' if self.begin('{') else 'close'
+                elif key == 'href' and started:
+                    # 开始事件已产出，无法再添加 [Attachment] 前缀
+                    link = self.read_value()
+                    if link and link.startswith('xap:attachments'):
+                        raise ValueError(f'topic:[ {topic["title"]} ] 的附件 href 在 children 之后，无法流式读取')
+                elif key in ('title', 'href', 'children'):
+                    topic[key] = self.read_value()
+                else:
+                    self.read_value()
+            elif state == 'next':
+                # 一个属性或元素读取完成
+                if not frames:
+                    return
+                state = 'close'
+                if frames[-1][0] == ZEN_ATTACHED:
+                    if self.next_item(']'):
+                        state = ZEN_TOPIC
+                elif self.next_item('}'):
+                    state = 'key'
+            else:
+                # 容器已闭合
+                kind, topic, started = frames.pop()
+                if kind == ZEN_TOPIC:
+                    if not started:
+                        yield TOPIC_START, zen_topic_title(topic)
+                    # children 在 title 或 href 之前时已整体解码
+                    for child in zen_topic_children(topic):
+                        yield from iter_zen_topic(child)
+                    yield TOPIC_END, None
+                state = 'next'
+
+    def iter_sheets(self):
+        """依次读取 sheet 页
+
+        Yields:
+            tuple: (sheet 页名称, 主题事件)，主题事件需要在读取下一个 sheet 页之前遍历，未遍历的事件会被跳过
+        """
+        if not self.begin('['):
+            return
+        while True:
+            sheet = {}
+            events = None
+            if self.begin('{'):
+                while True:
+                    key = self.read_key()
+                    if key == 'rootTopic' and 'title' in sheet and self.peek() == '{':
+                        events = self.iter_topic()
+                        yield sheet['title'], events
+                        # 跳过调用方未遍历的主题
+                        for _ in events:
+                            pass
+                    elif key in ('title', 'rootTopic'):
+                        sheet[key] = self.read_value()
+                    else:
+                        self.read_value()
+                    if not self.next_item('}'):
+                        break
+            if events is None:
+                # rootTopic 在 title 之前时已整体解码，没有 rootTopic 时不产出主题事件
+                root = sheet.get('rootTopic')
+                yield sheet.get('title'), iter_zen_topic(root) if root else iter(())
+            if not self.next_item(']'):
+                return
+
+
+def local_tag(tag: str) -> str:
+    """移除 xml 标签的命名空间"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def iter_legacy_sheet_names(content) -> list:
+    """流式读取 content.xml 里所有 sheet 页的名称"""
+    names = []
+    depth = 0
+    for event, elem in ElementTree.iterparse(content, events=('start', 'end')):
+        if event == 'start':
+            depth += 1
+            continue
+        depth -= 1
+        # <xmap-content><sheet><title>
+        if depth == 2 and local_tag(elem.tag) == 'title':
+            names.append(elem.text or '')
+        # 读取完成的元素立即清空，避免整棵树驻留内存
+        elem.clear()
+    return names
+
+
+def iter_legacy_sheets(content):
+    """流式读取 content.xml 里的 sheet 页
+
+    Yields:
+        主题事件，需要遍历完当前 sheet 页的事件后再获取下一个 sheet 页
+    """
+    parser = ElementTree.iterparse(content, events=('start', 'end'))
+    for event, elem in parser:
+        if event == 'start' and local_tag(elem.tag) == 'sheet':
+            yield iter_legacy_sheet_topic(parser)
+        elif event == 'end':
+            elem.clear()
+
+
+def iter_legacy_sheet_topic(parser):
+    """从 sheet 页的开始位置继续流式遍历主题树，只遍历 attached 子主题"""
+    # 已打开的元素：[(标签, 是否跳过)]
+    elements = [('sheet', False)]
+    # 已打开的主题：[[标题, 是否已产出 TOPIC_START, 是否包含图片, 链接]]
+    topics = []
+    # 需要跳过的元素层数（detached、summary 等非 attached 主题）
+    skipping = 0
+
+    for event, elem in parser:
+        tag = local_tag(elem.tag)
+        if event == 'start':
+            parent = elements[-1][0]
+            skip = (
+                skipping > 0 or  # noqa
+                (tag == 'topics' and elem.get('type') != 'attached') or  # noqa
+                (tag == 'topic' and parent not in ('sheet', 'topics'))
+            )
+            elements.append((tag, skip))
+            if skip:
+                skipping += 1
+                continue
+            if tag == 'topic':
+                # 存在子主题时，父主题的标题已经读取完毕
+                if topics and not topics[-1][1]:
+                    topics[-1][1] = True
+                    yield TOPIC_START, legacy_topic_title(topics[-1])
+                topics.append([None, False, False, elem.get(XLINK_HREF)])
+            continue
+
+        tag, skip = elements.pop()
+        # sheet 页结束（sheet 页没有根主题）
+        if not elements:
+            elem.clear()
+            return
+        parent = elements[-1][0]
+        if skip:
+            skipping -= 1
+        elif tag == 'title' and parent == 'topic':
+            topics[-1][0] = elem.text
+        elif tag == 'img' and parent == 'topic':
+            topics[-1][2] = True
+        elif tag == 'topic':
+            topic = topics.pop()
+            if not topic[1]:
+                yield TOPIC_START, legacy_topic_title(topic)
+            yield TOPIC_END, None
+            # 根主题遍历完成，sheet 页剩余的内容交回给 iter_legacy_sheets
+            if not topics:
+                elem.clear()
+                return
+        # 读取完成的元素立即清空，避免整棵树驻留内存
+        elem.clear()
+
+
+def legacy_topic_title(topic: list) -> str:
+    title, _, has_image, link = topic
+    title = '[Image]' if has_image else (title or '')
+    if link and link.startswith('xap:attachments'):
+        title = f'[Attachment]{title}'
+    return title
+
+
 def parse_xmind_by_sheet(file_path: str, sheet_name: str) -> dict:
     """解析 xmind 文件里指定的 sheet 页
 
@@ -75,106 +671,308 @@ def parse_xmind_by_sheet(file_path: str, sheet_name: str) -> dict:
     Returns:
         dict: xmind-dict
     """
-    sheets = xmind_to_dict(file_path)
-    specified_sheet = [sheet for sheet in sheets if sheet['title'] == sheet_name]
-    if not specified_sheet:
-        raise Exception(f'sheet页:[ {sheet_name} ] 不存在')
-    sheet = specified_sheet[0]
-    return sheet
-
-
-def check_topics_format(topics: list):
-    for topic in topics:
-        # 中文冒号替换为英文冒号
-        title = topic['title'].replace('：', ':')
-        if ':' not in title and (
-            title.startswith('module') or  # noqa
-            title.startswith('path') or  # noqa
-            title.startswith('func') or  # noqa
-            title.startswith('title') or  # noqa
-            title.startswith('pre') or  # noqa
-            title.startswith('step') or  # noqa
-            title.startswith('exp')  # noqa
-        ):
-            raise Exception(f'topic:[ {title} ] 格式不正确')
-        if 'topics' in topic:
-            check_topics_format(topic['topics'])
-
-
-TAGS = ['module', 'path', 'func', 'title', 'pre', 'step', 'exp']
-
-
-def parse_topic(topic):
-    # 中文冒号替换为英文冒号
-    data = topic['title'].replace('：', ':')
-    # 分割标签和内容
-    splits = data.split(':')
-    has_tag = False
-    tag = ''
-    text = ''
-    if len(splits) >= 2:
-        tag = splits[0]
-        tag = tag.strip()  # 移除首尾空格
-        if tag in TAGS:
-            has_tag = True
-            text = ':'.join(splits[1:])
-            text = text.strip()  # 移除首尾空格
-    return has_tag, tag, text
-
-
-def topics_to_rows(topics: list, rows: list, metadata: dict, classified_data: dict = None) -> None:
-    for topic in topics:
-        # 解析主题
-        has_tag, tag, text = parse_topic(topic)
-        # 添加用例原始数据
-        has_tag and metadata[tag].append(text)
-        # 存在子 topic 时，递归解析
-        if 'topics' in topic:
-            topics_to_rows(topic['topics'], rows, metadata, classified_data)
-        # 遍历至 topic 路径末端时，组装数据并添加至用例集
+    root = {}
+    stack = []
+    for event, title in iter_xmind_sheet(file_path, sheet_name):
+        if event == TOPIC_END:
+            stack.pop()
+            continue
+        topic = {'title': title}
+        if stack:
+            stack[-1].setdefault('topics', []).append(topic)
         else:
-            # topic 路径上存在 title 才识别为一条用例
-            if metadata['title']:
-                module = '-'.join(metadata['module'])
-                full_path = metadata['root'] + '-' + module + '-' + '-'.join(metadata['path'])
-                func = '-'.join(metadata['func'])
-                title = '-'.join(metadata['title'])
-
-                # 抵达 topic 路径末端时，判断用例是否已存在，存在则拼接预期结果，不存在则添加用例
-                # path、func 和 title 相同代表末端有多个 exp （预期结果）
-                match = [row for row in rows if row['path'] == full_path and row['func'] == func and row['title'] == title]
-                if match:
-                    existed_row = match[0]
-                    existed_row['exp'] = existed_row['exp'] + '\n' + '-'.join(metadata['exp'])
-                else:
-                    rows.append({
-                        'path': full_path,
-                        'func': func,
-                        'title': title,
-                        'pre': '-'.join(metadata['pre']),
-                        'step': '-'.join(metadata['step']),
-                        'exp': '-'.join(metadata['exp'])
-                    })
-                    # 分类 module 到不同的 sheet 页
-                    if classified_data is not None:
-                        sheet_rows = classified_data.get(module, [])
-                        sheet_rows.append({
-                            'path': '-'.join(metadata['path']),
-                            'func': func,
-                            'title': title,
-                            'pre': '-'.join(metadata['pre']),
-                            'step': '-'.join(metadata['step']),
-                            'exp': '-'.join(metadata['exp'])
-                        })
-                        classified_data[module] = sheet_rows
+            root = topic
+        stack.append(topic)
+    return {'title': sheet_name, 'topic': root}
+
+
+# 遍历完根主题的一个子主题，iter_topic_leaves 在此时 yield 该标记
+TOPIC_BOUNDARY = None
+
+
+def iter_topic_leaves(events, metadata: dict, errors: list, schema: TagSchema = None):
+    """遍历主题事件，在同一次遍历中校验主题格式并解析标签
+
+    使用显式栈遍历，不受主题层级深度限制。每抵达一个识别为用例的 topic 路径末端时 yield metadata，
+    此时 metadata 记录了 topic 路径上各个标签的内容；每遍历完根主题的一个子主题时 yield TOPIC_BOUNDARY
+
+    Args:
+        events: 根主题之后的主题事件，参考 iter_xmind_sheet
+        metadata (dict): 用例原始数据，遍历时记录 topic 路径上各个标签的内容
+        errors (list): 主题格式错误，存在格式错误后不再 yield 用例
+        schema (TagSchema, optional): 标签定义. Defaults to DEFAULT_SCHEMA
+    """
+    parse_topic = (schema or DEFAULT_SCHEMA).parse_topic
+    is_malformed = (schema or DEFAULT_SCHEMA).is_malformed
+    # topic 路径上各个主题的标签，无标签时为 None
+    stack = []
+    # 上一个事件为 TOPIC_START 时，遇到 TOPIC_END 代表抵达 topic 路径末端
+    is_leaf = False
+
+    for event, title in events:
+        if event == TOPIC_START:
+            # 解析主题
+            tag, text = parse_topic(title)
+            # 添加用例原始数据
+            if tag is not None:
+                metadata[tag].append(text)
+            # 校验主题格式
+            elif is_malformed(title):
+                errors.append(f'topic:[ {title} ] 格式不正确')
+            stack.append(tag)
+            is_leaf = True
+            continue
+
+        # 根主题结束
+        if not stack:
+            break
+        # 遍历至 topic 路径末端时返回用例数据（存在格式错误时不再返回）
+        # topic 路径上存在 title 才识别为一条用例
+        if is_leaf and not errors and metadata['title']:
+            yield metadata
+        is_leaf = False
         # 回溯时删除数据
-        has_tag and metadata[tag].pop()
+        tag = stack.pop()
+        tag and metadata[tag].pop()
+        if not stack:
+            yield TOPIC_BOUNDARY
+
+
+class Testcase:
+    """测试用例
+
+    rows 和 classified_data 共享同一个对象，用例目录、功能点等重复的文本使用驻留字符串，多条用例共用同一个字符串对象。
+    写入的列由标签定义按表头确定，参考 TagSchema.sheet_fields
+
+    Attributes:
+        module (str): 模块
+        path (str): 用例目录，根主题-模块-目录
+        module_path (str): 模块 sheet 页的用例目录，不包括根主题和模块
+        func (str): 功能点
+        title (str): 用例名称
+        pre (str): 前置条件
+        step (str): 用例步骤
+        exp (str): 预期结果，末端有多个 exp 时换行拼接
+        first_exp (str): 第一个预期结果，模块 sheet 页只写入第一个预期结果
+        extra (tuple): 基础标签之外的标签（e.g.: 用例类型、优先级），顺序与 TagSchema.extra_tags 一致
+    """
+
+    __slots__ = ('module', 'path', 'module_path', 'func', 'title', 'pre', 'step', 'exp', 'first_exp', 'extra')
+
+    def __init__(
+        self,
+        module: str,
+        path: str,
+        module_path: str,
+        func: str,
+        title: str,
+        pre: str,
+        step: str,
+        exp,
+        first_exp: str = None,
+        extra: tuple = ()
+    ):
+        self.module = module
+        self.path = path
+        self.module_path = module_path
+        self.func = func
+        self.title = title
+        self.pre = pre
+        self.step = step
+        self.exp = exp
+        self.first_exp = first_exp
+        self.extra = extra
+
+    def __getitem__(self, field: str):
+        # 兼容按字典的方式读取字段，e.g.: row['title']
+        return getattr(self, field)
+
+    def __eq__(self, other):
+        if not isinstance(other, Testcase):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f'Testcase(path={self.path!r}, func={self.func!r}, title={self.title!r})'
+
+    def to_dict(self, fields: list = None) -> dict:
+        """转换为字典. Defaults to 测试用例 sheet 页的字段"""
+        return {field: getattr(self, field) for field in fields or TESTCASE_FIELDS}
+
+    def finish(self):
+        """合并完成后拼接预期结果"""
+        self.first_exp = self.exp[0]
+        self.exp = '\n'.join(self.exp)
+
+
+def join_tag(metadata: dict, tag: str, joined: dict, separator: str = '-') -> str:
+    """拼接 topic 路径上某个标签的内容并驻留，内容没有变化时直接返回上一次的结果"""
+    parts = metadata[tag]
+    cached = joined.get(tag)
+    if cached is not None and cached[0] == parts:
+        return cached[1]
+    text = sys.intern(separator.join(parts))
+    joined[tag] = (parts.copy(), text)
+    return text
+
+
+def extra_tag(metadata: dict, tag: dict, joined: dict):
+    """基础标签之外的标签的值，没有拼接符时取 topic 路径上最后一个，路径上没有该标签时为默认值"""
+    parts = metadata[tag['name']]
+    if not parts:
+        return tag['default']
+    if tag['separator'] is None:
+        return parts[-1]
+    return join_tag(metadata, tag['name'], joined, tag['separator'])
+
+
+def leaf_to_row(metadata: dict, joined: dict, schema: TagSchema = None) -> Testcase:
+    """topic 路径末端的用例原始数据转换为用例，预期结果为列表，合并完成后再调用 Testcase.finish 拼接
+
+    Args:
+        metadata (dict): 用例原始数据
+        joined (dict): 上一次拼接的结果，同一次遍历共用，参考 join_tag
+        schema (TagSchema, optional): 标签定义. Defaults to DEFAULT_SCHEMA
+
+    Returns:
+        Testcase: 用例，(path, func, title) 相同时代表末端有多个 exp （预期结果）
+    """
+    schema = schema or DEFAULT_SCHEMA
+    separators = schema.separators
+    # topic 路径上没有基础标签之外的标签时直接使用默认值，不需要逐个标签处理
+    if any(schema.extra_getter(metadata)):
+        extra = tuple(extra_tag(metadata, tag, joined) for tag in schema.extra_tags)
+    else:
+        extra = schema.extra_defaults
+    module = join_tag(metadata, 'module', joined, separators['module'])
+    module_path = join_tag(metadata, 'path', joined, separators['path'])
+    cached = joined.get('full_path')
+    if cached is not None and cached[0] is module and cached[1] is module_path:
+        full_path = cached[2]
+    else:
+        path_separator = separators['path']
+        full_path = sys.intern(metadata['root'] + path_separator + module + path_separator + module_path)
+        joined['full_path'] = (module, module_path, full_path)
+    return Testcase(
+        module,
+        full_path,
+        module_path,
+        join_tag(metadata, 'func', joined, separators['func']),
+        separators['title'].join(metadata['title']),
+        join_tag(metadata, 'pre', joined, separators['pre']),
+        join_tag(metadata, 'step', joined, separators['step']),
+        [separators['exp'].join(metadata['exp'])],
+        extra=extra
+    )
+
+
+def topics_to_rows(
+    events,
+    rows: list,
+    metadata: dict,
+    classified_data: dict = None,
+    schema: TagSchema = None
+) -> None:
+    """遍历主题事件，在同一次遍历中校验主题格式、解析标签并组装用例数据
+
+    Args:
+        events: 根主题之后的主题事件，参考 iter_xmind_sheet
+        rows (list): 用例集，解析后的用例会追加到该列表
+        metadata (dict): 用例原始数据，遍历时记录 topic 路径上各个标签的内容，参考 TagSchema.create_metadata
+        classified_data (dict, optional): 按 module 分类的用例集，与 rows 共用同一个 Testcase 对象
+        schema (TagSchema, optional): 标签定义，需要与 metadata 一致. Defaults to DEFAULT_SCHEMA
+
+    Raises:
+        Exception: 主题格式不正确，遍历完成后一次性列出所有格式错误
+    """
+    # 用例索引，key 为 (path, func, title)，用于合并末端的多个 exp
+    index = {}
+    joined = {}
+    errors = []
+
+    for leaf in iter_topic_leaves(events, metadata, errors, schema):
+        if leaf is TOPIC_BOUNDARY:
+            continue
+        row = leaf_to_row(leaf, joined, schema)
+        # 抵达 topic 路径末端时，判断用例是否已存在，存在则追加预期结果，不存在则添加用例
+        key = (row.path, row.func, row.title)
+        existed_row = index.get(key)
+        if existed_row is not None:
+            existed_row.exp.extend(row.exp)
+            continue
+        rows.append(row)
+        index[key] = row
+        # 分类 module 到不同的 sheet 页，与 rows 共用同一个用例对象
+        if classified_data is not None:
+            sheet_rows = classified_data.get(row.module)
+            if sheet_rows is None:
+                sheet_rows = classified_data[row.module] = []
+            sheet_rows.append(row)
+
+    if errors:
+        raise Exception('\n'.join(errors))
+    # 遍历完成后一次性拼接预期结果
+    for row in rows:
+        row.finish()
+
+
+def iter_rows(events, metadata: dict, schema: TagSchema = None):
+    """流式遍历主题事件，逐个返回合并了预期结果的用例，只缓存根主题当前子主题下的用例
+
+    根主题的一个子主题遍历完成后才返回其中的用例，不同子主题下 (path, func, title) 相同的用例不会合并，
+    其他情况与 topics_to_rows 的结果一致
+
+    Args:
+        events: 根主题之后的主题事件，参考 iter_xmind_sheet
+        metadata (dict): 用例原始数据，参考 events_to_rows
+        schema (TagSchema, optional): 标签定义，需要与 metadata 一致. Defaults to DEFAULT_SCHEMA
+
+    Raises:
+        Exception: 主题格式不正确，遍历完成后一次性列出所有格式错误
+
+    Yields:
+        tuple: (module, row)
+    """
+    index = {}
+    joined = {}
+    pending = []
+    errors = []
+
+    for leaf in iter_topic_leaves(events, metadata, errors, schema):
+        if leaf is TOPIC_BOUNDARY:
+            for row in pending:
+                row.finish()
+                yield row.module, row
+            pending.clear()
+            index.clear()
+            continue
+        row = leaf_to_row(leaf, joined, schema)
+        key = (row.path, row.func, row.title)
+        existed_row = index.get(key)
+        if existed_row is not None:
+            existed_row.exp.extend(row.exp)
+            continue
+        pending.append(row)
+        index[key] = row
+
+    if errors:
+        raise Exception('\n'.join(errors))
 
 
 def open_excel(file_path, spec=None):
+    # xlwings 依赖本地 Excel/WPS 进程，使用时才导入
+    import xlwings as xw
+
     if spec and platform.system().lower() == 'darwin':
         app = xw.App(spec=spec, add_book=False)
-        wb = app.books.open(file_path)
+        try:
+            wb = app.books.open(file_path)
+        except Exception:
+            # 打开失败时退出新建的 excelApp，避免进程残留
+            app.quit()
+            raise
         # 禁用提示和屏幕刷新可以提升速度
         # app.display_alerts = False
         # app.screen_updating = False
@@ -184,314 +982,1111 @@ def open_excel(file_path, spec=None):
     return wb
 
 
+# 测试用例的基础字段，Testcase.to_dict 默认输出这些字段
+TESTCASE_FIELDS = ['path', 'func', 'title', 'pre', 'step', 'exp']
+
+
+def trim_empty_rows(values: list) -> list:
+    """移除末尾的空行"""
+    end = len(values)
+    while end and all(value is None or value == '' for value in values[end - 1]):
+        end -= 1
+    return values[:end]
+
+
+def copy_cell_style(source, target):
+    """跨工作簿复制单元格（或行列）样式"""
+    target.font = copy(source.font)
+    target.border = copy(source.border)
+    target.fill = copy(source.fill)
+    target.number_format = source.number_format
+    target.protection = copy(source.protection)
+    target.alignment = copy(source.alignment)
+
+
+def testcase_to_values(rows: list, fields: list = None, schema: TagSchema = None) -> list:
+    """测试用例转二维数组，按 fields 的顺序排列，用于整块写入
+
+    Args:
+        rows (list): 测试用例数据
+        fields (list, optional): 从 A 列开始每一列的字段，参考 TagSchema.sheet_fields. Defaults to 标签定义中写入的列
+        schema (TagSchema, optional): 标签定义. Defaults to DEFAULT_SCHEMA
+
+    Returns:
+        list: 二维数组，没有对应字段的列为 None
+    """
+    schema = schema or DEFAULT_SCHEMA
+    if fields is None:
+        fields = [name for _, name in schema.columns()]
+    getters = [schema.getter(field) for field in fields]
+    return [[getter(testcase) for getter in getters] for testcase in rows]
+
+
 def add_used_range_borders(sheet):
-    sheet.used_range.api.Borders(8).LineStyle = 1  # 上边框
-    sheet.used_range.api.Borders(9).LineStyle = 1  # 下边框
-    sheet.used_range.api.Borders(7).LineStyle = 1  # 左边框
-    sheet.used_range.api.Borders(10).LineStyle = 1  # 右边框
-    sheet.used_range.api.Borders(12).LineStyle = 1  # 内横边框
-    sheet.used_range.api.Borders(11).LineStyle = 1  # 内纵边框
+    # Borders 集合整体设置时同时作用于四周和内部的边框，只需要一次调用
+    sheet.used_range.api.Borders.LineStyle = 1
 
 
-def write_to_excel_by_testcase(file_path, sheet_name, rows: list):
+# 估算列宽的下限和上限（字符数）
+MIN_COLUMN_WIDTH = 10
+MAX_COLUMN_WIDTH = 60
+
+
+def estimate_column_widths(values: list) -> list:
+    """根据写入的数据估算每一列的宽度，代替逐个单元格测量的自动调整列宽
+
+    中文等全角字符按 2 个字符计算，多行文本取最长的一行，同一列的重复内容只计算一次，
+    结果限制在 MIN_COLUMN_WIDTH 至 MAX_COLUMN_WIDTH 之间
+
+    Args:
+        values (list): 二维数组，每行的列数相同，参考 testcase_to_values
+
+    Returns:
+        list: 每一列的宽度，与 values 的列一一对应，没有文本的列为 None（保留模板的列宽）
+    """
+    if not values:
+        return []
+    widths = []
+    for index in range(len(values[0])):
+        lines = set()
+        for text in {row[index] for row in values}:
+            if not isinstance(text, str):
+                continue
+            if '\n' in text:
+                lines.update(text.split('\n'))
+            else:
+                lines.add(text)
+        if not lines:
+            widths.append(None)
+            continue
+        # ASCII 字符的 UTF-8 编码为 1 个字节，中文为 3 个字节，(字节数 + 字符数) / 2 即为显示宽度
+        width = max(map(add, map(len, map(str.encode, lines)), map(len, lines)), default=0) / 2
+        widths.append(min(max(width + 2, MIN_COLUMN_WIDTH), MAX_COLUMN_WIDTH))
+    return widths
+
+
+def set_column_widths(sheet, widths: list):
+    """从 A 列开始设置列宽，只加宽列，模板中更宽的列和宽度为 None 的列不修改"""
+    for column, width in enumerate(widths, start=1):
+        if width is None:
+            continue
+        column_range = sheet.range((1, column))
+        if width > column_range.column_width:
+            column_range.column_width = width
+
+
+def read_header(sheet) -> list:
+    """读取第一行的表头，从 A 列开始直到第一个空单元格"""
+    return sheet.range('A1').expand('right').options(ndim=1).value
+
+
+def write_to_excel_by_testcase(wb, sheet_name, rows: list, schema: TagSchema = None):
     """写入excel
 
     Args:
-        file_path (str): excel 文件路径
+        wb (xlwings.Book): 已打开的工作簿
         sheet_name (str): sheet 页名称
         rows (list): 测试用例数据
-        spec (str, optional): MacOS下 excelApp 的名称. e.g.: wpsoffice
+        schema (TagSchema, optional): 标签定义，按表头确定写入的列. Defaults to DEFAULT_SCHEMA
     """
-    wb = open_excel(file_path)
+    schema = schema or DEFAULT_SCHEMA
     sheet = wb.sheets[sheet_name]
-    # 遍历写入数据
-    for rownum, testcase in enumerate(rows):
-        rownum = rownum + 2
-        print(f'No.{rownum} Testcas: {testcase}')
-        # 用例类型
-        sheet.range(f'A{rownum}').value = '功能测试'
-        # 目录
-        sheet.range(f'B{rownum}').value = testcase['path']
-        # 功能点
-        sheet.range(f'C{rownum}').value = testcase['func']
-        # 用例名称
-        sheet.range(f'D{rownum}').value = testcase['title']
-        # 前置条件
-        sheet.range(f'E{rownum}').value = testcase['pre']
-        # 用例步骤
-        sheet.range(f'F{rownum}').value = testcase['step']
-        # 预期结果
-        sheet.range(f'G{rownum}').value = testcase['exp']
-
-    # 自动调整单元格大小
-    sheet.autofit()
-    # 保存
-    wb.save()
-
-
-def classify_testcase_to_excel(file_path: str, classified_data: dict):
-    wb = open_excel(file_path)
-    template_sheet = wb.sheets['模板']
+    values = testcase_to_values(rows, schema.sheet_fields(read_header(sheet)), schema)
+    # 从 A2 开始整块写入数据
+    if values:
+        sheet.range('A2').value = values
+    print(f'sheet:[{sheet_name}] 写入 {len(rows)} 条用例')
+    # 按数据估算列宽，不使用逐个单元格测量的 autofit
+    set_column_widths(sheet, estimate_column_widths(values))
+
+
+def write_module_sheet(sheet, module: str, rows: list, schema: TagSchema = None):
+    """写入模块的测试用例，边框整块添加一次，列宽按数据估算"""
+    schema = schema or DEFAULT_SCHEMA
+    values = testcase_to_values(rows, schema.sheet_fields(read_header(sheet), module=True), schema)
+    # 从 A2 开始整块写入测试用例
+    if values:
+        sheet.range('A2').value = values
+    print(f'module:[{module}] 写入 {len(rows)} 条用例')
+    add_used_range_borders(sheet)
+    set_column_widths(sheet, estimate_column_widths(values))
+
+
+def classify_testcase_to_excel(wb, classified_data: dict, schema: TagSchema = None):
+    template_sheet = wb.sheets[TEMPLATE_SHEET_NAME]
+    layouts = plan_module_layouts(classified_data)
+    # 每种列布局从模板页复制一次并删除不需要的实际结果列，模块 sheet 页直接复制布局页，不需要再删除列
+    layout_names = []
+    for module, layout_name in layouts.items():
+        if layout_name not in layout_names:
+            layout_names.append(layout_name)
+            template_sheet.copy(after=template_sheet, name=layout_name)
+            delete_actual_results_column_by_module(wb.sheets[layout_name], module)
     # 遍历写入不同模块的测试用例
     for module, rows in classified_data.items():
-        # 从模板复制一个 sheet 页并修改为模块的名称
-        template_sheet.copy(before=template_sheet, name=module)
-        # 打开复制后的 sheet 页
-        sheet = wb.sheets[module]
-        # 遍历写入测试用例
-        for rownum, testcase in enumerate(rows):
-            rownum = rownum + 2
-            print(f'module:[{module}] No.{rownum} Testcas: {testcase}')
-            # 用例类型
-            sheet.range(f'A{rownum}').value = '功能测试'
-            # 目录
-            sheet.range(f'B{rownum}').value = testcase['path']
-            # 功能点
-            sheet.range(f'C{rownum}').value = testcase['func']
-            # 用例名称
-            sheet.range(f'D{rownum}').value = testcase['title']
-            # 前置条件
-            sheet.range(f'E{rownum}').value = testcase['pre']
-            # 用例步骤
-            sheet.range(f'F{rownum}').value = testcase['step']
-            # 预期结果
-            sheet.range(f'G{rownum}').value = testcase['exp']
-        # 删除不需要的实际结果列
-        delete_actual_results_column_by_module(sheet)
-        # 添加边框
-        add_used_range_borders(sheet)
-        # 自动调整单元格大小
-        sheet.autofit()
-    # 所有模块写入完成后删除模板页
+        # 从布局页复制一个 sheet 页并修改为模块的名称
+        with stage(f'template_copy:{module}'):
+            wb.sheets[layouts[module]].copy(before=template_sheet, name=module)
+        with stage(f'write:{module}', rows=len(rows)):
+            write_module_sheet(wb.sheets[module], module, rows, schema)
+    # 所有模块写入完成后删除布局页和模板页
+    for layout_name in layout_names:
+        wb.sheets[layout_name].delete()
     template_sheet.delete()
-    # 保存
-    wb.save()
 
 
-ACTUAL_RESULTS_COLUMNS = {
+# 模板页中实际结果列的位置（删除列之前）
+TEMPLATE_ACTUAL_RESULTS_COLUMNS = {
     'DEFAULT': 'H:H',
-    # 如果需要统计其他端时，默认（DEFAULT）实际结果列会被删掉，所以其他端的列还是从 H 列开始
-    'ANDROID': 'H:H',
-    'IOS': 'I:I',
-    'H5': 'J:J'
+    'ANDROID': 'I:I',
+    'IOS': 'J:J',
+    'H5': 'K:K'
 }
 
 
-def delete_actual_results_column_by_module(sheet):
-    terminal_total = 0
-    del_android = True
-    del_ios = True
-    del_h5 = True
-
-    if 'APP' in sheet.name:
-        terminal_total += 2
-        del_android = False
-        del_ios = False
-    if 'H5' in sheet.name:
-        terminal_total += 1
-        del_h5 = False
-
-    # 删除不需要的列（要从后面开始删，不然会报错）
-    if del_h5:
-        sheet.range(ACTUAL_RESULTS_COLUMNS['H5']).api.EntireColumn.Delete()
-    if del_ios:
-        sheet.range(ACTUAL_RESULTS_COLUMNS['IOS']).api.EntireColumn.Delete()
-    if del_android:
-        sheet.range(ACTUAL_RESULTS_COLUMNS['ANDROID']).api.EntireColumn.Delete()
-    if terminal_total > 0:
-        sheet.range(ACTUAL_RESULTS_COLUMNS['DEFAULT']).api.EntireColumn.Delete()
-
-
-def analysis_testcase_to_excel(file_path: str, classified_data: dict):
-    wb = open_excel(file_path)
-    analysis_sheet = wb.sheets['数据统计']
-    default_column = ACTUAL_RESULTS_COLUMNS['DEFAULT']
-    android_column = ACTUAL_RESULTS_COLUMNS['ANDROID']
-    ios_column = ACTUAL_RESULTS_COLUMNS['IOS']
-    h5_column = ACTUAL_RESULTS_COLUMNS['H5']
-
-    for rownum, module_name in enumerate(classified_data.keys()):
+def get_module_terminals(module_name: str) -> tuple:
+    """根据模块名称判断需要统计的终端
+
+    Args:
+        module_name (str): 模块名称
+
+    Returns:
+        tuple: (android, ios, h5)
+    """
+    has_app = 'APP' in module_name
+    has_h5 = 'H5' in module_name
+    return has_app, has_app, has_h5
+
+
+def get_unused_actual_results_columns(module_name: str) -> list:
+    """获取模块不需要的实际结果列（模板页中的位置，从后往前排列）
+
+    Args:
+        module_name (str): 模块名称
+
+    Returns:
+        list: 列地址，e.g.: ['K:K', 'H:H']
+    """
+    count_android, count_ios, count_h5 = get_module_terminals(module_name)
+    columns = []
+    # 要从后面开始删，不然删除后列的位置会变
+    if not count_h5:
+        columns.append(TEMPLATE_ACTUAL_RESULTS_COLUMNS['H5'])
+    if not count_ios:
+        columns.append(TEMPLATE_ACTUAL_RESULTS_COLUMNS['IOS'])
+    if not count_android:
+        columns.append(TEMPLATE_ACTUAL_RESULTS_COLUMNS['ANDROID'])
+    if count_android or count_ios or count_h5:
+        columns.append(TEMPLATE_ACTUAL_RESULTS_COLUMNS['DEFAULT'])
+    return columns
+
+
+def delete_actual_results_column_by_module(sheet, module_name: str = None):
+    """删除不需要的实际结果列，多个列合并为一个区域一次删除
+
+    Args:
+        sheet (xlwings.Sheet): 从模板页复制的 sheet 页
+        module_name (str, optional): 模块名称. Defaults to sheet 页名称
+    """
+    columns = get_unused_actual_results_columns(module_name or sheet.name)
+    if columns:
+        sheet.range(','.join(columns)).api.EntireColumn.Delete()
+
+
+def plan_module_layouts(module_names) -> dict:
+    """按模块需要的实际结果列对模块分组，相同终端的模块使用同一个布局页
+
+    模块 sheet 页的最终列布局只由模块名称决定，每种布局只需要从模板页删除一次列
+
+    Args:
+        module_names: 模块名称，e.g.: classified_data
+
+    Returns:
+        dict: key 为模块名称，value 为布局页名称，按模块的顺序排列
+    """
+    layout_names = {}
+    layouts = {}
+    for module in module_names:
+        terminals = get_module_terminals(module)
+        if terminals not in layout_names:
+            layout_name = f'{TEMPLATE_SHEET_NAME}{len(layout_names) + 1}'
+            # 布局页在写入完成后删除，名称不能和模块重复
+            while layout_name in module_names:
+                layout_name = '~' + layout_name
+            layout_names[terminals] = layout_name
+        layouts[module] = layout_names[terminals]
+    return layouts
+
+
+def get_actual_results_columns(module_name: str) -> dict:
+    """获取模块 sheet 页删除不需要的列之后，各终端实际结果列的列号
+
+    Args:
+        module_name (str): 模块名称
+
+    Returns:
+        dict: e.g.: {'DEFAULT': 'H'}、{'ANDROID': 'H', 'IOS': 'I', 'H5': 'J'}、{'H5': 'H'}
+    """
+    count_android, count_ios, count_h5 = get_module_terminals(module_name)
+    terminals = [
+        terminal for terminal, counted in (('ANDROID', count_android), ('IOS', count_ios), ('H5', count_h5))
+        if counted
+    ] or ['DEFAULT']
+    # 剩下的实际结果列从 H 列开始依次排列
+    return {terminal: chr(ord('H') + index) for index, terminal in enumerate(terminals)}
+
+
+# 数据统计的计算方式
+# formula: INDIRECT + 整列 COUNTIF，模块 sheet 页增删用例后无需更新，但每次编辑都会重新计算所有公式
+# range: 直接引用模块 sheet 页用例所在的行，非易失公式，只在引用的单元格变化时重新计算
+# static: 总编写用例数和需执行用例数直接写入分类数据中的用例数，执行结果仍使用 range 方式统计
+ANALYSIS_MODES = ('formula', 'range', 'static')
+
+
+def sheet_reference(module_name: str, column: str, last_rownum: int, mode: str = 'formula') -> str:
+    """模块 sheet 页某一列的引用，formula 方式引用整列，其他方式只引用第 2 行至 last_rownum 行"""
+    # sheet 名称中的单引号需要转义
+    quoted_name = module_name.replace("'", "''")
+    if mode == 'formula':
+        return f'INDIRECT("\'{quoted_name}\'!{column}:{column}")'
+    return f"'{quoted_name}'!${column}$2:${column}${max(last_rownum, 2)}"
+
+
+def countif_formula(reference: str, criteria: str) -> str:
+    return f'COUNTIF({reference}, "{criteria}")'
+
+
+def build_analysis_values(classified_data: dict, mode: str = 'formula') -> list:
+    """组装数据统计 sheet 页的数据，从 A3 开始，每行对应 A~M 列，最后一行为总计
+
+    Args:
+        classified_data (dict): 分类后的测试用例数据
+        mode (str, optional): 计算方式，参考 ANALYSIS_MODES
+
+    Raises:
+        Exception: 计算方式不存在
+
+    Returns:
+        list: 二维数组
+    """
+    if mode not in ANALYSIS_MODES:
+        raise Exception(f'数据统计方式:[ {mode} ] 不存在')
+    # 执行结果只有 range 和 static 需要限定行范围，formula 方式仍然引用整列
+    result_mode = 'formula' if mode == 'formula' else 'range'
+    values = []
+
+    for rownum, (module_name, module_rows) in enumerate(classified_data.items()):
         rownum = rownum + 3
-        terminal_total = 0
-        count_android = False
-        count_ios = False
-        count_h5 = False
-
-        if 'APP' in module_name:
-            terminal_total += 2
-            count_android = True
-            count_ios = True
-        if 'H5' in module_name:
-            terminal_total += 1
-            count_h5 = True
+        # 模块 sheet 页中用例的最后一行
+        last_rownum = len(module_rows) + 1
+        columns = get_actual_results_columns(module_name)
+        terminal_total = len(columns) if 'DEFAULT' not in columns else 0
+
+        def countif(column, criteria):
+            return countif_formula(sheet_reference(module_name, column, last_rownum, result_mode), criteria)
 
-        # 案例名称
-        analysis_sheet.range(f'A{rownum}').value = module_name
-        analysis_sheet.range(f'A{rownum}').api.Font.Bold = True  # 字体加粗
-        # 总编写用例数
-        analysis_sheet.range(f'B{rownum}').value = f'=IFERROR(COUNTIF(INDIRECT("\'{module_name}\'!D:D"), "*") - 1, 0)'
-        # 需执行用例数
-        analysis_sheet.range(f'C{rownum}').value = (
-            f'=IFERROR(B{rownum} * {terminal_total if terminal_total >0 else 1} - G{rownum}, 0)'
-        )
         # 通过、失败、阻塞、不适用
         if terminal_total == 0:
-            # 通过
-            analysis_sheet.range(f'D{rownum}').value = f'=COUNTIF(INDIRECT("\'{module_name}\'!{default_column}"), "通过")'
-            # 失败
-            analysis_sheet.range(f'E{rownum}').value = f'=COUNTIF(INDIRECT("\'{module_name}\'!{default_column}"), "失败")'
-            # 阻塞
-            analysis_sheet.range(f'F{rownum}').value = f'=COUNTIF(INDIRECT("\'{module_name}\'!{default_column}"), "阻塞")'
-            # 不适用
-            analysis_sheet.range(f'G{rownum}').value = f'=COUNTIF(INDIRECT("\'{module_name}\'!{default_column}"), "不适用")'
-        else:
-            # 组装公式
-            pass_formula = '='
-            fail_formula = '='
-            block_formula = '='
-            invalid_formula = '='
-            if count_android:
-                pass_formula = pass_formula + '+' + f'COUNTIF(INDIRECT("\'{module_name}\'!{android_column}"), "通过")'
-                fail_formula = fail_formula + '+' + f'COUNTIF(INDIRECT("\'{module_name}\'!{android_column}"), "失败")'
-                block_formula = block_formula + '+' + f'COUNTIF(INDIRECT("\'{module_name}\'!{android_column}"), "阻塞")'
-                invalid_formula = invalid_formula + '+' + f'COUNTIF(INDIRECT("\'{module_name}\'!{android_column}"), "不适用")'
-            if count_ios:
-                pass_formula = pass_formula + '+' + f'COUNTIF(INDIRECT("\'{module_name}\'!{ios_column}"), "通过")'
-                fail_formula = fail_formula + '+' + f'COUNTIF(INDIRECT("\'{module_name}\'!{ios_column}"), "失败")'
-                block_formula = block_formula + '+' + f'COUNTIF(INDIRECT("\'{module_name}\'!{ios_column}"), "阻塞")'
-                invalid_formula = invalid_formula + '+' + f'COUNTIF(INDIRECT("\'{module_name}\'!{ios_column}"), "不适用")'
-            if count_h5:
-                pass_formula = pass_formula + '+' + f'COUNTIF(INDIRECT("\'{module_name}\'!{h5_column}"), "通过")'
-                fail_formula = fail_formula + '+' + f'COUNTIF(INDIRECT("\'{module_name}\'!{h5_column}"), "失败")'
-                block_formula = block_formula + '+' + f'COUNTIF(INDIRECT("\'{module_name}\'!{h5_column}"), "阻塞")'
-                invalid_formula = invalid_formula + '+' + f'COUNTIF(INDIRECT("\'{module_name}\'!{h5_column}"), "不适用")'
-            # 通过
-            analysis_sheet.range(f'D{rownum}').value = pass_formula
-            # 失败
-            analysis_sheet.range(f'E{rownum}').value = fail_formula
-            # 阻塞
-            analysis_sheet.range(f'F{rownum}').value = block_formula
-            # 不适用
-            analysis_sheet.range(f'G{rownum}').value = invalid_formula
-
-        # 未执行
-        analysis_sheet.range(f'H{rownum}').value = f'=IFERROR(C{rownum} - (D{rownum} + E{rownum}), 0)'
-        # 总完成率
-        analysis_sheet.range(f'I{rownum}').value = f'=IFERROR((D{rownum} + E{rownum}) / C{rownum}, 0)'
-        analysis_sheet.range(f'I{rownum}').api.NumberFormat = "0%"
-        # 总通过率
-        analysis_sheet.range(f'J{rownum}').value = f'=IFERROR(D{rownum} / C{rownum}, 0)'
-        analysis_sheet.range(f'J{rownum}').api.NumberFormat = "0%"
-        # Android通过率
-        if count_android:
-            analysis_sheet.range(f'K{rownum}').value = (
-                f'=IFERROR(COUNTIF(INDIRECT("\'{module_name}\'!{android_column}"), "通过") / (B{rownum}-COUNTIF(INDIRECT("\'{module_name}\'!{android_column}"), "不适用")), 0)'
-            )
-            analysis_sheet.range(f'K{rownum}').api.NumberFormat = "0%"
+            status_formulas = [
+                '=' + countif(columns['DEFAULT'], status)
+                for status in ('通过', '失败', '阻塞', '不适用')
+            ]
         else:
-            analysis_sheet.range(f'K{rownum}').value = 'X'
-        # IOS通过率
-        if count_ios:
-            analysis_sheet.range(f'L{rownum}').value = (
-                f'=IFERROR(COUNTIF(INDIRECT("\'{module_name}\'!{ios_column}"), "通过") / (B{rownum}-COUNTIF(INDIRECT("\'{module_name}\'!{ios_column}"), "不适用")), 0)'
-            )
-            analysis_sheet.range(f'L{rownum}').api.NumberFormat = "0%"
+            # 多个终端时累加各终端的实际结果列
+            status_formulas = [
+                '=' + ''.join('+' + countif(column, status) for column in columns.values())
+                for status in ('通过', '失败', '阻塞', '不适用')
+            ]
+
+        # 各终端通过率
+        terminal_rates = []
+        for terminal in ('ANDROID', 'IOS', 'H5'):
+            column = columns.get(terminal)
+            if column:
+                terminal_rates.append(
+                    f'=IFERROR({countif(column, "通过")} / (B{rownum}-{countif(column, "不适用")}), 0)'
+                )
+            else:
+                terminal_rates.append('X')
+
+        # 总编写用例数
+        if mode == 'formula':
+            authored = f'=IFERROR(COUNTIF({sheet_reference(module_name, "D", last_rownum)}, "*") - 1, 0)'
+        elif mode == 'range':
+            authored = f'=COUNTIF({sheet_reference(module_name, "D", last_rownum, mode)}, "*")'
         else:
-            analysis_sheet.range(f'L{rownum}').value = 'X'
-        # H5通过率
-        if count_h5:
-            analysis_sheet.range(f'M{rownum}').value = (
-                f'=IFERROR(COUNTIF(INDIRECT("\'{module_name}\'!{h5_column}"), "通过") / (B{rownum}-COUNTIF(INDIRECT("\'{module_name}\'!{h5_column}"), "不适用")), 0)'
-            )
-            analysis_sheet.range(f'M{rownum}').api.NumberFormat = "0%"
+            authored = len(module_rows)
+        # 需执行用例数，每个终端都需要执行一次
+        if mode == 'static':
+            required = f'=IFERROR({len(module_rows) * max(terminal_total, 1)} - G{rownum}, 0)'
         else:
-            analysis_sheet.range(f'M{rownum}').value = 'X'
+            required = f'=IFERROR(B{rownum} * {max(terminal_total, 1)} - G{rownum}, 0)'
+
+        values.append([
+            # 案例名称
+            module_name,
+            # 总编写用例数
+            authored,
+            # 需执行用例数
+            required,
+            # 通过、失败、阻塞、不适用
+            *status_formulas,
+            # 未执行
+            f'=IFERROR(C{rownum} - (D{rownum} + E{rownum}), 0)',
+            # 总完成率
+            f'=IFERROR((D{rownum} + E{rownum}) / C{rownum}, 0)',
+            # 总通过率
+            f'=IFERROR(D{rownum} / C{rownum}, 0)',
+            # Android、IOS、H5通过率
+            *terminal_rates
+        ])
 
     # 总计
-    last_rownum = analysis_sheet.used_range.last_cell.row
-    total_rownum = last_rownum + 1
-    # 案例名称
-    analysis_sheet.range(f'A{total_rownum}').value = '总计'
-    analysis_sheet.range(f'A{total_rownum}').api.Font.Bold = True  # 字体加粗
-    # 总编写用例数
-    analysis_sheet.range(f'B{total_rownum}').value = f'=SUM(B3:B{total_rownum - 1})'
-    # 需执行用例数
-    analysis_sheet.range(f'C{total_rownum}').value = f'=SUM(C3:C{total_rownum - 1})'
-    # 通过
-    analysis_sheet.range(f'D{total_rownum}').value = f'=SUM(D3:D{total_rownum - 1})'
-    # 失败
-    analysis_sheet.range(f'E{total_rownum}').value = f'=SUM(E3:E{total_rownum - 1})'
-    # 阻塞
-    analysis_sheet.range(f'F{total_rownum}').value = f'=SUM(F3:F{total_rownum - 1})'
-    # 不适用
-    analysis_sheet.range(f'G{total_rownum}').value = f'=SUM(G3:G{total_rownum - 1})'
-    # 未执行
-    analysis_sheet.range(f'H{total_rownum}').value = f'=SUM(H3:H{total_rownum - 1})'
-    # 总完成率
-    analysis_sheet.range(f'I{total_rownum}').value = f'=IFERROR((D{total_rownum} + E{total_rownum}) / C{total_rownum}, 0)'
-    analysis_sheet.range(f'I{total_rownum}').api.NumberFormat = "0%"
-    # 总通过率
-    analysis_sheet.range(f'J{total_rownum}').value = f'=IFERROR(D{total_rownum} / C{total_rownum}, 0)'
-    analysis_sheet.range(f'J{total_rownum}').api.NumberFormat = "0%"
-    # Android通过率
-    analysis_sheet.range(f'K{total_rownum}').value = 'X'
-    # IOS通过率
-    analysis_sheet.range(f'L{total_rownum}').value = 'X'
-    # H5通过率
-    analysis_sheet.range(f'M{total_rownum}').value = 'X'
+    total_rownum = len(values) + 3
+    values.append([
+        # 案例名称
+        '总计',
+        # 总编写用例数、需执行用例数、通过、失败、阻塞、不适用、未执行
+        *[f'=SUM({column}3:{column}{total_rownum - 1})' for column in 'BCDEFGH'],
+        # 总完成率
+        f'=IFERROR((D{total_rownum} + E{total_rownum}) / C{total_rownum}, 0)',
+        # 总通过率
+        f'=IFERROR(D{total_rownum} / C{total_rownum}, 0)',
+        # Android、IOS、H5通过率
+        'X',
+        'X',
+        'X'
+    ])
+    return values
+
+
+def analysis_testcase_to_excel(wb, classified_data: dict, mode: str = 'formula'):
+    analysis_sheet = wb.sheets[ANALYSIS_SHEET_NAME]
+    values = build_analysis_values(classified_data, mode)
+    last_rownum = len(values) + 2
+    # 整块写入统计数据
+    analysis_sheet.range('A3').value = values
+    # 案例名称字体加粗
+    analysis_sheet.range(f'A3:A{last_rownum}').api.Font.Bold = True
+    # 完成率和通过率显示为百分比
+    analysis_sheet.range(f'I3:M{last_rownum}').api.NumberFormat = '0%'
     # 添加边框
     add_used_range_borders(analysis_sheet)
-    # 保存
-    wb.save()
 
 
-def xmind_to_excel(xmind_file_path: str, xmind_sheet_name: str, classify: bool = False):
-    """XMind 转 Excel
+class XlwingsWriter:
+    """通过 xlwings 调用本地 Excel/WPS 写入
+
+    Args:
+        spec (str, optional): MacOS下 excelApp 的名称. e.g.: wpsoffice
+        schema (TagSchema, optional): 标签定义，按表头确定写入的列. Defaults to DEFAULT_SCHEMA
+    """
+
+    def __init__(self, spec=None, schema: TagSchema = None):
+        self.spec = spec
+        self.schema = schema or DEFAULT_SCHEMA
+        self.wb = None
+
+    def open(self, file_path: str):
+        self.wb = open_excel(file_path, self.spec)
+
+    def save(self):
+        self.wb.save()
+
+    def close(self):
+        if self.wb is None:
+            return
+        app = self.wb.app
+        try:
+            self.wb.close()
+        finally:
+            self.wb = None
+            # open_excel 新建的 excelApp 需要退出
+            if self.spec and platform.system().lower() == 'darwin':
+                app.quit()
+
+    def copy_sheet(self, source_name: str, sheet_name: str):
+        # 复制到源 sheet 页前面，多次复制时保持复制的顺序
+        source_sheet = self.wb.sheets[source_name]
+        source_sheet.copy(before=source_sheet, name=sheet_name)
+
+    def remove_sheet(self, sheet_name: str):
+        self.wb.sheets[sheet_name].delete()
+
+    def write_testcase(self, sheet_name: str, rows: list):
+        write_to_excel_by_testcase(self.wb, sheet_name, rows, self.schema)
+
+    def classify_testcase(self, classified_data: dict):
+        classify_testcase_to_excel(self.wb, classified_data, self.schema)
+
+    def analysis_testcase(self, classified_data: dict, mode: str = 'formula'):
+        analysis_testcase_to_excel(self.wb, classified_data, mode)
+
+    def sheet_names(self) -> list:
+        return [sheet.name for sheet in self.wb.sheets]
+
+    def sheet_fields(self, sheet_name: str, module: bool = False) -> list:
+        """按表头确定每一列写入的字段，参考 TagSchema.sheet_fields"""
+        return self.schema.sheet_fields(read_header(self.wb.sheets[sheet_name]), module)
+
+    def read_values(self, sheet_name: str, min_row: int = 2, max_column: int = 7) -> list:
+        """读取 A 列至 max_column 列的数据，不包括末尾的空行"""
+        sheet = self.wb.sheets[sheet_name]
+        last_row = sheet.used_range.last_cell.row
+        if last_row < min_row:
+            return []
+        values = sheet.range((min_row, 1), (last_row, max_column)).options(ndim=2).value
+        return trim_empty_rows(values)
+
+    def write_cell(self, sheet_name: str, rownum: int, column: int, value):
+        self.wb.sheets[sheet_name].range((rownum, column)).value = value
+
+    def insert_testcase(self, sheet_name: str, rownum: int, rows: list, fields: list = None):
+        """在 rownum 行前面插入测试用例，插入的行沿用相邻行的格式"""
+        sheet = self.wb.sheets[sheet_name]
+        sheet.range(f'{rownum}:{rownum + len(rows) - 1}').api.EntireRow.Insert()
+        sheet.range((rownum, 1)).value = testcase_to_values(rows, fields, self.schema)
+
+    def delete_rows(self, sheet_name: str, rownum: int, amount: int):
+        self.wb.sheets[sheet_name].range(f'{rownum}:{rownum + amount - 1}').api.EntireRow.Delete()
+
+    def add_module_sheet(self, module: str, rows: list):
+        """从模板文件复制模板页，添加为最后一个 sheet 页后写入模块的测试用例"""
+        template_book = self.wb.app.books.open(TEMPLATE_FILE_PATH)
+        try:
+            template_book.sheets[TEMPLATE_SHEET_NAME].copy(after=self.wb.sheets[-1], name=module)
+        finally:
+            template_book.close()
+        sheet = self.wb.sheets[module]
+        delete_actual_results_column_by_module(sheet)
+        write_module_sheet(sheet, module, rows, self.schema)
+
+
+class OpenpyxlWriter:
+    """通过 openpyxl 直接读写 xlsx 文件，不依赖 Excel/WPS 进程，可在 Linux 下运行"""
+
+    def __init__(self, spec=None, schema: TagSchema = None):
+        # openpyxl 不需要 excelApp，保留参数仅为了和其他写入器保持一致
+        self.spec = spec
+        self.schema = schema or DEFAULT_SCHEMA
+        self.wb = None
+        self.file_path = None
+
+    def open(self, file_path: str):
+        from openpyxl import load_workbook
+        self.wb = load_workbook(file_path)
+        self.file_path = file_path
+
+    def save(self):
+        self.wb.save(self.file_path)
+
+    def close(self):
+        if self.wb is not None:
+            self.wb.close()
+        self.wb = None
+
+    @staticmethod
+    def column_styles(sheet, max_column: int) -> list:
+        """获取每一列的默认样式，新写入的单元格需要沿用模板的列样式"""
+        styles = [None] * max_column
+        for dim in sheet.column_dimensions.values():
+            if not dim.min or not dim.max:
+                continue
+            for column in range(dim.min, min(dim.max, max_column) + 1):
+                styles[column - 1] = dim
+        return styles
+
+    @classmethod
+    def column_cell_styles(cls, sheet, max_column: int, bordered: bool = False) -> list:
+        """每一列新写入的单元格的样式，添加边框时边框合并到列样式中，没有列样式且不添加边框的列为 None"""
+        from openpyxl.styles.cell_style import StyleArray
+
+        styles = []
+        border_id = sheet.parent._borders.add(cls.thin_border()) if bordered else None
+        for dim in cls.column_styles(sheet, max_column):
+            style = copy(dim._style) if dim is not None else None
+            if border_id is not None:
+                style = style or StyleArray()
+                style.borderId = border_id
+            styles.append(style)
+        return styles
+
+    @classmethod
+    def write_values(cls, sheet, start_rownum: int, values: list, bordered: bool = False):
+        """从 A 列开始整块写入二维数组
+
+        Args:
+            sheet: 工作表
+            start_rownum (int): 开始行号
+            values (list): 二维数组
+            bordered (bool, optional): 是否添加边框，添加时同时写入右侧到最后一列的空单元格；
+                边框合并到每一列的单元格样式中，与写入数据一起完成，不需要再遍历一次单元格
+        """
+        if not values:
+            return
+        max_column = max(len(row) for row in values)
+        if bordered:
+            max_column = max(max_column, sheet.max_column)
+        # 每一列的单元格样式只计算一次
+        styles = cls.column_cell_styles(sheet, max_column, bordered)
+        total = len(values)
+        for index, row in enumerate(values):
+            rownum = start_rownum + index
+            for column, style in enumerate(styles, start=1):
+                if column <= len(row):
+                    cell = sheet.cell(row=rownum, column=column, value=row[column - 1])
+                else:
+                    cell = sheet.cell(row=rownum, column=column)
+                if style is not None and not cell.has_style:
+                    cell._style = copy(style)
+            if index % 1000 == 0:
+                progress(f'sheet:[{sheet.title}]', index, total)
+        progress(f'sheet:[{sheet.title}]', total, total)
+
+    @staticmethod
+    def set_column_widths(sheet, widths: list):
+        """从 A 列开始设置列宽，只加宽列，模板中更宽的列保留原有宽度；合并的列维度（e.g.: E:F）拆分后再设置"""
+        from openpyxl.utils import get_column_letter
+        from openpyxl.worksheet.dimensions import ColumnDimension
+
+        for dim in list(sheet.column_dimensions.values()):
+            if not dim.min or not dim.max or dim.min > len(widths) or dim.min == dim.max:
+                continue
+            # 拆分覆盖多列的列维度，保留原有的宽度和样式
+            del sheet.column_dimensions[dim.index]
+            for index in range(dim.min, min(dim.max, len(widths)) + 1):
+                letter = get_column_letter(index)
+                new_dim = ColumnDimension(sheet, index=letter, width=dim.width, customWidth=dim.customWidth)
+                new_dim._style = copy(dim._style)
+                sheet.column_dimensions[letter] = new_dim
+            if dim.max > len(widths):
+                dim.min = len(widths) + 1
+                dim.index = get_column_letter(dim.min)
+                sheet.column_dimensions[dim.index] = dim
+        for index, width in enumerate(widths, start=1):
+            if width is None:
+                continue
+            letter = get_column_letter(index)
+            dim = sheet.column_dimensions.get(letter)
+            if dim is None or not dim.width or width > dim.width:
+                sheet.column_dimensions[letter].width = width
+
+    @staticmethod
+    def thin_border():
+        from openpyxl.styles import Border
+        from openpyxl.styles import Side
+
+        side = Side(style='thin')
+        return Border(left=side, right=side, top=side, bottom=side)
+
+    @staticmethod
+    def delete_columns(sheet, columns: list):
+        """删除整列，并把后面的列宽和列样式前移（openpyxl 删除列时不会处理列维度）"""
+        from openpyxl.utils import column_index_from_string
+        from openpyxl.utils import get_column_letter
+        from openpyxl.worksheet.dimensions import ColumnDimension
+
+        max_column = sheet.max_column
+        # 展开合并的列维度
+        dims = [None] * max_column
+        tail_dims = []
+        for dim in list(sheet.column_dimensions.values()):
+            if not dim.min or not dim.max:
+                continue
+            for column in range(dim.min, min(dim.max, max_column) + 1):
+                dims[column - 1] = dim
+            del sheet.column_dimensions[dim.index]
+            # 超出使用范围的列维度（e.g.: N:XFD）删除列后整体前移
+            if dim.max > max_column:
+                tail_dims.append(dim)
+        for column in columns:
+            index = column_index_from_string(column.split(':')[0])
+            sheet.delete_cols(index)
+            del dims[index - 1]
+        # 重建列维度
+        for index, dim in enumerate(dims, start=1):
+            if dim is None:
+                continue
+            letter = get_column_letter(index)
+            new_dim = ColumnDimension(sheet, index=letter, width=dim.width, customWidth=dim.customWidth)
+            new_dim._style = copy(dim._style)
+            sheet.column_dimensions[letter] = new_dim
+        for dim in tail_dims:
+            dim.min = len(dims) + 1
+            dim.index = get_column_letter(dim.min)
+            sheet.column_dimensions[dim.index] = dim
+        # 更新筛选范围
+        if sheet.auto_filter.ref:
+            sheet.auto_filter.ref = f'A1:{get_column_letter(sheet.max_column)}1'
+
+    @classmethod
+    def add_borders(cls, sheet, min_row: int = 1, max_row: int = None):
+        border = cls.thin_border()
+        for row in sheet.iter_rows(min_row=min_row, max_row=max_row or sheet.max_row, max_col=sheet.max_column):
+            for cell in row:
+                cell.border = border
+
+    def copy_sheet(self, source_name: str, sheet_name: str, before_name: str = None):
+        """从源 sheet 页复制一个 sheet 页，移动到 before_name（默认为源 sheet 页）前面并修改名称"""
+        wb = self.wb
+        source_sheet = wb[source_name]
+        sheet = wb.copy_worksheet(source_sheet)
+        sheet.title = sheet_name
+        wb.move_sheet(sheet, offset=wb.index(wb[before_name or source_name]) - wb.index(sheet))
+        # copy_worksheet 不会复制冻结窗格和筛选
+        sheet.freeze_panes = source_sheet.freeze_panes
+        sheet.auto_filter.ref = source_sheet.auto_filter.ref
+        return sheet
+
+    def remove_sheet(self, sheet_name: str):
+        self.wb.remove(self.wb[sheet_name])
+
+    def write_testcase(self, sheet_name: str, rows: list):
+        sheet = self.wb[sheet_name]
+        values = testcase_to_values(rows, self.sheet_fields(sheet_name), self.schema)
+        self.write_values(sheet, 2, values)
+        print(f'sheet:[{sheet_name}] 写入 {len(rows)} 条用例')
+        self.set_column_widths(sheet, estimate_column_widths(values))
+
+    def classify_testcase(self, classified_data: dict):
+        layouts = plan_module_layouts(classified_data)
+        # 每种列布局从模板页复制一次并删除不需要的实际结果列，模块 sheet 页直接复制布局页，不需要再删除列
+        layout_names = []
+        for module, layout_name in layouts.items():
+            if layout_name not in layout_names:
+                layout_names.append(layout_name)
+                sheet = self.copy_sheet(TEMPLATE_SHEET_NAME, layout_name)
+                self.delete_columns(sheet, get_unused_actual_results_columns(module))
+        for module, rows in classified_data.items():
+            self.add_module_sheet(module, rows, layouts[module])
+        # 所有模块写入完成后删除布局页和模板页
+        for layout_name in layout_names:
+            self.remove_sheet(layout_name)
+        self.remove_sheet(TEMPLATE_SHEET_NAME)
+
+    def add_module_sheet(self, module: str, rows: list, layout_name: str = None):
+        """复制一个 sheet 页并写入模块的测试用例
+
+        Args:
+            module (str): 模块名称
+            rows (list): 模块的测试用例数据
+            layout_name (str, optional): 已删除不需要的实际结果列的布局页，参考 plan_module_layouts.
+                Defaults to 从模板页复制后删除列，工作簿中没有模板页时从模板文件导入
+        """
+        with stage(f'template_copy:{module}'):
+            if layout_name:
+                sheet = self.copy_sheet(layout_name, module, TEMPLATE_SHEET_NAME)
+            else:
+                if TEMPLATE_SHEET_NAME in self.wb.sheetnames:
+                    sheet = self.copy_sheet(TEMPLATE_SHEET_NAME, module)
+                else:
+                    sheet = self.import_template_sheet(module)
+                # 删除不需要的实际结果列
+                self.delete_columns(sheet, get_unused_actual_results_columns(module))
+        with stage(f'write:{module}', rows=len(rows)):
+            self.write_module_rows(sheet, rows)
+            print(f'module:[{module}] 写入 {len(rows)} 条用例')
+
+    def write_module_rows(self, sheet, rows: list):
+        # 从 A2 开始整块写入测试用例，同时添加边框
+        values = testcase_to_values(rows, self.sheet_fields(sheet.title, module=True), self.schema)
+        self.write_values(sheet, 2, values, bordered=True)
+        self.set_column_widths(sheet, estimate_column_widths(values))
+
+    def import_template_sheet(self, sheet_name: str):
+        """从模板文件导入模板页，添加为最后一个 sheet 页（openpyxl 不支持跨工作簿复制，需要逐个复制样式）"""
+        from openpyxl import load_workbook
+
+        template_sheet = load_workbook(TEMPLATE_FILE_PATH)[TEMPLATE_SHEET_NAME]
+        sheet = self.wb.create_sheet(sheet_name)
+        for row in template_sheet.iter_rows():
+            for cell in row:
+                target = sheet.cell(row=cell.row, column=cell.column, value=cell.value)
+                if cell.has_style:
+                    copy_cell_style(cell, target)
+        for key, dim in template_sheet.column_dimensions.items():
+            target = sheet.column_dimensions[key]
+            target.min, target.max, target.width = dim.min, dim.max, dim.width
+            copy_cell_style(dim, target)
+        for key, dim in template_sheet.row_dimensions.items():
+            sheet.row_dimensions[key].height = dim.height
+        sheet.freeze_panes = template_sheet.freeze_panes
+        sheet.auto_filter.ref = template_sheet.auto_filter.ref
+        return sheet
+
+    def analysis_testcase(self, classified_data: dict, mode: str = 'formula'):
+        analysis_sheet = self.wb[ANALYSIS_SHEET_NAME]
+        values = build_analysis_values(classified_data, mode)
+        self.write_values(analysis_sheet, 3, values)
+        for row in analysis_sheet.iter_rows(min_row=3, max_row=len(values) + 2, max_col=13):
+            # 案例名称字体加粗
+            font = copy(row[0].font)
+            font.bold = True
+            row[0].font = font
+            # 完成率和通过率显示为百分比
+            for cell in row[8:]:
+                cell.number_format = '0%'
+        # 添加边框
+        self.add_borders(analysis_sheet)
+
+    def sheet_names(self) -> list:
+        return list(self.wb.sheetnames)
+
+    def sheet_fields(self, sheet_name: str, module: bool = False) -> list:
+        """按表头确定每一列写入的字段，参考 TagSchema.sheet_fields"""
+        return self.schema.sheet_fields([cell.value for cell in self.wb[sheet_name][1]], module)
+
+    def read_values(self, sheet_name: str, min_row: int = 2, max_column: int = 7) -> list:
+        """读取 A 列至 max_column 列的数据，不包括末尾的空行"""
+        values = self.wb[sheet_name].iter_rows(min_row=min_row, max_col=max_column, values_only=True)
+        return trim_empty_rows([list(row) for row in values])
+
+    def write_cell(self, sheet_name: str, rownum: int, column: int, value):
+        self.wb[sheet_name].cell(row=rownum, column=column, value=value)
+
+    def insert_testcase(self, sheet_name: str, rownum: int, rows: list, fields: list = None):
+        """在 rownum 行前面插入测试用例，模块 sheet 页的新行需要添加边框"""
+        sheet = self.wb[sheet_name]
+        sheet.insert_rows(rownum, len(rows))
+        values = testcase_to_values(rows, fields, self.schema)
+        self.write_values(sheet, rownum, values, bordered=sheet_name != TESTCASE_SHEET_NAME)
+
+    def delete_rows(self, sheet_name: str, rownum: int, amount: int):
+        self.wb[sheet_name].delete_rows(rownum, amount)
+
+
+def load_template_content() -> bytes:
+    global _template_content
+    if _template_content is None:
+        with open(TEMPLATE_FILE_PATH, 'rb') as f:
+            _template_content = f.read()
+    return _template_content
+
+
+# 写入器，key 为 xmind_to_excel 的 backend 参数
+WRITERS = {
+    'openpyxl': OpenpyxlWriter,
+    'xlwings': XlwingsWriter
+}
+
+
+def get_writer(backend: str, spec=None, schema: TagSchema = None):
+    """获取写入器
+
+    Args:
+        backend (str): 写入器名称，可选值：openpyxl、xlwings
+        spec (str, optional): MacOS下 excelApp 的名称，仅 xlwings 有效
+        schema (TagSchema, optional): 标签定义，按表头确定写入的列. Defaults to DEFAULT_SCHEMA
+
+    Raises:
+        Exception: 写入器不存在
+
+    Returns:
+        写入器实例
+    """
+    if backend not in WRITERS:
+        raise Exception(f'writer:[ {backend} ] 不存在，可选值: {", ".join(WRITERS)}')
+    return WRITERS[backend](spec, schema)
+
+
+class ConversionSession:
+    """转换会话，整个转换过程只打开一次工作簿并只保存一次
+
+    所有阶段（测试用例、模块分类、数据统计）都在同一个工作簿上执行，全部成功后才保存，
+    无论成功与否都会关闭工作簿并释放 excelApp
+
+    Args:
+        file_path (str): excel 文件路径
+        writer: 写入器实例，参考 get_writer
+        analysis_mode (str, optional): 数据统计的计算方式，参考 ANALYSIS_MODES
+
+    Usage:
+        with ConversionSession(output_file_path, get_writer('openpyxl')) as session:
+            session.run(rows, classified_data)
+    """
+
+    def __init__(self, file_path: str, writer, analysis_mode: str = 'formula'):
+        self.file_path = file_path
+        self.writer = writer
+        self.analysis_mode = analysis_mode
+
+    def __enter__(self):
+        # 打开失败时 __exit__ 不会执行，需要释放已经创建的 excelApp 或工作簿
+        try:
+            with stage('open'):
+                self.writer.open(self.file_path)
+        except Exception:
+            self.writer.close()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            # 所有阶段都成功时才保存
+            if exc_type is None:
+                with stage('save'):
+                    self.writer.save()
+        finally:
+            self.writer.close()
+
+    def run(self, rows: list, classified_data: dict = None):
+        """依次写入测试用例、模块分类和数据统计
+
+        Args:
+            rows (list): 测试用例数据
+            classified_data (dict, optional): 分类后的测试用例数据，为 None 时不分类
+        """
+        with stage(f'write:{TESTCASE_SHEET_NAME}', rows=len(rows)):
+            self.writer.write_testcase(TESTCASE_SHEET_NAME, rows)
+        self.run_classify(classified_data)
+
+    def run_sections(self, sections: list, classified_data: dict = None):
+        """每个 xmind sheet 页写入一个从测试用例 sheet 页复制的 sheet 页，然后写入模块分类和数据统计
+
+        Args:
+            sections (list): [(sheet 页名称, 测试用例数据)]
+            classified_data (dict, optional): 所有 xmind sheet 页合并后的分类数据，为 None 时不分类
+        """
+        for sheet_name, rows in sections:
+            with stage(f'write:{sheet_name}', rows=len(rows)):
+                self.writer.copy_sheet(TESTCASE_SHEET_NAME, sheet_name)
+                self.writer.write_testcase(sheet_name, rows)
+        self.writer.remove_sheet(TESTCASE_SHEET_NAME)
+        self.run_classify(classified_data)
+
+    def run_classify(self, classified_data: dict = None):
+        if classified_data is not None:
+            with stage('classify', rows=sum(len(rows) for rows in classified_data.values())):
+                self.writer.classify_testcase(classified_data)
+            with stage('analysis', rows=len(classified_data)):
+                self.writer.analysis_testcase(classified_data, self.analysis_mode)
+
+
+def xmind_to_rows(
+    xmind_file_path: str,
+    xmind_sheet_name: str,
+    classify: bool = False,
+    schema: TagSchema = None
+) -> tuple:
+    """解析 XMind 并转换为用例数据
 
     Args:
         xmind_file_path (str): xmind文件路径
         xmind_sheet_name (str): xmind文件sheet页名称
         classify (bool, optional): 是否分类用例
+        schema (TagSchema, optional): 标签定义. Defaults to DEFAULT_SCHEMA
+
+    Returns:
+        tuple: (rows, classified_data)，不分类时 classified_data 为 None
+    """
+    return events_to_rows(iter_xmind_sheet(xmind_file_path, xmind_sheet_name), classify, schema)
+
+
+def create_metadata(root_name: str, schema: TagSchema = None) -> dict:
+    """创建用例原始数据，记录遍历时 topic 路径上各个标签的内容"""
+    return (schema or DEFAULT_SCHEMA).create_metadata(root_name)
+
+
+def read_root_name(events) -> str:
+    """读取第一个主题事件（根主题）的标题，XMind Zen 和 XMind 8 的 sheet 页没有根主题时都没有主题事件
+
+    Raises:
+        Exception: sheet 页没有根主题
+    """
+    root = next(events, None)
+    if root is None:
+        raise Exception('sheet页没有根主题')
+    return root[1]
+
+
+def events_to_rows(events, classify: bool = False, schema: TagSchema = None) -> tuple:
+    """主题事件转换为用例数据
+
+    Args:
+        events: 主题事件，第一个事件为根主题，参考 iter_xmind_sheet
+        classify (bool, optional): 是否分类用例
+        schema (TagSchema, optional): 标签定义. Defaults to DEFAULT_SCHEMA
+
+    Returns:
+        tuple: (rows, classified_data)，rows 为 Testcase 列表，classified_data 为按 module 分类的同一批 Testcase，
+            不分类时 classified_data 为 None
     """
-    # 解析 XMind
-    xmind_sheet = parse_xmind_by_sheet(xmind_file_path, xmind_sheet_name)
-    # 获取根主题下的子节点
-    topics = xmind_sheet['topic']['topics']
-    root_name = xmind_sheet['topic']['title']
-    rows = []
-    classified_data = None
-    metadata = {
-        'root': root_name,
-        'module': [],
-        'path': [],
-        'func': [],
-        'title': [],
-        'pre': [],
-        'step': [],
-        'exp': []
-    }
-    if classify:
-        classified_data = {}
-    # 校验 XMind 各个主题是否符合用例格式
-    check_topics_format(topics)
-    # 主题转用例数据
-    topics_to_rows(topics, rows, metadata, classified_data)
+    # 解析（读取 xmind 主题事件）和校验、转换在同一次遍历中完成，解析的耗时单独记录
+    events = TimedIterator(events)
+    with stage('flatten') as record:
+        root_name = read_root_name(events)
+        rows = []
+        classified_data = None
+        metadata = create_metadata(root_name, schema)
+        if classify:
+            classified_data = {}
+        # 校验主题格式并转换为用例数据
+        topics_to_rows(events, rows, metadata, classified_data, schema)
+        record['rows'] = len(rows)
+        record['exclude_seconds'] = events.seconds
+    record_stage('parse', events.seconds)
     print(f'XMind 解析完成，总计 {len(rows)} 条用例')
     # [print(row) for row in rows]  # debug print
     # for module, rows in classified_data.items():  # debug print
     #     print(f'module={module}')
     #     [print(row) for row in rows]
     #     print('\n')
+    return rows, classified_data
+
+
+def rows_to_excel(
+    rows: list,
+    classified_data: dict,
+    output_name: str,
+    backend: str = 'openpyxl',
+    spec: str = None,
+    analysis_mode: str = 'formula',
+    schema: TagSchema = None
+) -> str:
+    """用例数据写入 Excel
+
+    Args:
+        rows (list): 测试用例数据
+        classified_data (dict): 分类后的测试用例数据，为 None 时不分类
+        output_name (str): 输出文件名称（需要文件后缀）
+        backend (str, optional): 写入器，openpyxl（无需 Excel/WPS）或 xlwings
+        spec (str, optional): MacOS下 excelApp 的名称，仅 xlwings 有效. e.g.: wpsoffice
+        analysis_mode (str, optional): 数据统计的计算方式，参考 ANALYSIS_MODES
+        schema (TagSchema, optional): 标签定义，按表头确定写入的列. Defaults to DEFAULT_SCHEMA
+
+    Returns:
+        str: Excel路径
+    """
+    writer = get_writer(backend, spec, schema)
     # 复制测试用例模板文件
-    template_file_path = os.path.join(PROJECT_PATH, 'testcase.template.xlsx')
-    output_file_path = copy_file_to_output(template_file_path, f'[testcase]{xmind_sheet_name}.xlsx')
+    with stage('template_copy'):
+        output_file_path = copy_file_to_output(TEMPLATE_FILE_PATH, output_name)
+    write_excel(rows, classified_data, output_file_path, writer, analysis_mode)
+    print(f'Excel路径: {output_file_path}')
+    return output_file_path
+
+
+def write_excel(
+    rows: list,
+    classified_data: dict,
+    output_file_path: str,
+    writer,
+    analysis_mode: str = 'formula'
+) -> str:
+    """用例数据写入指定路径的 Excel，文件不存在时从测试用例模板复制
+
+    output_file_path 可能是临时文件，由调用方输出最终的 Excel 路径
+
+    Args:
+        rows (list): 测试用例数据
+        classified_data (dict): 分类后的测试用例数据，为 None 时不分类
+        output_file_path (str): Excel路径
+        writer: 写入器实例，参考 get_writer
+        analysis_mode (str, optional): 数据统计的计算方式，参考 ANALYSIS_MODES
+
+    Returns:
+        str: Excel路径
+    """
+    if not os.path.exists(output_file_path):
+        with stage('template_copy'):
+            shutil.copyfile(TEMPLATE_FILE_PATH, output_file_path)
     print('写入 Excel 开始')
-    write_to_excel_by_testcase(output_file_path, '测试用例', rows)
-    if classify:
-        classify_testcase_to_excel(output_file_path, classified_data)
-        analysis_testcase_to_excel(output_file_path, classified_data)
+    with ConversionSession(output_file_path, writer, analysis_mode) as session:
+        session.run(rows, classified_data)
     print('写入 Excel 完成')
-    print(f'Excel路径: {output_file_path}')
+    return output_file_path
+
+
+def xmind_to_excel(
+    xmind_file_path: str,
+    xmind_sheet_name: str,
+    classify: bool = False,
+    backend: str = 'openpyxl',
+    spec: str = None,
+    output_name: str = None,
+    analysis_mode: str = 'formula',
+    schema: TagSchema = None
+) -> str:
+    """XMind 转 Excel
+
+    Args:
+        xmind_file_path (str): xmind文件路径
+        xmind_sheet_name (str): xmind文件sheet页名称
+        classify (bool, optional): 是否分类用例
+        backend (str, optional): 写入器，openpyxl（无需 Excel/WPS）或 xlwings
+        spec (str, optional): MacOS下 excelApp 的名称，仅 xlwings 有效. e.g.: wpsoffice
+        output_name (str, optional): 输出文件名称（需要文件后缀）. Defaults to [testcase]{sheet页名称}.xlsx
+        analysis_mode (str, optional): 数据统计的计算方式，参考 ANALYSIS_MODES. Defaults to formula
+            formula（INDIRECT + 整列）、range（只引用用例所在的行，非易失）、static（直接写入用例数）
+        schema (TagSchema, optional): 标签定义，参考 TagSchema、load_schema. Defaults to DEFAULT_SCHEMA
+
+    Returns:
+        str: Excel路径
+    """
+    rows, classified_data = xmind_to_rows(xmind_file_path, xmind_sheet_name, classify, schema)
+    output_name = output_name or f'[testcase]{xmind_sheet_name}.xlsx'
+    return rows_to_excel(rows, classified_data, output_name, backend, spec, analysis_mode, schema)
+
+
+def xmind_sheets_to_excel(
+    xmind_file_path: str,
+    xmind_sheet_names: list = None,
+    classify: bool = False,
+    merge: bool = False,
+    backend: str = 'openpyxl',
+    spec: str = None,
+    analysis_mode: str = 'formula',
+    schema: TagSchema = None
+) -> list:
+    """XMind 多个 sheet 页转 Excel，xmind 文件只解析一次
+
+    Args:
+        xmind_file_path (str): xmind文件路径
+        xmind_sheet_names (list, optional): xmind文件sheet页名称，为空时转换所有 sheet 页
+        classify (bool, optional): 是否分类用例
+        merge (bool, optional): 是否合并为一个 Excel，合并时每个 xmind sheet 页对应一个测试用例 sheet 页，
+            模块分类和数据统计按模块合并. Defaults to 每个 xmind sheet 页输出一个 Excel
+        backend (str, optional): 写入器，openpyxl（无需 Excel/WPS）或 xlwings
+        spec (str, optional): MacOS下 excelApp 的名称，仅 xlwings 有效. e.g.: wpsoffice
+        analysis_mode (str, optional): 数据统计的计算方式，参考 ANALYSIS_MODES
+        schema (TagSchema, optional): 标签定义. Defaults to DEFAULT_SCHEMA
+
+    Raises:
+        Exception: sheet 页不存在
+
+    Returns:
+        list: Excel路径
+    """
+    output_file_paths = []
+    sections = []
+    merged_data = {} if classify else None
+    for sheet_name, events in iter_xmind_sheets(xmind_file_path, xmind_sheet_names):
+        rows, classified_data = events_to_rows(events, classify, schema)
+        if not merge:
+            output_name = f'[testcase]{sheet_name}.xlsx'
+            output_file_paths.append(
+                rows_to_excel(rows, classified_data, output_name, backend, spec, analysis_mode, schema)
+            )
+            continue
+        sections.append((sheet_name, rows))
+        if classify:
+            for module, module_rows in classified_data.items():
+                merged_data.setdefault(module, []).extend(module_rows)
+
+    found = output_file_paths or sections
+    if not found:
+        raise Exception(f'sheet页:[ {", ".join(xmind_sheet_names or [])} ] 不存在')
+    if merge:
+        xmind_name = os.path.splitext(os.path.basename(xmind_file_path))[0]
+        with stage('template_copy'):
+            output_file_path = copy_file_to_output(TEMPLATE_FILE_PATH, f'[testcase]{xmind_name}.xlsx')
+        print('写入 Excel 开始')
+        with ConversionSession(output_file_path, get_writer(backend, spec, schema), analysis_mode) as session:
+            session.run_sections(sections, merged_data)
+        print('写入 Excel 完成')
+        print(f'Excel路径: {output_file_path}')
+        output_file_paths.append(output_file_path)
+    return output_file_paths
 
 
 if __name__ == '__main__':
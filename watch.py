@@ -0,0 +1,292 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @File    : watch.py
+# @Time    : 2026-10-17 00:08:26
+# @Author  : Kelvin.Ye
+import argparse
+import contextlib
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from batch import find_xmind_files
+from batch import future_result
+from batch import select_sheet_names
+from cache import DigestEvents
+from schema import TagSchema
+from schema import load_schema
+from transformer import OUTPUT_PATH
+from transformer import events_to_rows
+from transformer import get_writer
+from transformer import iter_xmind_sheets
+from transformer import load_template_content
+from transformer import write_excel
+
+
+# 默认输出目录（相对于当前工作目录），监听模式下输出文件名称固定，每次转换覆盖上一次的 Excel
+WATCH_OUTPUT_PATH = os.path.join(OUTPUT_PATH, 'watch')
+
+
+def convert_events(xmind_file_path: str, xmind_sheet_name: str, events: DigestEvents, digest: str, options: dict):
+    """主题事件转换为 Excel，先写入临时文件再替换，转换失败时保留上一次的 Excel
+
+    边解析边计算哈希值，不保存主题事件；内容与上一次转换时相同（哈希值为 digest）时不写入，返回 None
+    """
+    started = time.perf_counter()
+    result = {'sheet': xmind_sheet_name, 'cases': 0, 'output': None, 'error': None}
+    xmind_name = os.path.splitext(os.path.basename(xmind_file_path))[0]
+    file_name = f'[testcase]{xmind_name}-{xmind_sheet_name}.xlsx'
+    output_file_path = os.path.join(options['output_path'], file_name)
+    temp_file_path = os.path.join(options['output_path'], f'~{file_name}')
+    try:
+        rows, classified_data = events_to_rows(events, options['classify'], options['schema'])
+        if events.hexdigest() == digest:
+            return None
+        result['cases'] = len(rows)
+        with open(temp_file_path, 'wb') as f:
+            f.write(load_template_content())
+        writer = get_writer(options['backend'], options['spec'], options['schema'])
+        write_excel(rows, classified_data, temp_file_path, writer, options['analysis_mode'])
+        os.replace(temp_file_path, output_file_path)
+        result['output'] = output_file_path
+    except Exception as e:
+        result['error'] = f'{type(e).__name__}: {e}'
+        if os.path.exists(temp_file_path):
+            os.remove(temp_file_path)
+    result['seconds'] = time.perf_counter() - started
+    return result
+
+
+def convert_changed_sheets(xmind_file_path: str, digests: dict, options: dict) -> dict:
+    """在工作进程中转换内容有变化的 sheet 页，xmind 文件只解析一次，异常记录在结果中，不向上抛出
+
+    Args:
+        xmind_file_path (str): xmind文件路径
+        digests (dict): 上一次转换时每个 sheet 页内容的哈希值
+        options (dict): 转换选项，convert 为 False 时只计算哈希值
+
+    Returns:
+        dict: {'file': ..., 'convert': True, 'digests': {...}, 'sheets': [...], 'error': None}，
+            转换失败的 sheet 页不记录哈希值，下次保存时重新转换
+    """
+    result = {'file': xmind_file_path, 'convert': options['convert'], 'digests': {}, 'sheets': [], 'error': None}
+    try:
+        # 转换过程的输出由监听进程汇总，不在工作进程中输出
+        with contextlib.redirect_stdout(io.StringIO()):
+            for sheet_name, events in iter_xmind_sheets(xmind_file_path):
+                if not select_sheet_names([sheet_name], options['sheet_selectors']):
+                    continue
+                events = DigestEvents(events)
+                if not options['convert']:
+                    result['digests'][sheet_name] = events.hexdigest()
+                    continue
+                sheet_result = convert_events(xmind_file_path, sheet_name, events, digests.get(sheet_name), options)
+                # 转换失败时未遍历的主题事件在此时遍历，计算完整的哈希值
+                digest = events.hexdigest()
+                if sheet_result is None or not sheet_result['error']:
+                    result['digests'][sheet_name] = digest
+                if sheet_result is not None:
+                    result['sheets'].append(sheet_result)
+    except Exception as e:
+        # 保存到一半的 xmind 文件可能无法读取，等待下一次保存
+        result['error'] = f'{type(e).__name__}: {e}'
+        result['digests'] = digests
+    return result
+
+
+class XmindWatcher:
+    """监听目录下的 xmind 文件，保存后自动转换为 Excel
+
+    定时扫描文件的修改时间和大小，文件在 debounce 秒内没有再次变化才转换，连续保存只转换一次；
+    转换时按 sheet 页内容的哈希值跳过没有变化的 sheet 页。转换在固定数量的工作进程中执行，
+    同时转换的文件数不超过工作进程数，其余文件排队等待，同一个文件排队期间再次保存不会重复转换。
+    工作进程常驻，模板文件只读取一次，修改模板后需要重新启动
+
+    Args:
+        source (str): 监听的目录或通配符，e.g.: cases/、cases/**/*.xmind
+        sheet_selectors (list, optional): sheet 页名称或通配符，为空时转换所有 sheet 页
+        classify (bool, optional): 是否分类用例
+        backend (str, optional): 写入器，openpyxl（无需 Excel/WPS）或 xlwings
+        spec (str, optional): MacOS下 excelApp 的名称，仅 xlwings 有效
+        analysis_mode (str, optional): 数据统计的计算方式，参考 ANALYSIS_MODES
+        schema (TagSchema, optional): 标签定义. Defaults to DEFAULT_SCHEMA
+        output_path (str, optional): 输出目录. Defaults to output/watch
+        workers (int, optional): 工作进程数
+        debounce (float, optional): 文件停止变化多少秒后才转换
+        interval (float, optional): 扫描间隔（秒）
+        convert_existing (bool, optional): 启动时是否转换已有的文件，否则只记录哈希值，保存后才转换
+
+    Usage:
+        XmindWatcher('cases/', classify=True).run()
+    """
+
+    def __init__(
+        self,
+        source: str,
+        sheet_selectors: list = None,
+        classify: bool = False,
+        backend: str = 'openpyxl',
+        spec: str = None,
+        analysis_mode: str = 'formula',
+        schema: TagSchema = None,
+        output_path: str = None,
+        workers: int = 2,
+        debounce: float = 1.0,
+        interval: float = 0.5,
+        convert_existing: bool = False
+    ):
+        self.source = source
+        self.workers = workers
+        self.debounce = debounce
+        self.interval = interval
+        self.convert_existing = convert_existing
+        self.options = {
+            'sheet_selectors': sheet_selectors,
+            'classify': classify,
+            'backend': backend,
+            'spec': spec,
+            'analysis_mode': analysis_mode,
+            'schema': schema,
+            'output_path': os.path.abspath(output_path or WATCH_OUTPUT_PATH)
+        }
+        # key 为文件路径，value 为 (修改时间, 文件大小)
+        self.stats = {}
+        # key 为文件路径，value 为每个 sheet 页内容的哈希值
+        self.digests = {}
+        # 等待转换的文件，key 为文件路径，value 为最后一次变化的时间
+        self.pending = {}
+        # 下一次只计算哈希值、不转换的文件（启动时已存在的文件）
+        self.baseline = set()
+        # 正在转换的任务，key 为 future，value 为文件路径
+        self.running = {}
+
+    def scan(self) -> dict:
+        """扫描 xmind 文件，忽略 ~ 和 . 开头的临时文件"""
+        stats = {}
+        for file_path in find_xmind_files(self.source):
+            if os.path.basename(file_path).startswith(('~', '.')):
+                continue
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                # 扫描期间被删除或改名
+                continue
+            stats[file_path] = (stat.st_mtime_ns, stat.st_size)
+        return stats
+
+    def start(self):
+        os.makedirs(self.options['output_path'], exist_ok=True)
+        self.stats = self.scan()
+        # 已有的文件立即处理，不需要等待防抖时间
+        ready_time = time.monotonic() - self.debounce
+        for file_path in self.stats:
+            self.pending[file_path] = ready_time
+            if not self.convert_existing:
+                self.baseline.add(file_path)
+
+    def poll(self, executor):
+        """扫描一次文件变化，收集已完成的转换并提交可以转换的文件"""
+        now = time.monotonic()
+        stats = self.scan()
+        for file_path, stat in stats.items():
+            if self.stats.get(file_path) != stat:
+                self.stats[file_path] = stat
+                self.pending[file_path] = now
+        for file_path in [file_path for file_path in self.stats if file_path not in stats]:
+            del self.stats[file_path]
+            self.digests.pop(file_path, None)
+            self.pending.pop(file_path, None)
+            self.baseline.discard(file_path)
+            print(f'[删除] {file_path}')
+        self.collect()
+        self.dispatch(executor, now)
+
+    def collect(self):
+        for future in [future for future in self.running if future.done()]:
+            file_path = self.running.pop(future)
+            result, error = future_result(future)
+            if error:
+                # 下次保存时重新转换
+                print(f'[失败] {file_path} {error}')
+                continue
+            if file_path in self.stats:
+                self.digests[file_path] = result['digests']
+            self.print_result(result)
+
+    def dispatch(self, executor, now: float):
+        """按变化时间先后提交停止变化的文件，正在转换的文件等转换完成后再提交"""
+        running_paths = set(self.running.values())
+        ready = sorted(
+            (changed, file_path) for file_path, changed in self.pending.items()
+            if now - changed >= self.debounce and file_path not in running_paths
+        )
+        for _, file_path in ready[:max(self.workers - len(self.running), 0)]:
+            del self.pending[file_path]
+            options = dict(self.options, convert=file_path not in self.baseline)
+            self.baseline.discard(file_path)
+            future = executor.submit(convert_changed_sheets, file_path, self.digests.get(file_path, {}), options)
+            self.running[future] = file_path
+
+    def print_result(self, result: dict):
+        if result['error']:
+            print(f'[失败] {result["file"]} {result["error"]}')
+            return
+        if result['convert'] and not result['sheets']:
+            print(f'[跳过] {result["file"]} 内容没有变化')
+        for sheet in result['sheets']:
+            status = '失败' if sheet['error'] else '成功'
+            print(
+                f'[{status}] {result["file"]} sheet页:[ {sheet["sheet"]} ] '
+                f'用例数: {sheet["cases"]} 耗时: {sheet["seconds"]:.2f}s'
+            )
+            if sheet['error']:
+                print(f'    {sheet["error"]}')
+            else:
+                print(f'    Excel路径: {sheet["output"]}')
+
+    def run(self, duration: float = None):
+        """开始监听，直到 Ctrl+C 或超过 duration 秒"""
+        started = time.monotonic()
+        self.start()
+        print(f'监听开始: {self.source}')
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            try:
+                while duration is None or time.monotonic() - started < duration:
+                    self.poll(executor)
+                    time.sleep(self.interval)
+            except KeyboardInterrupt:
+                pass
+            # 等待正在转换的文件完成
+            for future in list(self.running):
+                future.exception()
+            self.collect()
+        print('监听结束')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='监听目录，xmind 文件保存后自动转换为 Excel')
+    parser.add_argument('source', help='监听的目录或通配符')
+    parser.add_argument('-s', '--sheet', action='append', dest='sheets', help='sheet 页名称或通配符，可重复')
+    parser.add_argument('-c', '--classify', action='store_true', help='按 module 分类用例')
+    parser.add_argument('-o', '--output', help='输出目录. 默认 output/watch')
+    parser.add_argument('-b', '--backend', default='openpyxl', help='写入器')
+    parser.add_argument('--analysis-mode', default='formula', help='数据统计的计算方式')
+    parser.add_argument('--schema', help='标签定义的 JSON 文件')
+    parser.add_argument('-j', '--workers', type=int, default=2, help='工作进程数')
+    parser.add_argument('--debounce', type=float, default=1.0, help='文件停止变化多少秒后才转换')
+    parser.add_argument('--convert-existing', action='store_true', help='启动时转换已有的文件')
+    args = parser.parse_args()
+
+    XmindWatcher(
+        args.source,
+        args.sheets,
+        args.classify,
+        args.backend,
+        analysis_mode=args.analysis_mode,
+        schema=load_schema(args.schema) if args.schema else None,
+        output_path=args.output,
+        workers=args.workers,
+        debounce=args.debounce,
+        convert_existing=args.convert_existing
+    ).run()